@@ -0,0 +1,56 @@
+"""Benchmark ExperimentResult.append over the course of a full scan.
+
+Prints the average append time for each tenth of the scan. With a columnar
+store these should all be about the same, no matter how full the result is.
+
+Usage:
+    python benchmarks/bench_append.py [--theta-step 1] [--phi-step 1] [--npoints 201]
+"""
+import argparse
+import time
+
+import numpy as np
+import skrf
+
+from pychamber.experiment_result import ExperimentResult
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--theta-step", type=float, default=1.0)
+    parser.add_argument("--phi-step", type=float, default=1.0)
+    parser.add_argument("--npoints", type=int, default=201)
+    parser.add_argument("--polarizations", type=int, default=2)
+    args = parser.parse_args()
+
+    thetas = np.arange(-90, 90 + args.theta_step, args.theta_step)
+    phis = np.arange(-180, 180 + args.phi_step, args.phi_step)
+    pols = [f"pol{i}" for i in range(args.polarizations)]
+    freq = skrf.Frequency(1, 3, args.npoints, "ghz")
+    result = ExperimentResult(thetas, phis, pols, freq)
+    s = np.ones((args.npoints, 1, 1), dtype=complex)
+
+    n_total = len(thetas) * len(phis) * len(pols)
+    print(f"{n_total} appends, {args.npoints} frequency points")
+
+    times = np.empty(n_total)
+    i = 0
+    for theta in thetas:
+        for phi in phis:
+            for pol in pols:
+                ntwk = skrf.Network(
+                    frequency=freq,
+                    s=s,
+                    params={"phi": phi, "theta": theta, "polarization": pol, "calibrated": False},
+                )
+                start = time.perf_counter()
+                result.append(ntwk)
+                times[i] = time.perf_counter() - start
+                i += 1
+
+    for decile, chunk in enumerate(np.array_split(times, 10)):
+        print(f"{decile * 10:>3}-{(decile + 1) * 10:>3}%: {np.mean(chunk) * 1e6:8.1f} us/append")
+
+
+if __name__ == "__main__":
+    main()
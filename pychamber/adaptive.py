@@ -0,0 +1,119 @@
+"""Adaptive angular sampling.
+
+A uniform grid fine enough to resolve the nulls and sidelobes of a pattern
+spends most of its points where the pattern is smooth. An adaptive scan
+measures a coarse grid first, then repeatedly adds angles halfway between
+neighbouring points wherever the magnitude of the pattern changes or curves
+quickly, until nothing needs refining or a point or time budget runs out.
+
+Since a result is a grid of every theta with every phi, adding a phi adds a
+point at every theta (and vice versa). Angles are added in order of how far
+past the thresholds the pattern is there, for as long as the budget allows.
+See `Experiment`'s `adaptive` argument.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from pychamber.experiment_result import ExperimentResult
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class AdaptiveSampling:
+    """Settings of an adaptive scan.
+
+    Attributes:
+        frequencies: The frequencies (in Hz) to look at the pattern at
+        gradient_threshold: Refine between two points if the magnitude changes
+            faster than this between them (in dB/degree)
+        curvature_threshold: Refine either side of a point if the magnitude
+            curves more than this there (in dB/degree²). None to only refine on
+            the gradient
+        min_step: Never refine points closer together than this (in degrees)
+        max_points: Stop once the scan would have more than this many points.
+            None for no limit
+        max_time: Stop once the scan has taken this long (in seconds). None for
+            no limit
+        max_passes: The most refinement passes to make after the coarse pass
+    """
+
+    frequencies: Sequence[float]
+    gradient_threshold: float = 1.0
+    curvature_threshold: float | None = None
+    min_step: float = 1.0
+    max_points: int | None = None
+    max_time: float | None = None
+    max_passes: int = 10
+
+    def refine(self, result: ExperimentResult, budget: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Choose the angles to add to a result.
+
+        Args:
+            result: The result measured so far
+            budget: The most new points to add. None for no limit
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The (thetas, phis) to add
+        """
+        # dB magnitude, shaped (phi, theta, frequency and polarization)
+        db = np.stack(
+            [
+                result.get_3d_data(pol, frequency, quantity="db")
+                for pol in result.polarizations
+                for frequency in self.frequencies
+            ],
+            axis=-1,
+        )
+        thetas = result.thetas
+        phis = result.phis
+        candidates = [
+            (score, "phi", phi) for phi, score in self._candidates(phis, db.reshape((len(phis), -1))).items()
+        ] + [
+            (score, "theta", theta)
+            for theta, score in self._candidates(thetas, db.swapaxes(0, 1).reshape((len(thetas), -1))).items()
+        ]
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+        new = {"theta": [], "phi": []}
+        n_thetas, n_phis = len(thetas), len(phis)
+        for _, axis, angle in candidates:
+            cost = n_thetas if axis == "phi" else n_phis
+            if budget is not None:
+                if cost > budget:
+                    continue
+                budget -= cost
+            new[axis].append(angle)
+            if axis == "phi":
+                n_phis += 1
+            else:
+                n_thetas += 1
+
+        return np.sort(new["theta"]), np.sort(new["phi"])
+
+    def _candidates(self, angles: np.ndarray, db: np.ndarray) -> dict[float, float]:
+        # Midpoint -> score of every gap between neighbouring angles to refine.
+        # `db` is shaped (angle, everything else). A score is how many times
+        # over its threshold the pattern is, so > 1 needs refining
+        if len(angles) < 2 or db.shape[1] == 0:
+            return {}
+        step = np.diff(angles)
+        slope = np.diff(db, axis=0) / step[:, None]
+        score = np.nan_to_num(np.abs(slope), nan=0.0).max(axis=1) / self.gradient_threshold
+
+        if self.curvature_threshold is not None and len(angles) > 2:
+            curvature = 2 * np.diff(slope, axis=0) / (step[1:] + step[:-1])[:, None]
+            curvature_score = np.nan_to_num(np.abs(curvature), nan=0.0).max(axis=1) / self.curvature_threshold
+            # Curvature at a point refines the gaps either side of it
+            score[:-1] = np.maximum(score[:-1], curvature_score)
+            score[1:] = np.maximum(score[1:], curvature_score)
+
+        refine = (score > 1) & (step / 2 >= self.min_step)
+        midpoints = (angles[:-1] + angles[1:]) / 2
+        return {float(angle): float(s) for angle, s in zip(midpoints[refine], score[refine], strict=True)}
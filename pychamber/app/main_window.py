@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from pychamber.app.widgets import AnalyzerControls, ExperimentControls, PositionerControls
+    from pychamber.calibration import Calibration
     from pychamber.positioner import Positioner
 
 import os
@@ -22,10 +23,18 @@ from pychamber.app.logger import LOG
 from pychamber.app.objects import ExperimentWorker
 from pychamber.app.ui.mainwindow import Ui_MainWindow
 from pychamber.app.widgets import LogDialog, SettingsDialog
+from pychamber.experiment_queue import QueuedExperiment, order_queue
+from pychamber.experiment_result import BINARY_SUFFIX
+from pychamber.journal import JOURNAL_SUFFIX, JournalError, ScanJournal, journal_dir
 from pychamber.settings import CONF
 
 
 class MainWindow(QMainWindow, Ui_MainWindow):
+    BINARY_RESULT_FILTER = f"Binary Result File (*{BINARY_SUFFIX})"
+    MDIF_RESULT_FILTER = "MDIF File (*.mdif)"
+    # How long (in ms) to batch up new data before the plots are updated
+    PLOT_UPDATE_INTERVAL = 100
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -36,7 +45,16 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.active_result: ExperimentResult | None = None
         self.saved = []
         self._results = []
+        self._journals: dict[str, pathlib.Path] = {}
         self._thread = QThread()
+        # Experiments queued to run back to back, the ones left to run, and
+        # where to save their results
+        self._queue: list[QueuedExperiment] = []
+        self._queue_pending: list[QueuedExperiment] = []
+        self._queue_dir: pathlib.Path | None = None
+        self._queue_count = 0
+        self._queued_running: QueuedExperiment | None = None
+        self._calibration: Calibration | None = None
 
         self.apply_theme(CONF["theme"])
 
@@ -47,6 +65,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         widget_map = {
             "visalib": (self.settings_dialog.backend_cb, "@py", str),
             "theme": (self.settings_dialog.theme_cb, "Light", str),
+            "scan_order": (self.settings_dialog.scan_order_cb, "raster", str),
         }
         CONF.register_widgets(widget_map)
 
@@ -69,8 +88,12 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         LOG.debug("Connecting signals")
         self.save_action.triggered.connect(self.on_save_action_triggered)
         self.load_action.triggered.connect(self.on_load_action_triggered)
+        self.resume_action.triggered.connect(self.on_resume_action_triggered)
         self.view_logs_action.triggered.connect(self.on_view_logs_action_triggered)
         self.settings_action.triggered.connect(self.on_settings_action_triggered)
+        self.queue_scan_action.triggered.connect(self.on_queue_scan_action_triggered)
+        self.run_queue_action.triggered.connect(self.on_run_queue_action_triggered)
+        self.clear_queue_action.triggered.connect(self.on_clear_queue_action_triggered)
 
         self.exit_action.triggered.connect(self.close)
 
@@ -83,6 +106,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.theta_scan_btn.pressed.connect(self.on_theta_scan_btn_pressed)
         self.full_scan_btn.pressed.connect(self.on_full_scan_btn_pressed)
         self.abort_btn.pressed.connect(self.on_abort_btn_pressed)
+        self._thread.finished.connect(self.on_thread_finished)
 
         self.results.model().rowsInserted.connect(self.on_results_rows_changed)
         self.results.currentItemChanged.connect(self.on_current_result_changed)
@@ -126,18 +150,32 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             )
             return
 
-        fname, _ = QFileDialog.getSaveFileName(self, "Save Result", filter="Result File (*.mdif)")
+        fname, selected_filter = QFileDialog.getSaveFileName(
+            self, "Save Result", filter=f"{self.BINARY_RESULT_FILTER};;{self.MDIF_RESULT_FILTER}"
+        )
         if fname == "":
             return
 
-        path = pathlib.Path(fname).with_suffix(".mdif")
+        suffix = ".mdif" if selected_filter == self.MDIF_RESULT_FILTER else BINARY_SUFFIX
+        self.save_result(self.active_result, pathlib.Path(fname).with_suffix(suffix))
+
+    def save_result(self, result: ExperimentResult, path: pathlib.Path) -> None:
         LOG.debug(f"Saving to {path}")
-        self.active_result.save(path)
-        self.saved.append(self.active_result.uuid)
+        result.save(path)
+        self.saved.append(result.uuid)
         self.update_results_rows()
 
+        # Once saved, the journal isn't needed to recover the data anymore
+        journal_path = self._journals.get(result.uuid)
+        if journal_path is not None and not self._thread.isRunning():
+            LOG.debug(f"Removing journal {journal_path}")
+            journal_path.unlink(missing_ok=True)
+            self._journals.pop(result.uuid)
+
     def on_load_action_triggered(self):
-        fname, _ = QFileDialog.getOpenFileName(self, "Load Result", filter="Result File (*.mdif)")
+        fname, _ = QFileDialog.getOpenFileName(
+            self, "Load Result", filter=f"Result File (*{BINARY_SUFFIX} *.mdif);;{self.BINARY_RESULT_FILTER};;{self.MDIF_RESULT_FILTER}"
+        )
         if fname == "":
             return
 
@@ -157,6 +195,132 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.results.setCurrentItem(item)
         self.update_results_rows()
 
+    def on_resume_action_triggered(self):
+        if self.analyzer is None or self.positioner is None:
+            QMessageBox.warning(
+                self, "Not Connected", "You must be connected to an analyzer and a positioner to resume a scan"
+            )
+            return
+
+        fname, _ = QFileDialog.getOpenFileName(
+            self, "Resume Scan", dir=str(journal_dir()), filter=f"Scan Journal (*{JOURNAL_SUFFIX})"
+        )
+        if fname == "":
+            return
+
+        path = pathlib.Path(fname)
+        try:
+            header = ScanJournal.read_header(path)
+        except JournalError:
+            QMessageBox.warning(self, "Invalid Journal", f"{path} is not a valid scan journal")
+            return
+
+        if not np.array_equal(header["f"], self.analyzer_controls.frequency.f):
+            QMessageBox.warning(
+                self,
+                "Frequency Mismatch",
+                "The analyzer's frequency settings don't match the interrupted scan. Restore them and try again.",
+            )
+            return
+
+        journal, result = ScanJournal.resume(path)
+        LOG.info(f"Resuming scan {result.uuid} ({len(result)} points already measured)")
+        completed = {(theta, phi) for theta in result.thetas for phi in result.phis if result.is_measured(theta, phi)}
+
+        self.total_progress_gb.show()
+        self.cut_progress_gb.show()
+        self.time_remaining_gb.show()
+
+        self.total_progress_bar.setMaximum(len(result.phis) * len(result.thetas) - len(completed))
+        self.cut_progress_bar.setMaximum(len(result.phis))
+        self.time_remaining_le.setText("00:00:00")
+
+        self.run_scan(
+            result.phis, result.thetas, journal.polarizations, result=result, journal=journal, completed=completed
+        )
+
+    def on_queue_scan_action_triggered(self):
+        if self.analyzer is None or self.positioner is None:
+            QMessageBox.warning(
+                self, "Not Connected", "You must be connected to an analyzer and a positioner to queue a scan"
+            )
+            return
+
+        phis, thetas = self.full_scan_angles()
+        item = QueuedExperiment(
+            thetas=thetas,
+            phis=phis,
+            polarizations=self.experiment_controls.polarizations,
+            frequency=self.analyzer_controls.frequency,
+            if_bandwidth=self.analyzer_controls.if_bandwidth,
+            calibration=self.experiment_controls.calibration,
+            name=f"scan{len(self._queue) + 1}",
+        )
+        self._queue.append(item)
+        LOG.info(f"Queued {item.name} ({len(thetas) * len(phis)} points). {len(self._queue)} scans in the queue")
+
+    def on_run_queue_action_triggered(self):
+        if not self._queue:
+            QMessageBox.information(
+                self, "Queue Empty", "There are no scans in the queue. Add some from the Tools menu."
+            )
+            return
+        if self._thread.isRunning():
+            QMessageBox.warning(self, "Scan Running", "Wait for the current scan to finish before running the queue")
+            return
+
+        dirname = QFileDialog.getExistingDirectory(self, "Save Queued Results To")
+        if dirname == "":
+            return
+
+        try:
+            start = (float(self.positioner.theta), float(self.positioner.phi))
+        except NotImplementedError:
+            start = None
+        self._queue_pending = order_queue(
+            self._queue, self.positioner.theta_motion, self.positioner.phi_motion, start, CONF["scan_order"]
+        )
+        self._queue_dir = pathlib.Path(dirname)
+        self._queue_count = 0
+        self._queue.clear()
+        LOG.info(f"Running queue of {len(self._queue_pending)} scans: {[item.name for item in self._queue_pending]}")
+        self.run_next_queued()
+
+    def on_clear_queue_action_triggered(self):
+        LOG.info(f"Clearing {len(self._queue)} queued scans")
+        self._queue.clear()
+
+    def run_next_queued(self) -> None:
+        item = self._queue_pending.pop(0)
+        LOG.info(f"Running queued scan {item.name}")
+        item.configure(self.analyzer)
+        self.analyzer_controls.init_widgets()
+
+        self.total_progress_gb.show()
+        self.cut_progress_gb.show()
+        self.time_remaining_gb.show()
+
+        self.total_progress_bar.setMaximum(len(item.phis) * len(item.thetas))
+        self.cut_progress_bar.setMaximum(len(item.phis))
+        self.time_remaining_le.setText("00:00:00")
+
+        self._queued_running = item
+        self.run_scan(item.phis, item.thetas, item.polarizations)
+
+    def on_thread_finished(self) -> None:
+        item = self._queued_running
+        if item is None:
+            return
+        self._queued_running = None
+
+        path = self._queue_dir / f"{self._queue_count:02d}_{item.name}{BINARY_SUFFIX}"
+        self._queue_count += 1
+        self.save_result(self.active_result, path)
+        if self._queue_pending:
+            self.run_next_queued()
+        else:
+            LOG.info(f"Queue finished. Results saved to {self._queue_dir}")
+
     def on_view_logs_action_triggered(self):
         self.log_dialog.show()
 
@@ -204,6 +368,9 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def on_abort_btn_pressed(self) -> None:
         LOG.warning("Abort pressed")
+        if self._queue_pending:
+            LOG.warning(f"Cancelling {len(self._queue_pending)} queued scans")
+            self._queue_pending.clear()
         if self._thread.isRunning():
             LOG.warning("Requesting thread interuption")
             self._thread.requestInterruption()
@@ -246,14 +413,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def on_full_scan_btn_pressed(self) -> None:
         LOG.info("Scanning full 3D")
-        phi_start = CONF["phi_start"]
-        phi_stop = CONF["phi_stop"]
-        phi_step = CONF["phi_step"]
-        theta_start = CONF["theta_start"]
-        theta_stop = CONF["theta_stop"]
-        theta_step = CONF["theta_step"]
-        phis = np.arange(phi_start, phi_stop + phi_step, phi_step)
-        thetas = np.arange(theta_start, theta_stop + theta_step, theta_step)
+        phis, thetas = self.full_scan_angles()
 
         self.total_progress_gb.show()
         self.cut_progress_gb.show()
@@ -266,6 +426,17 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         pols = self.experiment_controls.polarizations
         self.run_scan(phis, thetas, pols)
 
+    def full_scan_angles(self) -> tuple[np.ndarray, np.ndarray]:
+        phi_start = CONF["phi_start"]
+        phi_stop = CONF["phi_stop"]
+        phi_step = CONF["phi_step"]
+        theta_start = CONF["theta_start"]
+        theta_stop = CONF["theta_stop"]
+        theta_step = CONF["theta_step"]
+        phis = np.arange(phi_start, phi_stop + phi_step, phi_step)
+        thetas = np.arange(theta_start, theta_stop + theta_step, theta_step)
+        return phis, thetas
+
     def on_total_progress_updated(self, iters: int) -> None:
         self.total_progress_bar.setValue(iters)
 
@@ -279,6 +450,9 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         time_str = f"{hours} hours {minutes:0>2} minutes {seconds:0>2} seconds"
         self.time_remaining_le.setText(time_str)
 
+    def on_scan_planned(self, estimated_time: float, time_saved: float) -> None:
+        LOG.info(f"Planned scan: {estimated_time:.0f} s of estimated motion, {time_saved:.0f} s less than the naive order")
+
     def on_experiment_started(self) -> None:
         LOG.debug("Experiment started. Setting up widgets")
         self.total_progress_bar.setValue(0)
@@ -289,13 +463,23 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def on_experiment_finished(self) -> None:
         LOG.debug("Experiment finished. Cleaning up")
+        if self.active_result.timings is not None:
+            LOG.info(f"Scan timing: {self.active_result.timings.summary()}")
         self.set_controls_enabled(True)
         self.set_scan_btns_enabled(True)
         self.abort_btn.setEnabled(False)
 
-    def on_data_acquired(self, ntwk: skrf.Network) -> None:
-        calibration = self.experiment_controls.calibration
-        self.active_result.append(ntwk, calibration=calibration)
+    def on_data_acquired(self, ntwks: list[skrf.Network]) -> None:
+        calibration = self._calibration
+        timings = self.active_result.timings
+        if timings is None or not ntwks:
+            self.active_result.append_many(ntwks, calibration=calibration)
+            return
+
+        point = (ntwks[0].params["theta"], ntwks[0].params["phi"])
+        timings.end(point, "deliver")
+        with timings.time(point, "append"):
+            self.active_result.append_many(ntwks, calibration=calibration)
 
     def update_results_rows(self):
         for i in range(self.results.count()):
@@ -357,19 +541,42 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         params = self.analyzer_controls.available_params
         self.experiment_controls.update_params(params)
 
-    def run_scan(self, phis: np.ndarray, thetas: np.ndarray, polarizations: list[tuple[str, int, int]]) -> None:
+    def run_scan(
+        self,
+        phis: np.ndarray,
+        thetas: np.ndarray,
+        polarizations: list[tuple[str, int, int]],
+        result: ExperimentResult | None = None,
+        journal: ScanJournal | None = None,
+        completed: set[tuple[float, float]] | None = None,
+    ) -> None:
         LOG.info("Starting scan worker")
         LOG.debug(f"polarizations: {polarizations}")
         LOG.debug(f"thetas [{len(thetas)} pts, start: {thetas[0]}, stop:{thetas[-1]}]")
         LOG.debug(f"phis [{len(phis)} pts, start: {phis[0]}, stop:{phis[-1]}]")
-        LOG.debug(f"calibration [{self.experiment_controls.calibration}]")
-        freq = self.analyzer_controls.frequency
-        result = ExperimentResult(
-            thetas=thetas,
-            phis=phis,
-            polarizations=[p[0] for p in polarizations],
-            frequency=freq,
+        self._calibration = (
+            self.experiment_controls.calibration if self._queued_running is None else self._queued_running.calibration
         )
+        LOG.debug(f"calibration [{self._calibration}]")
+        if result is None:
+            freq = self.analyzer_controls.frequency
+            result = ExperimentResult(
+                thetas=thetas,
+                phis=phis,
+                polarizations=[p[0] for p in polarizations],
+                frequency=freq,
+            )
+        elif self._calibration is not None and len(result) > 0:
+            # Only the raw data is journaled, so calibrate the points restored
+            # from the journal like the ones still to be measured
+            LOG.info(f"Applying the calibration to the {len(result)} points already measured")
+            result.apply_calibration(self._calibration)
+        if journal is None:
+            journal = ScanJournal.create(ScanJournal.default_path(result), result, polarizations)
+        LOG.debug(f"journal [{journal.path}]")
+        self._journals[result.uuid] = pathlib.Path(journal.path)
+        result.notify_interval = self.PLOT_UPDATE_INTERVAL
+
         item = QListWidgetItem(self.results)
         item.setData(Qt.UserRole, result.uuid)
         item.setText(result.created)
@@ -379,7 +586,19 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self._results.append(result)
         self.plot_dock_widget.results = self.active_result
 
-        self.worker = ExperimentWorker(self.analyzer, self.positioner, phis, thetas, polarizations)
+        self.worker = ExperimentWorker(
+            self.analyzer,
+            self.positioner,
+            phis,
+            thetas,
+            polarizations,
+            journal=journal,
+            completed=completed,
+            scan_order=CONF["scan_order"],
+            pipelined=True,
+            reader=self.analyzer_controls.create_reader(polarizations),
+        )
+        result.timings = self.worker.timings
         self.worker.moveToThread(self._thread)
         self._thread.started.connect(self.worker.run)
         self.worker.finished.connect(self._thread.quit)
@@ -390,7 +609,9 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.worker.totalIterCountUpdated.connect(self.on_total_progress_updated)
         self.worker.cutIterCountUpdated.connect(self.on_cut_progress_updated)
         self.worker.timeEstUpdated.connect(self.on_time_est_updated)
+        self.worker.scanPlanned.connect(self.on_scan_planned)
         self.worker.finished.connect(self.on_experiment_finished)
+        self.worker.finished.connect(result.flush_notifications)
         self.worker.finished.connect(self.total_progress_gb.hide)
         self.worker.finished.connect(self.time_remaining_gb.hide)
         self.worker.finished.connect(self.cut_progress_gb.hide)
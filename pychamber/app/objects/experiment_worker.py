@@ -3,23 +3,31 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import Callable
-
     from pychamber import positioner
+    from pychamber.journal import ScanJournal
+    from pychamber.pipeline import Reader
 
-import functools
 import time
 
 import numpy as np
 import skrf
-from qtpy.QtCore import QEventLoop, QObject, QThread, QTimer, Signal
+from qtpy.QtCore import QObject, QThread, Signal
+
+from pychamber.app.logger import LOG
+from pychamber.capture import reader_for
+from pychamber.pipeline import AcquisitionPipeline, acquire_serially
+from pychamber.planner import PLANNED_ORDER, plan_for_positioner
+from pychamber.scan import scan_rows
+from pychamber.timing import ScanTimings
 
 
 class ExperimentWorker(QObject):
-    dataAcquired = Signal(skrf.Network)
+    dataAcquired = Signal(list)
     totalIterCountUpdated = Signal(int)
     cutIterCountUpdated = Signal(int)
     timeEstUpdated = Signal(float)
+    # Estimated motion time of a planned scan, and the time it saves (in seconds)
+    scanPlanned = Signal(float, float)
     started = Signal()
     finished = Signal()
 
@@ -30,6 +38,11 @@ class ExperimentWorker(QObject):
         phis: np.ndarray,
         thetas: np.ndarray,
         polarizations: list[tuple[str, int, int]],
+        journal: ScanJournal | None = None,
+        completed: set[tuple[float, float]] | None = None,
+        scan_order: str = "raster",
+        pipelined: bool = False,
+        reader: Reader | None = None,
         parent: QObject | None = None,
     ) -> None:
         super().__init__(parent)
@@ -39,68 +52,109 @@ class ExperimentWorker(QObject):
         self.phis = phis
         self.thetas = thetas
         self.polarizations = polarizations
+        self.journal = journal
+        self.completed = completed if completed is not None else set()
+        self.scan_order = scan_order
+        self.pipelined = pipelined
+        self.reader = reader if reader is not None else reader_for(analyzer, polarizations)
+        # The "deliver" and "append" stages are timed by whoever receives `dataAcquired`
+        self.timings = ScanTimings()
 
     def run(self) -> None:
         self._running = True
         self.started.emit()
-        iter_times = np.array([])
-        total_iters = len(self.phis) * len(self.thetas)
-        total_completed = 0
-        for theta in self.thetas:
-            if QThread.currentThread().isInterruptionRequested():
-                self._running = False
-            self.wait_for(
-                functools.partial(self.positioner.move_theta_absolute, theta), self.positioner.jogCompleted, timeout=None
-            )
-
-            cut_completed = 0
-            for phi in self.phis:
-                if QThread.currentThread().isInterruptionRequested():
-                    self._running = False
-                start = time.time()
-
-                self.wait_for(
-                    functools.partial(self.positioner.move_phi_absolute, phi),
-                    self.positioner.jogCompleted,
-                    timeout=None,
+        try:
+            self._run()
+        except Exception:
+            LOG.exception("Experiment failed")
+        finally:
+            if self.journal is not None:
+                try:
+                    self.journal.close()
+                except OSError:
+                    LOG.exception("Failed to close the journal")
+            self.finished.emit()
+
+    def _run(self) -> None:
+        rows = self.scan_rows()
+        # Each point still to be measured, and the row it's in
+        self._todo = {
+            (theta, phi): i for i, row in enumerate(rows) for theta, phi in row if (theta, phi) not in self.completed
+        }
+        self._rows = rows
+        self._position = [None, None]
+        self._cut_row = None
+        self._cut_completed = 0
+        self._total_completed = 0
+        self._iter_times = np.array([])
+        self._last_recorded = time.time()
+
+        reader = self.reader
+        reader.setup()
+        try:
+            if self.pipelined:
+                pipeline = AcquisitionPipeline(self.move_to, reader, self.record, timings=self.timings)
+                pipeline.run(self._todo, should_stop=self.should_stop)
+            else:
+                acquire_serially(
+                    self._todo, self.move_to, reader, self.record, should_stop=self.should_stop, timings=self.timings
                 )
-
-                for pol_name, a, b in self.polarizations:
-                    ntwk = self.analyzer.ch1.get_sdata(a, b)
-                    ntwk.params = {
-                        "phi": phi,
-                        "theta": theta,
-                        "polarization": pol_name,
-                        "calibrated": False
-                    }
-                    self.dataAcquired.emit(ntwk)
-                stop = time.time()
-
-                cut_completed += 1
-                total_completed += 1
-                iter_times = np.append(iter_times, stop - start)
-                self.cutIterCountUpdated.emit(cut_completed)
-                self.totalIterCountUpdated.emit(total_completed)
-                avg_iter_time = np.average(iter_times)
-                time_remaining_est = (total_iters - total_completed) * avg_iter_time
-                self.timeEstUpdated.emit(time_remaining_est)
-
-                if not self._running:
-                    break
-            if not self._running:
-                break
-
-        self.finished.emit()
-
-    def wait_for(self, fn: Callable, signal, timeout: int | None = 5000) -> None:
-        event_loop = QEventLoop()
-        signal.connect(event_loop.quit)
-        QTimer.singleShot(0, fn)
-
-        if timeout is not None:
-            timer = QTimer()
-            timer.setSingleShot(True)
-            timer.timeout.connect(event_loop.quit)
-            timer.start()
-
-        event_loop.exec()
+        finally:
+            reader.teardown()
+
+    def should_stop(self) -> bool:
+        if QThread.currentThread().isInterruptionRequested():
+            self._running = False
+        return not self._running
+
+    def move_to(self, theta: float, phi: float) -> None:
+        move_theta = theta != self._position[0]
+        move_phi = phi != self._position[1]
+        if move_theta and move_phi:
+            self.positioner.start_move_absolute(phi, theta).wait()
+        elif move_theta:
+            self.positioner.start_move_theta_absolute(theta).wait()
+        elif move_phi:
+            self.positioner.start_move_phi_absolute(phi).wait()
+        self._position = [theta, phi]
+
+    def record(self, theta: float, phi: float, ntwks: list[skrf.Network]) -> None:
+        row = self._todo[(theta, phi)]
+        if row != self._cut_row:
+            self._cut_row = row
+            self._cut_completed = sum(point in self.completed for point in self._rows[row])
+
+        with self.timings.time((theta, phi), "record"):
+            for (pol_name, _, _), ntwk in zip(self.polarizations, ntwks, strict=True):
+                ntwk.params = {
+                    "phi": phi,
+                    "theta": theta,
+                    "polarization": pol_name,
+                    "calibrated": False,
+                }
+                if self.journal is not None:
+                    self.journal.append(ntwk)
+        self.timings.start((theta, phi), "deliver")
+        self.dataAcquired.emit(ntwks)
+        # With pipelining, points overlap, so time each one from when the last
+        # one was recorded
+        now = time.time()
+
+        self._cut_completed += 1
+        self._total_completed += 1
+        self._iter_times = np.append(self._iter_times, now - self._last_recorded)
+        self._last_recorded = now
+        self.cutIterCountUpdated.emit(self._cut_completed)
+        self.totalIterCountUpdated.emit(self._total_completed)
+        avg_iter_time = np.average(self._iter_times)
+        time_remaining_est = (len(self._todo) - self._total_completed) * avg_iter_time
+        self.timeEstUpdated.emit(time_remaining_est)
+
+    def scan_rows(self) -> list[list[tuple[float, float]]]:
+        if self.scan_order != PLANNED_ORDER:
+            return scan_rows(self.thetas, self.phis, self.scan_order)
+
+        points = [point for row in scan_rows(self.thetas, self.phis) for point in row if point not in self.completed]
+        plan = plan_for_positioner(points, self.positioner)
+        self.scanPlanned.emit(plan.estimated_time, plan.time_saved)
+        return plan.rows()
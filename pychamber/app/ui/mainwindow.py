@@ -37,12 +37,20 @@ class Ui_MainWindow(object):
         self.save_action.setObjectName(u"save_action")
         self.load_action = QAction(MainWindow)
         self.load_action.setObjectName(u"load_action")
+        self.resume_action = QAction(MainWindow)
+        self.resume_action.setObjectName(u"resume_action")
         self.exit_action = QAction(MainWindow)
         self.exit_action.setObjectName(u"exit_action")
         self.view_logs_action = QAction(MainWindow)
         self.view_logs_action.setObjectName(u"view_logs_action")
         self.settings_action = QAction(MainWindow)
         self.settings_action.setObjectName(u"settings_action")
+        self.queue_scan_action = QAction(MainWindow)
+        self.queue_scan_action.setObjectName(u"queue_scan_action")
+        self.run_queue_action = QAction(MainWindow)
+        self.run_queue_action.setObjectName(u"run_queue_action")
+        self.clear_queue_action = QAction(MainWindow)
+        self.clear_queue_action.setObjectName(u"clear_queue_action")
         self.central_widget = QWidget(MainWindow)
         self.central_widget.setObjectName(u"central_widget")
         self.verticalLayout_6 = QVBoxLayout(self.central_widget)
@@ -282,10 +290,14 @@ class Ui_MainWindow(object):
         self.menubar.addAction(self.menuHelp.menuAction())
         self.menuFile.addAction(self.save_action)
         self.menuFile.addAction(self.load_action)
+        self.menuFile.addAction(self.resume_action)
         self.menuFile.addSeparator()
         self.menuFile.addAction(self.settings_action)
         self.menuFile.addSeparator()
         self.menuFile.addAction(self.exit_action)
+        self.menuTools.addAction(self.queue_scan_action)
+        self.menuTools.addAction(self.run_queue_action)
+        self.menuTools.addAction(self.clear_queue_action)
         self.menuHelp.addAction(self.view_logs_action)
 
         self.retranslateUi(MainWindow)
@@ -297,9 +309,13 @@ class Ui_MainWindow(object):
         MainWindow.setWindowTitle(QCoreApplication.translate("MainWindow", u"PyChamber", None))
         self.save_action.setText(QCoreApplication.translate("MainWindow", u"Save", None))
         self.load_action.setText(QCoreApplication.translate("MainWindow", u"Load", None))
+        self.resume_action.setText(QCoreApplication.translate("MainWindow", u"Resume Scan", None))
         self.exit_action.setText(QCoreApplication.translate("MainWindow", u"Exit", None))
         self.view_logs_action.setText(QCoreApplication.translate("MainWindow", u"View Logs", None))
         self.settings_action.setText(QCoreApplication.translate("MainWindow", u"Settings", None))
+        self.queue_scan_action.setText(QCoreApplication.translate("MainWindow", u"Add Full Scan to Queue", None))
+        self.run_queue_action.setText(QCoreApplication.translate("MainWindow", u"Run Queue", None))
+        self.clear_queue_action.setText(QCoreApplication.translate("MainWindow", u"Clear Queue", None))
         self.label.setText("")
         self.full_scan_btn.setText(QCoreApplication.translate("MainWindow", u"Full Scan", None))
         self.phi_scan_btn.setText(QCoreApplication.translate("MainWindow", u"Scan Phi", None))
@@ -56,6 +56,16 @@ class Ui_Dialog(object):
 
         self.formLayout.setWidget(1, QFormLayout.LabelRole, self.theme_label)
 
+        self.scan_order_label = QLabel(self.general)
+        self.scan_order_label.setObjectName(u"scan_order_label")
+
+        self.formLayout.setWidget(2, QFormLayout.LabelRole, self.scan_order_label)
+
+        self.scan_order_cb = QComboBox(self.general)
+        self.scan_order_cb.setObjectName(u"scan_order_cb")
+
+        self.formLayout.setWidget(2, QFormLayout.FieldRole, self.scan_order_cb)
+
         self.tabWidget.addTab(self.general, "")
 
         self.verticalLayout.addWidget(self.tabWidget)
@@ -85,6 +95,7 @@ class Ui_Dialog(object):
         self.theme_cb.setItemText(1, QCoreApplication.translate("Dialog", u"Dark", None))
 
         self.theme_label.setText(QCoreApplication.translate("Dialog", u"Theme", None))
+        self.scan_order_label.setText(QCoreApplication.translate("Dialog", u"Scan Order", None))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.general), QCoreApplication.translate("Dialog", u"General", None))
     # retranslateUi
 
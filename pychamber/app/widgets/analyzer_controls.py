@@ -5,6 +5,8 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     import skrf
 
+    from pychamber.capture import BulkCapture, SDataReader
+
 import functools
 import itertools
 from operator import setitem
@@ -17,6 +19,7 @@ from skrf.vi import vna
 from pychamber.app.logger import LOG
 from pychamber.app.task_runner import TaskRunner
 from pychamber.app.ui.analyzer_widget import Ui_AnalyzerWidget
+from pychamber.capture import reader_for
 from pychamber.settings import CONF
 
 
@@ -192,6 +195,14 @@ class AnalyzerControls(QWidget, Ui_AnalyzerWidget):
     def frequency(self) -> skrf.Frequency:
         return self.analyzer.ch1.frequency
 
+    @property
+    def if_bandwidth(self) -> float:
+        return self.analyzer.ch1.if_bandwidth
+
+    def create_reader(self, polarizations: list[tuple[str, int, int]]) -> SDataReader | BulkCapture:
+        """Create the fastest reader of the connected analyzer for a scan. See `pychamber.capture`"""
+        return reader_for(self.analyzer, polarizations)
+
     def add_models(self) -> None:
         for manufacturer, models in self.available_analyzer_models.items():
             self.model_cb.add_parent(manufacturer)
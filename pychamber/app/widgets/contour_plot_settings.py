@@ -3,17 +3,14 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import Callable
-
     from pychamber import ExperimentResult
+    from pychamber.experiment_result import DirtyRegions
 
 import numpy as np
 import pyqtgraph as pg
 from qtpy.QtCore import QThreadPool
 from qtpy.QtWidgets import QWidget
-from skrf import mathFunctions
 
-from pychamber import math_fns
 from pychamber.app.logger import LOG
 from pychamber.app.task_runner import TaskRunner
 
@@ -24,8 +21,8 @@ from .plot_widget import PlotWidget
 
 class ContourPlotSettings(QWidget, Ui_ContourPlotSettings):
     z_params = [
-        ("Magnitude [linear]", mathFunctions.complex_2_magnitude),
-        ("Magnitude [dB]", math_fns.clean_complex_to_db),
+        ("Magnitude [linear]", "magnitude"),
+        ("Magnitude [dB]", "db"),
     ]
 
     def __init__(self, parent: QWidget | None = None) -> None:
@@ -87,7 +84,7 @@ class ContourPlotWidget(PlotWidget):
         self.controls.cmap_cb.currentTextChanged.connect(self.plot.setCmap)
         self.controls.calibrated_checkbox.toggled.connect(lambda _: self.on_new_data())
         if self.data is not None:
-            self.data.dataAppended.connect(self.on_new_data)
+            self.data.dataAppended.connect(self.on_data_appended)
 
         self.plot.newZBounds.connect(self.controls.on_new_z_bounds)
 
@@ -105,7 +102,7 @@ class ContourPlotWidget(PlotWidget):
         LOG.debug("Setting data")
         self._data = result
         if self.data is not None:
-            self.data.dataAppended.connect(self.on_new_data)
+            self.data.dataAppended.connect(self.on_data_appended)
         self.on_new_data()
 
     def on_bg_color_changed(self, color):
@@ -114,7 +111,7 @@ class ContourPlotWidget(PlotWidget):
     @staticmethod
     def get_data(
         data: ExperimentResult,
-        z_func: Callable,
+        z_quantity: str,
         pol: str,
         f: float,
         calibrated: bool
@@ -125,13 +122,16 @@ class ContourPlotWidget(PlotWidget):
         data.rw_lock.lockForRead()
         x_data = data.phis
         y_data = data.thetas
-        vals = data.get_3d_data(pol, f, calibrated=calibrated)
+        z_data = data.get_3d_data(pol, f, calibrated=calibrated, quantity=z_quantity)
         data.rw_lock.unlock()
 
-        z_data = z_func(vals)
-
         return (x_data, y_data, z_data)
 
+    def on_data_appended(self, dirty: DirtyRegions) -> None:
+        if self.controls.pol_cb.count() > 0 and not dirty.intersects(self.controls.pol_cb.currentText()):
+            return
+        self.on_new_data()
+
     def on_new_data(self):
         LOG.debug("Got new data")
         if self.data is None:
@@ -144,7 +144,7 @@ class ContourPlotWidget(PlotWidget):
             self.controls.pol_cb.clear()
             self.controls.pol_cb.addItems(self.data.polarizations)
 
-        z_func = self.controls.z_var_cb.currentData()
+        z_quantity = self.controls.z_var_cb.currentData()
         pol = self.controls.pol_cb.currentText()
         freq = self.controls.freq_le.value()
         if freq is None:
@@ -158,7 +158,7 @@ class ContourPlotWidget(PlotWidget):
         data_grabber = TaskRunner(
             self.get_data,
             data=self.data,
-            z_func=z_func,
+            z_quantity=z_quantity,
             pol=pol,
             f=freq,
             calibrated=calibrated
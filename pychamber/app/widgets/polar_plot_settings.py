@@ -3,9 +3,8 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import Callable
-
     from pychamber import ExperimentResult
+    from pychamber.experiment_result import DirtyRegions
 
 import functools
 
@@ -14,9 +13,7 @@ import pyqtgraph as pg
 import qtawesome as qta
 from qtpy.QtCore import QThreadPool, Signal
 from qtpy.QtWidgets import QWidget
-from skrf import mathFunctions
 
-from pychamber import math_fns
 from pychamber.app.logger import LOG
 from pychamber.app.task_runner import TaskRunner
 
@@ -34,7 +31,7 @@ class PolarTraceSettings(QWidget, Ui_PolarTraceSettings):
         plot_item: pg.PlotDataItem,
         data: ExperimentResult,
         ang_param: str,
-        r_func: Callable,
+        r_quantity: str,
         parent: QWidget | None = None,
     ) -> None:
         super().__init__(parent)
@@ -44,7 +41,7 @@ class PolarTraceSettings(QWidget, Ui_PolarTraceSettings):
         self.plot_item = plot_item
         self.data = data
         self._ang_param = ang_param
-        self._r_func = r_func
+        self._r_quantity = r_quantity
         self.set_ang_mode(self.ang_param)
 
         x_icon = qta.icon("fa5s.times-circle")
@@ -62,7 +59,7 @@ class PolarTraceSettings(QWidget, Ui_PolarTraceSettings):
         self.phi_lsb.valueChanged.connect(self.on_new_data)
         self.calibrated_checkbox.toggled.connect(lambda _: self.on_new_data())
         if self.data is not None:
-            self.data.dataAppended.connect(self.on_new_data)
+            self.data.dataAppended.connect(self.on_data_appended)
 
     def on_pen_settings_changed(self):
         pen = pg.mkPen(self.trace_color_btn.color(), width=self.trace_width_dsb.value())
@@ -76,7 +73,7 @@ class PolarTraceSettings(QWidget, Ui_PolarTraceSettings):
     def get_data(
         data: ExperimentResult,
         ang_param: str,
-        r_func: Callable,
+        r_quantity: str,
         pol: str,
         f: float,
         theta: float,
@@ -89,14 +86,12 @@ class PolarTraceSettings(QWidget, Ui_PolarTraceSettings):
         data.rw_lock.lockForRead()
         if ang_param == "thetas":
             ang_data = data.thetas
-            vals = data.get_theta_cut(pol, f, phi, calibrated=calibrated)
+            r_data = data.get_theta_cut(pol, f, phi, calibrated=calibrated, quantity=r_quantity)
         elif ang_param == "phis":
             ang_data = data.phis
-            vals = data.get_phi_cut(pol, f, theta, calibrated=calibrated)
+            r_data = data.get_phi_cut(pol, f, theta, calibrated=calibrated, quantity=r_quantity)
         data.rw_lock.unlock()
 
-        r_data = r_func(vals)
-
         return (ang_data, r_data)
 
     def on_get_data_result(self, result: tuple[np.ndarray, np.ndarray] | None):
@@ -108,6 +103,16 @@ class PolarTraceSettings(QWidget, Ui_PolarTraceSettings):
         self.plot_item.r = result[1]
         self.requestRedraw.emit(self.plot_item)
 
+    def on_data_appended(self, dirty: DirtyRegions) -> None:
+        # The spinboxes hold every phi / theta in the result, so their
+        # positions are the indices of the cut being shown
+        if self.pol_cb.count() > 0:
+            if self.ang_param == "thetas" and not dirty.intersects(self.polarization, phi_idx=self.phi_lsb.value()):
+                return
+            if self.ang_param == "phis" and not dirty.intersects(self.polarization, theta_idx=self.theta_lsb.value()):
+                return
+        self.on_new_data()
+
     def on_new_data(self):
         LOG.debug("Got new data")
         if self.data is None:
@@ -124,7 +129,7 @@ class PolarTraceSettings(QWidget, Ui_PolarTraceSettings):
         self.theta_lsb.setValues(self.data.thetas)
 
         ang_param = self.ang_param
-        r_func = self.r_func
+        r_quantity = self.r_quantity
         pol = self.polarization
         freq = self.freq_le.value()
         if freq is None:
@@ -142,7 +147,7 @@ class PolarTraceSettings(QWidget, Ui_PolarTraceSettings):
             self.get_data,
             data=self.data,
             ang_param=ang_param,
-            r_func=r_func,
+            r_quantity=r_quantity,
             pol=pol,
             f=freq,
             phi=phi,
@@ -163,12 +168,12 @@ class PolarTraceSettings(QWidget, Ui_PolarTraceSettings):
         self.on_new_data()
 
     @property
-    def r_func(self) -> str:
-        return self._r_func
+    def r_quantity(self) -> str:
+        return self._r_quantity
 
-    @r_func.setter
-    def r_func(self, func: Callable) -> None:
-        self._r_func = func
+    @r_quantity.setter
+    def r_quantity(self, quantity: str) -> None:
+        self._r_quantity = quantity
         self.on_new_data()
 
     @property
@@ -182,8 +187,8 @@ class PolarPlotSettings(QWidget, Ui_PolarPlotSettings):
         ("Theta (Elevation)", ("thetas", "°")),
     ]
     r_params = [
-        ("Magnitude [linear]", (mathFunctions.complex_2_magnitude, "")),
-        ("Magnitude [dB]", (math_fns.clean_complex_to_db, "dB")),
+        ("Magnitude [linear]", ("magnitude", "")),
+        ("Magnitude [dB]", ("db", "dB")),
     ]
 
     def __init__(self, parent: QWidget | None = None) -> None:
@@ -255,7 +260,7 @@ class PolarPlotWidget(PlotWidget):
         for trace in self._traces:
             trace.data = self._data
             if self.data is not None:
-                self.data.dataAppended.connect(trace.on_new_data)
+                self.data.dataAppended.connect(trace.on_data_appended)
             trace.on_new_data()
 
     def on_bg_color_changed(self, color):
@@ -269,7 +274,7 @@ class PolarPlotWidget(PlotWidget):
     def on_rvar_changed(self):
         r_param = self.controls.r_var_cb.currentData()
         for tr in self._traces:
-            tr.r_func = r_param[0]
+            tr.r_quantity = r_param[0]
 
     def on_autoscale_toggled(self, state: bool):
         self.controls.min_label.setHidden(state)
@@ -299,8 +304,10 @@ class PolarPlotWidget(PlotWidget):
         LOG.debug("Adding trace")
         plot_item = self.plot.plot()
         initial_ang_param = self.controls.ang_var_cb.currentData()[0]
-        initial_r_func = self.controls.r_var_cb.currentData()[0]
-        tr = PolarTraceSettings(plot_item, self.data, ang_param=initial_ang_param, r_func=initial_r_func, parent=self)
+        initial_r_quantity = self.controls.r_var_cb.currentData()[0]
+        tr = PolarTraceSettings(
+            plot_item, self.data, ang_param=initial_ang_param, r_quantity=initial_r_quantity, parent=self
+        )
         tr.remove_polar_trace.pressed.connect(functools.partial(self.on_remove_trace_btn_pressed, tr))
         tr.requestRedraw.connect(self.plot.redrawItem)
         self._traces.append(tr)
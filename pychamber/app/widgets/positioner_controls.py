@@ -9,7 +9,7 @@ import functools
 from operator import setitem
 
 import qtawesome as qta
-from qtpy.QtCore import QEventLoop, QThread, QTimer, Signal
+from qtpy.QtCore import QThread, Signal
 from qtpy.QtGui import QCloseEvent
 from qtpy.QtWidgets import QMessageBox, QWidget
 from serial.tools import list_ports
@@ -132,6 +132,7 @@ class PositionerControls(QWidget, Ui_PositionerWidget):
 
     def on_disconnect_btn_clicked(self) -> None:
         LOG.info("Disconnecting from positioner")
+        self.positioner.close()
         self.positioner = None
         self.connect_btn.show()
         self.disconnect_btn.hide()
@@ -197,24 +198,8 @@ class PositionerControls(QWidget, Ui_PositionerWidget):
 
     def on_return_to_origin_pressed(self) -> None:
         LOG.debug("Returning to origin")
-        jog_phi_zero_fn = functools.partial(self.positioner.move_phi_absolute, 0)
-        jog_theta_zero_fn = functools.partial(self.positioner.move_theta_absolute, 0)
-        # Need to enable and disable on our own because
-        # _wait_for runs its own event loop
-        self.enable_on_jog_completed = False
-        self.set_enabled(False)
-        self._wait_for(
-            jog_phi_zero_fn,
-            self.positioner.jogCompleted,
-            timeout=None,
-        )
-        self._wait_for(
-            jog_theta_zero_fn,
-            self.positioner.jogCompleted,
-            timeout=None,
-        )
-        self.enable_on_jog_completed = True
-        self.set_enabled(True)
+        jog_fn = functools.partial(self.positioner.move_absolute, 0, 0)
+        self.run_jog_thread(jog_fn)
 
     def on_jog_started(self) -> None:
         LOG.debug("Jog starting")
@@ -251,16 +236,3 @@ class PositionerControls(QWidget, Ui_PositionerWidget):
     def run_jog_thread(self, jog_fn: Callable) -> None:
         self.jog_thread.run = jog_fn
         self.jog_thread.start()
-
-    def _wait_for(self, fn: Callable, signal, timeout: int | None = 5000) -> None:
-        event_loop = QEventLoop()
-        signal.connect(event_loop.quit)
-        QTimer.singleShot(0, fn)
-
-        if timeout is not None:
-            timer = QTimer()
-            timer.setSingleShot(True)
-            timer.timeout.connect(event_loop.quit)
-            timer.start()
-
-        event_loop.exec()
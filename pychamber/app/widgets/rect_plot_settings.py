@@ -3,9 +3,8 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import Callable
-
     from pychamber import ExperimentResult
+    from pychamber.experiment_result import DirtyRegions
 
 import functools
 
@@ -14,7 +13,6 @@ import pyqtgraph as pg
 import qtawesome as qta
 from qtpy.QtCore import QThreadPool
 from qtpy.QtWidgets import QWidget
-from skrf import mathFunctions
 
 from pychamber.app.logger import LOG
 from pychamber.app.task_runner import TaskRunner
@@ -30,7 +28,7 @@ class RectTraceSettings(QWidget, Ui_RectTraceSettings):
         plot_item: pg.PlotDataItem,
         data: ExperimentResult,
         x_param: str,
-        y_func: str,
+        y_quantity: str,
         parent: QWidget | None = None,
     ) -> None:
         super().__init__(parent)
@@ -40,7 +38,7 @@ class RectTraceSettings(QWidget, Ui_RectTraceSettings):
         self.plot_item = plot_item
         self.data = data
         self._x_param = x_param
-        self._y_func = y_func
+        self._y_quantity = y_quantity
 
         x_icon = qta.icon("fa5s.times-circle")
         self.remove_rect_trace.setIcon(x_icon)
@@ -57,7 +55,7 @@ class RectTraceSettings(QWidget, Ui_RectTraceSettings):
         self.pol_cb.activated.connect(self.on_new_data)
         self.calibrated_checkbox.toggled.connect(lambda _: self.on_new_data())
         if self.data is not None:
-            self.data.dataAppended.connect(self.on_new_data)
+            self.data.dataAppended.connect(self.on_data_appended)
 
     def on_pen_settings_changed(self):
         pen = pg.mkPen(self.trace_color_btn.color(), width=self.trace_width_dsb.value())
@@ -77,7 +75,7 @@ class RectTraceSettings(QWidget, Ui_RectTraceSettings):
     def get_data(
         data: ExperimentResult,
         x_param: str,
-        y_func: Callable,
+        y_quantity: str,
         pol: str,
         f: float,
         phi: float,
@@ -90,17 +88,15 @@ class RectTraceSettings(QWidget, Ui_RectTraceSettings):
         data.rw_lock.lockForRead()
         if x_param == "f":
             x_data = data.f
-            vals = data.get_over_freq_vals(pol, theta, phi, calibrated=calibrated)
+            y_data = data.get_over_freq_vals(pol, theta, phi, calibrated=calibrated, quantity=y_quantity)
         elif x_param == "thetas":
             x_data = data.thetas
-            vals = data.get_theta_cut(pol, f, phi, calibrated=calibrated)
+            y_data = data.get_theta_cut(pol, f, phi, calibrated=calibrated, quantity=y_quantity)
         elif x_param == "phis":
             x_data = data.phis
-            vals = data.get_phi_cut(pol, f, theta, calibrated=calibrated)
+            y_data = data.get_phi_cut(pol, f, theta, calibrated=calibrated, quantity=y_quantity)
         data.rw_lock.unlock()
 
-        y_data = y_func(vals)
-
         return (x_data, y_data)
 
     def on_get_data_result(self, result: tuple[np.ndarray, np.ndarray] | None):
@@ -110,6 +106,16 @@ class RectTraceSettings(QWidget, Ui_RectTraceSettings):
 
         self.plot_item.setData(result[0], result[1])
 
+    def on_data_appended(self, dirty: DirtyRegions) -> None:
+        # The spinboxes hold every phi / theta in the result, so their
+        # positions are the indices of the slice being shown
+        if self.pol_cb.count() > 0:
+            phi_idx = self.phi_lsb.value() if self.x_param in ("f", "thetas") else None
+            theta_idx = self.theta_lsb.value() if self.x_param in ("f", "phis") else None
+            if not dirty.intersects(self.polarization, phi_idx=phi_idx, theta_idx=theta_idx):
+                return
+        self.on_new_data()
+
     def on_new_data(self):
         LOG.debug("Got new data")
         if self.data is None:
@@ -126,7 +132,7 @@ class RectTraceSettings(QWidget, Ui_RectTraceSettings):
         self.theta_lsb.setValues(self.data.thetas)
 
         x_param = self.x_param
-        y_func = self.y_func
+        y_quantity = self.y_quantity
         pol = self.polarization
         freq = self.freq_le.value()
         if freq is None:
@@ -143,7 +149,7 @@ class RectTraceSettings(QWidget, Ui_RectTraceSettings):
             self.get_data,
             data=self.data,
             x_param=x_param,
-            y_func=y_func,
+            y_quantity=y_quantity,
             pol=pol,
             f=freq,
             phi=phi,
@@ -167,12 +173,12 @@ class RectTraceSettings(QWidget, Ui_RectTraceSettings):
         self.on_new_data()
 
     @property
-    def y_func(self) -> Callable:
-        return self._y_func
+    def y_quantity(self) -> str:
+        return self._y_quantity
 
-    @y_func.setter
-    def y_func(self, func: Callable) -> None:
-        self._y_func = func
+    @y_quantity.setter
+    def y_quantity(self, quantity: str) -> None:
+        self._y_quantity = quantity
         self.on_new_data()
 
     @property
@@ -188,20 +194,10 @@ class RectPlotSettings(QWidget, Ui_RectPlotSettings):
     ]
 
     y_params = [
-        ("Magnitude [linear]", ("Magnitude", mathFunctions.complex_2_magnitude, "")),
-        (
-            "Magnitude [dB]",
-            ("Magnitude", lambda data: mathFunctions.complex_2_db(np.where(data == 0, 1e-20, data)), "dB"),
-        ),
-        ("Phase", ("Phase", mathFunctions.complex_2_degree, "°")),
-        (
-            "Unwrapped Phase",
-            (
-                "Phase [unwrapped]",
-                lambda data: np.unwrap(np.deg2rad(mathFunctions.complex_2_degree(data)), axis=0),
-                "°",
-            ),
-        ),
+        ("Magnitude [linear]", ("Magnitude", "magnitude", "")),
+        ("Magnitude [dB]", ("Magnitude", "db", "dB")),
+        ("Phase", ("Phase", "phase", "°")),
+        ("Unwrapped Phase", ("Phase [unwrapped]", "unwrapped_phase", "°")),
     ]
 
     def __init__(self, parent: QWidget | None = None) -> None:
@@ -261,7 +257,7 @@ class RectPlotWidget(PlotWidget):
         for trace in self._traces:
             trace.data = self._data
             if self.data is not None:
-                self.data.dataAppended.connect(trace.on_new_data)
+                self.data.dataAppended.connect(trace.on_data_appended)
             trace.on_new_data()
 
     def on_bg_color_changed(self, color):
@@ -285,7 +281,7 @@ class RectPlotWidget(PlotWidget):
     def on_yvar_changed(self):
         y_param = self.controls.y_var_cb.currentData()
         for tr in self._traces:
-            tr.y_func = y_param[1]
+            tr.y_quantity = y_param[1]
 
         label_params = {"text": y_param[0]}
         label_params["units"] = y_param[2]
@@ -317,8 +313,10 @@ class RectPlotWidget(PlotWidget):
         LOG.debug("Adding trace")
         plot_item = self.plot.plot()
         initial_x_param = self.controls.x_var_cb.currentData()[1]
-        initial_y_func = self.controls.y_var_cb.currentData()[1]
-        tr = RectTraceSettings(plot_item, self.data, x_param=initial_x_param, y_func=initial_y_func, parent=self)
+        initial_y_quantity = self.controls.y_var_cb.currentData()[1]
+        tr = RectTraceSettings(
+            plot_item, self.data, x_param=initial_x_param, y_quantity=initial_y_quantity, parent=self
+        )
         tr.remove_rect_trace.pressed.connect(functools.partial(self.on_remove_trace_btn_pressed, tr))
         self._traces.append(tr)
         self.controls.layout().insertWidget(self.controls.layout().count() - 2, tr)
@@ -1,10 +1,14 @@
-from qtpy.QtCore import Signal
-from qtpy.QtWidgets import QDialog, QWidget, QFileDialog, QMessageBox
+import functools
+from operator import setitem
 
-from pyvisa import ResourceManager, LibraryError
+from pyvisa import LibraryError, ResourceManager
+from qtpy.QtCore import Signal
+from qtpy.QtWidgets import QDialog, QFileDialog, QMessageBox, QWidget
 
-from pychamber.settings import CONF
 from pychamber.app.ui.settings import Ui_Dialog
+from pychamber.planner import PLANNED_ORDER
+from pychamber.scan import SCAN_ORDERS
+from pychamber.settings import CONF
 
 
 class SettingsDialog(QDialog, Ui_Dialog):
@@ -32,6 +36,8 @@ class SettingsDialog(QDialog, Ui_Dialog):
         self.backend_cb.insertSeparator(self.backend_cb.count())
         self.backend_cb.addItem("Browse...")
 
+        self.scan_order_cb.addItems([*SCAN_ORDERS, PLANNED_ORDER])
+
     def update_widgets(self):
         current_backend = CONF["visalib"]
         if current_backend is not None:
@@ -50,6 +56,7 @@ class SettingsDialog(QDialog, Ui_Dialog):
     def connect_signals(self):
         self.backend_cb.currentTextChanged.connect(self.backend_changed)
         self.theme_cb.currentTextChanged.connect(self.theme_changed.emit)
+        self.scan_order_cb.currentTextChanged.connect(functools.partial(setitem, CONF, "scan_order"))
 
     def backend_changed(self, backend: str):
         if backend == "Browse...":
@@ -3,16 +3,14 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import Callable
-
     from pychamber import ExperimentResult
+    from pychamber.experiment_result import DirtyRegions
 
 import numpy as np
 import pyqtgraph as pg
 import pyqtgraph.opengl as gl
 from qtpy.QtCore import QPointF, QThreadPool
 from qtpy.QtWidgets import QWidget
-from skrf import mathFunctions
 
 from pychamber import math_fns
 from pychamber.app.logger import LOG
@@ -26,8 +24,8 @@ from .spherical_grid import GLSphericalGridItem
 
 class ThreeDPlotSettings(QWidget, Ui_ThreeDPlotSettings):
     r_params = [
-        ("Magnitude [linear]", mathFunctions.complex_2_magnitude),
-        ("Magnitude [dB]", math_fns.clean_complex_to_db),
+        ("Magnitude [linear]", "magnitude"),
+        ("Magnitude [dB]", "db"),
     ]
 
     def __init__(self, parent: QWidget | None = None) -> None:
@@ -99,7 +97,7 @@ class ThreeDPlotWidget(PlotWidget):
         )
         self.controls.calibrated_checkbox.toggled.connect(lambda _: self.on_new_data())
         if self.data is not None:
-            self.data.dataAppended.connect(self.on_new_data)
+            self.data.dataAppended.connect(self.on_data_appended)
 
     def set_colors(self):
         if CONF["theme"] == "Light":
@@ -122,7 +120,7 @@ class ThreeDPlotWidget(PlotWidget):
         LOG.debug("Setting data")
         self._data = result
         if self.data is not None:
-            self.data.dataAppended.connect(self.on_new_data)
+            self.data.dataAppended.connect(self.on_data_appended)
             self.init_spherical_plot()
         self.on_new_data()
 
@@ -170,7 +168,7 @@ class ThreeDPlotWidget(PlotWidget):
     @staticmethod
     def get_data(
         data: ExperimentResult,
-        r_func: Callable,
+        r_quantity: str,
         pol: str,
         f: float,
         calibrated: bool
@@ -179,13 +177,16 @@ class ThreeDPlotWidget(PlotWidget):
             return None
 
         data.rw_lock.lockForRead()
-        vals = data.get_3d_data(pol, f, calibrated=calibrated)
+        r_data = data.get_3d_data(pol, f, calibrated=calibrated, quantity=r_quantity)
         data.rw_lock.unlock()
 
-        r_data = r_func(vals)
-
         return r_data
 
+    def on_data_appended(self, dirty: DirtyRegions) -> None:
+        if self.controls.pol_cb.count() > 0 and not dirty.intersects(self.controls.pol_cb.currentText()):
+            return
+        self.on_new_data()
+
     def on_new_data(self):
         LOG.debug("Got new data")
         if self.data is None:
@@ -201,7 +202,7 @@ class ThreeDPlotWidget(PlotWidget):
             self.controls.pol_cb.clear()
             self.controls.pol_cb.addItems(self.data.polarizations)
 
-        r_func = self.controls.r_var_cb.currentData()
+        r_quantity = self.controls.r_var_cb.currentData()
         pol = self.controls.pol_cb.currentText()
         freq = self.controls.freq_le.value()
         if freq is None:
@@ -215,7 +216,7 @@ class ThreeDPlotWidget(PlotWidget):
         data_grabber = TaskRunner(
             self.get_data,
             data=self.data,
-            r_func=r_func,
+            r_quantity=r_quantity,
             pol=pol,
             f=freq,
             calibrated=calibrated
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from pathlib import Path
 
+import numpy as np
 import skrf
 
 
@@ -41,6 +42,9 @@ class Calibration:
         else:
             raise TypeError(f"Networks must be a list of skrf.Network or a skrf.NetworkSet. Got {type(networks)}")
 
+        # (polarization, frequencies) -> interpolated data
+        self._interpolated: dict[tuple[str, bytes], np.ndarray] = {}
+
     def __getitem__(self, key: str) -> skrf.Network:
         return self._data.to_dict()[key]
 
@@ -92,3 +96,25 @@ class Calibration:
             (skrf.network.Network): The data for the requested polarization
         """
         return self._data.sel({"polarization": polarization})[0]
+
+    def get_interpolated(self, polarization: str, frequency: skrf.Frequency) -> np.ndarray:
+        """Get the data for the named polarization at the specified frequencies.
+
+        Each frequency takes the value of the nearest calibration frequency.
+        The result is cached, so applying the calibration to many data points
+        at the same frequencies only interpolates once.
+
+        Args:
+            polarization: The name of the polarization
+            frequency: The frequencies to interpolate to
+
+        Returns:
+            (np.ndarray): The (read-only) complex data at each frequency
+        """
+        key = (polarization, frequency.f.tobytes())
+        if key not in self._interpolated:
+            ntwk = self.get_polarization(polarization).interpolate(frequency, kind="nearest")
+            data = ntwk.s.reshape(-1).copy()
+            data.flags.writeable = False
+            self._interpolated[key] = data
+        return self._interpolated[key]
@@ -0,0 +1,173 @@
+"""Reading the data of every polarization at a point from a VNA.
+
+The simplest way to read a polarization is the VNA's `get_sdata(a, b)`, but
+that triggers a sweep and a separate transfer for every polarization, even
+though a single sweep of a multiport VNA measures all of them.
+
+`BulkCapture` instead sets up every S-parameter needed as a measurement once,
+when the scan starts, and then reads each point with one sweep and one bulk
+transfer of all of them. The sweep and the transfer are also separate, so with
+`pychamber.pipeline.AcquisitionPipeline` the transfer happens while the
+positioner moves to the next point.
+
+Use `reader_for` to get the best reader for an analyzer.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from skrf.vi.vna import VNA
+
+import itertools
+
+import numpy as np
+import skrf
+
+
+class SDataReader:
+    """Reads polarizations using the VNA's `get_sdata`.
+
+    This works with any VNA, but `get_sdata` sweeps and transfers in one call,
+    so everything happens in `sweep`, once per polarization.
+    """
+
+    def __init__(self, analyzer: VNA, polarizations: list[tuple[str, int, int]]) -> None:
+        """
+        Args:
+            analyzer: The network analyzer
+            polarizations: List of (name, a, b) to read
+        """
+        self.analyzer = analyzer
+        self.polarizations = polarizations
+        self._ntwks: list[skrf.Network] = []
+
+    def setup(self) -> None:
+        pass
+
+    def teardown(self) -> None:
+        pass
+
+    def sweep(self) -> None:
+        self._ntwks = [self.analyzer.ch1.get_sdata(a, b) for _, a, b in self.polarizations]
+
+    def fetch(self) -> list[skrf.Network]:
+        ntwks, self._ntwks = self._ntwks, []
+        return ntwks
+
+
+class BulkCapture:
+    """Reads every polarization from one sweep with one bulk transfer.
+
+    This uses the SCPI commands of Keysight PNA-family analyzers (the same ones
+    scikit-rf's `get_snp_network` uses). Every S-parameter between the ports
+    the polarizations use is set up as a measurement in `setup`, so that all
+    of those ports are driven by each sweep.
+    """
+
+    MEASUREMENT_PREFIX = "PYCHAMBER"
+
+    def __init__(self, analyzer: VNA, polarizations: list[tuple[str, int, int]]) -> None:
+        """
+        Args:
+            analyzer: The network analyzer
+            polarizations: List of (name, a, b) to read
+        """
+        self.analyzer = analyzer
+        self.channel = analyzer.ch1
+        self.polarizations = polarizations
+        self.ports = sorted({port for _, a, b in polarizations for port in (a, b)})
+
+        self._measurements: list[str] = []
+        self._frequency: skrf.Frequency | None = None
+        self._original_query_format = None
+        self._original_snp_format: str | None = None
+
+    def __enter__(self) -> BulkCapture:
+        self.setup()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.teardown()
+
+    def setup(self) -> None:
+        """Set up the measurements and data formats. Call once, before the first sweep."""
+        from skrf.vi.vna import ValuesFormat
+
+        channel = self.channel
+        self._frequency = channel.frequency
+        self.analyzer.active_channel = channel
+        self._original_query_format = self.analyzer.query_format
+        self.analyzer.query_format = ValuesFormat.BINARY_64
+        self._original_snp_format = channel.query("MMEM:STOR:TRAC:FORM:SNP?").strip()
+        channel.write("MMEM:STOR:TRACE:FORM:SNP RI")
+
+        for a, b in itertools.product(self.ports, repeat=2):
+            name = f"CH{channel.cnum}_{self.MEASUREMENT_PREFIX}_S{a}{b}"
+            channel.create_measurement(name, f"S{a}{b}")
+            self._measurements.append(name)
+
+    def teardown(self) -> None:
+        """Remove the measurements and restore the data formats."""
+        for name in self._measurements:
+            self.channel.delete_measurement(name)
+        self._measurements = []
+        if self._original_snp_format is not None:
+            self.channel.write(f"MMEM:STOR:TRACE:FORM:SNP {self._original_snp_format}")
+            self._original_snp_format = None
+        if self._original_query_format is not None:
+            self.analyzer.query_format = self._original_query_format
+            self._original_query_format = None
+
+    def sweep(self) -> None:
+        """Sweep every measurement once."""
+        self.channel.sweep()
+
+    def fetch(self) -> list[skrf.Network]:
+        """Transfer the data of the last sweep.
+
+        Returns:
+            list[skrf.Network]: The data of each polarization, in order
+
+        Raises:
+            RuntimeError: If `setup` hasn't been called
+        """
+        if self._frequency is None:
+            raise RuntimeError("BulkCapture.setup must be called before reading data")
+
+        # A sweep may still be running, e.g. on slow sweeps that outlast the
+        # timeout of `sweep`
+        self.analyzer.wait_for_complete()
+        port_str = ",".join(str(port) for port in self.ports)
+        raw = self.channel.query_values(f"CALC{self.channel.cnum}:DATA:SNP:PORTS? '{port_str}'", container=np.array)
+        # Rows of frequency, then the real and imaginary parts of S11, S12,
+        # ..., S21, ... in order
+        rows = np.asarray(raw, dtype=float).reshape((-1, len(self._frequency)))[1:]
+
+        n_ports = len(self.ports)
+        ntwks = []
+        for _, a, b in self.polarizations:
+            i = self.ports.index(a) * n_ports + self.ports.index(b)
+            s = rows[2 * i] + 1j * rows[2 * i + 1]
+            ntwks.append(skrf.Network(frequency=self._frequency, s=s.reshape((-1, 1, 1))))
+        return ntwks
+
+
+def reader_for(analyzer: VNA, polarizations: list[tuple[str, int, int]]) -> SDataReader | BulkCapture:
+    """Get the fastest reader that supports an analyzer.
+
+    Args:
+        analyzer: The network analyzer
+        polarizations: List of (name, a, b) to read
+
+    Returns:
+        SDataReader | BulkCapture: A `BulkCapture` for PNA-family analyzers, otherwise an `SDataReader`
+    """
+    try:
+        from skrf.vi.vna.keysight import PNA
+    except ImportError:
+        PNA = None
+
+    if PNA is not None and isinstance(analyzer, PNA):
+        return BulkCapture(analyzer, polarizations)
+    return SDataReader(analyzer, polarizations)
@@ -0,0 +1,185 @@
+"""Continuous-motion ("on-the-fly") scanning.
+
+Step-and-stop scanning spends most of its time accelerating, decelerating and
+settling the positioner. In a continuous scan, phi instead rotates through
+each cut at a constant speed while the VNA sweeps over and over. Each sweep is
+tagged with the times it started and ended and the angle the positioner was at
+in between, and the sweeps are then resampled onto the phi grid of the result
+(see `ExperimentResult.append_continuous`).
+
+The positioner must support constant-velocity moves and reading its position
+while moving (`Positioner.start_phi_sweep` and `Positioner.read_phi`).
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import skrf
+
+    from pychamber.pipeline import Reader
+    from pychamber.positioner import Positioner
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+RESAMPLE_METHODS = ("interpolate", "bin")
+
+
+@dataclass
+class TaggedSweep:
+    """The data of one sweep of a continuous scan.
+
+    Attributes:
+        start: When the sweep started (from `time.monotonic`)
+        end: When the sweep ended (from `time.monotonic`)
+        phi: The angle of the positioner halfway through the sweep
+        ntwks: The data of each polarization
+    """
+
+    start: float
+    end: float
+    phi: float
+    ntwks: list[skrf.Network]
+
+
+def resample(angles, values: np.ndarray, grid, method: str = "interpolate") -> np.ndarray:
+    """Resample data taken at arbitrary angles onto a grid.
+
+    Args:
+        angles: The angle of each sample (in degrees)
+        values: The samples, with the first axis matching `angles`
+        grid: The angles to resample onto (in degrees)
+        method: One of `RESAMPLE_METHODS`. "interpolate" linearly interpolates
+            between the samples either side of each grid angle, clamping to
+            the first and last sample. "bin" averages the samples closer to
+            each grid angle than to any other
+
+    Returns:
+        np.ndarray: The resampled data, with the first axis matching `grid`
+
+    Raises:
+        ValueError: If the method is unknown, there are no samples, or a bin
+            has no samples in it
+    """
+    if method not in RESAMPLE_METHODS:
+        raise ValueError(f"Unknown resampling method {method!r}. Must be one of {RESAMPLE_METHODS}")
+    angles = np.asarray(angles, dtype=float)
+    values = np.asarray(values)
+    grid = np.asarray(grid, dtype=float)
+    if len(angles) == 0:
+        raise ValueError("Can't resample without any samples")
+
+    order = np.argsort(angles, kind="stable")
+    angles = angles[order]
+    values = values[order]
+
+    if method == "interpolate":
+        if len(angles) == 1:
+            return np.repeat(values, len(grid), axis=0)
+        hi = np.clip(np.searchsorted(angles, grid), 1, len(angles) - 1)
+        lo = hi - 1
+        span = angles[hi] - angles[lo]
+        weight = np.divide(grid - angles[lo], span, out=np.zeros_like(grid), where=span > 0)
+        weight = np.clip(weight, 0.0, 1.0).reshape((-1,) + (1,) * (values.ndim - 1))
+        return (1 - weight) * values[lo] + weight * values[hi]
+
+    grid_order = np.argsort(grid, kind="stable")
+    sorted_grid = grid[grid_order]
+    edges = (sorted_grid[1:] + sorted_grid[:-1]) / 2
+    bins = np.searchsorted(edges, angles)
+    counts = np.bincount(bins, minlength=len(grid))
+    if np.any(counts == 0):
+        empty = sorted_grid[np.argmax(counts == 0)]
+        raise ValueError(f"No samples were taken near {empty} degrees. Slow the scan down or use interpolation")
+
+    sums = np.zeros((len(grid),) + values.shape[1:], dtype=np.result_type(values, float))
+    np.add.at(sums, bins, values)
+    binned = sums / counts.reshape((-1,) + (1,) * (values.ndim - 1))
+    out = np.empty_like(binned)
+    out[grid_order] = binned
+    return out
+
+
+class ContinuousScan:
+    """Measures cuts while phi rotates at a constant speed.
+
+    Each cut starts and ends with a sweep with the positioner stopped, so the
+    ends of the cut are measured exactly. The first of those also times the
+    sweeps, which is used to choose the speed if one isn't given.
+    """
+
+    def __init__(
+        self, positioner: Positioner, reader: Reader, speed: float | None = None, oversample: float = 2.0
+    ) -> None:
+        """
+        Args:
+            positioner: The positioner. Must support `start_phi_sweep`
+            reader: Reads the VNA. Should already be set up
+            speed: How fast to rotate phi (in degrees/second). If None, the
+                speed is chosen so that `oversample` sweeps are taken between
+                adjacent phi points, up to the top speed in
+                `Positioner.phi_motion`
+            oversample: The number of sweeps to take between adjacent points
+                when choosing the speed
+        """
+        self.positioner = positioner
+        self.reader = reader
+        self.speed = speed
+        self.oversample = oversample
+        self.sweep_time: float | None = None
+
+    def measure_cut(self, phis: np.ndarray, reverse: bool = False) -> list[TaggedSweep]:
+        """Measure one cut.
+
+        Args:
+            phis: The phi points of the cut (in degrees)
+            reverse: If True, rotate from the last point to the first
+
+        Returns:
+            list[TaggedSweep]: Every sweep taken, in order
+        """
+        phis = np.sort(np.asarray(phis, dtype=float))
+        start, end = (phis[-1], phis[0]) if reverse else (phis[0], phis[-1])
+
+        self.positioner.move_phi_absolute(start)
+        sweeps = [self._sweep()]
+        if len(phis) < 2:
+            return sweeps
+
+        speed = self._speed(np.min(np.diff(phis)))
+        direction = np.sign(end - start)
+        # Where the positioner really stops, which can be a little off `end`
+        end = self.positioner.start_phi_sweep(end, speed)
+        try:
+            while True:
+                sweep = self._sweep()
+                sweeps.append(sweep)
+                if direction * (end - self.positioner.read_phi()) <= 1e-9:
+                    break
+        finally:
+            self.positioner.finish_phi_sweep()
+
+        sweeps.append(self._sweep())
+        return sweeps
+
+    def _speed(self, spacing: float) -> float:
+        if self.speed is not None:
+            return self.speed
+        speed = spacing / (self.sweep_time * self.oversample) if self.sweep_time else np.inf
+        return float(min(speed, self.positioner.phi_motion.speed))
+
+    def _sweep(self) -> TaggedSweep:
+        start = time.monotonic()
+        phi_start = self.positioner.read_phi()
+        self.reader.sweep()
+        end = time.monotonic()
+        phi_end = self.positioner.read_phi()
+        ntwks = self.reader.fetch()
+
+        if phi_start == phi_end:
+            # Taken with the positioner stopped
+            self.sweep_time = end - start
+        return TaggedSweep(start, end, (phi_start + phi_end) / 2, ntwks)
@@ -0,0 +1,138 @@
+"""A cache of quantities derived from experiment data.
+
+Plots don't show complex data directly, but quantities derived from it, like
+magnitude in dB or phase. Several plots (or several traces of the same plot)
+are often showing the same quantity of the same slice of data, and all of them
+refresh whenever a point is appended. `DerivedCache` stores each derived slice
+so it's only computed once, and only the slices containing an appended point
+need to be recomputed.
+
+A slice is identified by the (frequency, phi, theta) indices it was taken at,
+with None for an axis the slice spans. For example, a theta cut is
+`(f_idx, phi_idx, None)`, and the data over frequency at one point is
+`(None, phi_idx, theta_idx)`. A point at (phi_idx, theta_idx) is part of every
+slice whose phi and theta are either None or equal to the point's.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from skrf import mathFunctions
+
+from pychamber import math_fns
+
+QUANTITIES: dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "magnitude": mathFunctions.complex_2_magnitude,
+    "db": math_fns.clean_complex_to_db,
+    "phase": mathFunctions.complex_2_degree,
+    "unwrapped_phase": lambda data: np.unwrap(np.deg2rad(mathFunctions.complex_2_degree(data)), axis=0),
+}
+
+SliceKey = tuple[int | None, int | None, int | None]
+
+
+class DerivedCache:
+    """A thread-safe, size-bounded cache of derived data slices.
+
+    Entries are keyed by (polarization, calibrated, quantity, slice). When the
+    cache is full, the least recently used entry is evicted. Cached arrays are
+    read-only, since they're shared between everyone asking for them.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        """
+        Args:
+            maxsize: The maximum number of slices to keep
+        """
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a slice computed from data that
+        # changed in the meantime isn't stored
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        polarization: str,
+        calibrated: bool,
+        quantity: str,
+        slice_key: SliceKey,
+        data: Callable[[], np.ndarray],
+    ) -> np.ndarray:
+        """Get a derived slice, computing it if it isn't cached.
+
+        Args:
+            polarization: The polarization of the slice
+            calibrated: Whether the slice is of calibrated data
+            quantity: The name of the quantity. One of `QUANTITIES`
+            slice_key: (frequency, phi, theta) indices of the slice
+            data: Returns the complex data of the slice. Only called on a miss
+
+        Returns:
+            np.ndarray: The derived data (read-only)
+
+        Raises:
+            KeyError: If the quantity is unknown
+        """
+        func = QUANTITIES[quantity]
+        key = (polarization, calibrated, quantity, slice_key)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            generation = self._generation
+
+        derived = np.asarray(func(data()))
+        derived.flags.writeable = False
+        with self._lock:
+            if generation != self._generation:
+                return derived
+            self._entries[key] = derived
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return derived
+
+    def invalidate(
+        self,
+        polarization: str | None = None,
+        calibrated: bool | None = None,
+        phi_idx: int | None = None,
+        theta_idx: int | None = None,
+    ) -> None:
+        """Drop the entries that contain a point.
+
+        Args:
+            polarization: Only drop entries for this polarization. None for all
+            calibrated: Only drop calibrated or uncalibrated entries. None for both
+            phi_idx: The phi index of the point. None for every phi
+            theta_idx: The theta index of the point. None for every theta
+        """
+        with self._lock:
+            self._generation += 1
+            stale = [
+                key
+                for key in self._entries
+                if (polarization is None or key[0] == polarization)
+                and (calibrated is None or key[1] == calibrated)
+                and (phi_idx is None or key[3][1] is None or key[3][1] == phi_idx)
+                and (theta_idx is None or key[3][2] is None or key[3][2] == theta_idx)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
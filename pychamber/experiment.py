@@ -3,13 +3,71 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    import pathlib
+    from collections.abc import AsyncIterator, Callable, Coroutine
+    from typing import Any
+
     from skrf.vi.vna import VNA
 
+    from .adaptive import AdaptiveSampling
+
+import asyncio
+import concurrent.futures
+import itertools
+import threading
+import time
+from dataclasses import dataclass, replace
+
 import numpy as np
 import skrf
 
+from .capture import reader_for
+from .continuous import ContinuousScan
 from .experiment_result import ExperimentResult
+from .journal import ScanJournal
+from .pipeline import AcquisitionPipeline, acquire_serially
+from .planner import PLANNED_ORDER, plan_for_positioner
 from .positioner import Positioner
+from .scan import SCAN_ORDERS, scan_rows
+from .timing import ScanTimings
+
+
+@dataclass
+class ExperimentProgress:
+    """The progress of a running experiment.
+
+    Attributes:
+        completed: The number of points measured so far
+        total: The number of points in the experiment. This grows as an
+            adaptive experiment adds angles
+        cut_completed: The number of points measured in the current cut
+        cut_total: The number of points in the current cut
+        status: What the experiment is doing
+        message: A message to show the user (e.g. a summary of the scan),
+            or an empty string
+    """
+
+    completed: int = 0
+    total: int = 0
+    cut_completed: int = 0
+    cut_total: int = 0
+    status: str = ""
+    message: str = ""
+
+
+@dataclass
+class AcquiredPoint:
+    """A point measured by an experiment.
+
+    Attributes:
+        theta: The theta of the point (in degrees)
+        phi: The phi of the point (in degrees)
+        ntwks: The data of each polarization, in order
+    """
+
+    theta: float
+    phi: float
+    ntwks: list[skrf.Network]
 
 
 class Experiment:
@@ -29,6 +87,14 @@ class Experiment:
         phis: np.ndarray,
         polarizations: list[tuple[str, int, int]],
         frequency: skrf.Frequency,
+        journal: str | pathlib.Path | None = None,
+        scratch_dir: str | pathlib.Path | None = None,
+        dtype: str = "complex128",
+        scan_order: str = "raster",
+        pipelined: bool = False,
+        continuous: bool = False,
+        phi_speed: float | None = None,
+        adaptive: AdaptiveSampling | None = None,
     ) -> None:
         """
         Args:
@@ -38,6 +104,45 @@ class Experiment:
             phis: Array of phi locations (in degrees)
             polarizations:
                 List of (name, a, b), where a, b are port numbers representing which S parameters correspond to the polarization.
+            journal:
+                If passed, every measurement is also written to a journal at
+                this path as it's taken. If the experiment is interrupted, it
+                can be continued with `Experiment.resume`
+            scratch_dir:
+                If passed, the result is stored on disk in this directory
+                rather than in memory. Use this for scans too large to fit in
+                RAM
+            dtype:
+                How the result is stored. Pass "complex64" or "magphase16" to
+                store it at reduced precision. See `ExperimentResult`
+            scan_order:
+                The order to visit each point in. One of
+                `pychamber.scan.SCAN_ORDERS`. "serpentine" sweeps phi in
+                alternating directions so it doesn't have to rewind after each
+                theta, and "serpentine_theta" does the same with theta as the
+                inner axis. "planned" uses `pychamber.planner` to find the
+                order that minimizes the estimated motion time of the
+                positioner, and reports the time saved before starting
+            pipelined:
+                If True, the positioner starts moving to the next point as
+                soon as a sweep completes, while the data is transferred and
+                recorded in the background. See `pychamber.pipeline`
+            continuous:
+                If True, phi rotates through each cut at a constant speed
+                while the VNA sweeps over and over, and the sweeps are
+                resampled onto `phis`. This is much faster than stopping at
+                each point, but needs a positioner that supports it. See
+                `pychamber.continuous`. `scan_order` and `pipelined` are
+                ignored
+            phi_speed:
+                How fast to rotate phi in a continuous scan (in
+                degrees/second). If None, it's chosen from the sweep time so
+                that there are two sweeps between adjacent phi points
+            adaptive:
+                If passed, `thetas` and `phis` are only a coarse first pass.
+                Angles are then added wherever the pattern changes quickly,
+                until nothing needs refining or the budget runs out. See
+                `pychamber.adaptive`
         """
         self._analyzer = analyzer
         self._positioner = positioner
@@ -45,18 +150,363 @@ class Experiment:
         self._phis = phis
         self._polarizations = polarizations
         self._frequency = frequency
+        self._journal_path = journal
+        self._journal: ScanJournal | None = None
+        if scan_order not in (*SCAN_ORDERS, PLANNED_ORDER):
+            raise ValueError(f"Unknown scan order {scan_order!r}. Expected one of {(*SCAN_ORDERS, PLANNED_ORDER)}")
+        self._scan_order = scan_order
+        self._pipelined = pipelined
+        self._continuous = continuous
+        self._phi_speed = phi_speed
+        self._adaptive = adaptive
+
+        self._result = ExperimentResult(
+            self._thetas,
+            self._phis,
+            [pol[0] for pol in polarizations],
+            self._frequency,
+            scratch_dir=scratch_dir,
+            dtype=dtype,
+        )
+
+    @classmethod
+    def resume(cls, analyzer: VNA, positioner: Positioner, journal: str | pathlib.Path) -> Experiment:
+        """Continue an interrupted experiment from its journal.
+
+        The returned experiment already contains everything recorded in the
+        journal. When run, it skips every point that has already been measured
+        and keeps appending to the same journal.
+
+        Args:
+            analyzer: Network Analyzer
+            positioner: Positioner instance
+            journal: The journal written by the interrupted experiment
+
+        Returns:
+            Experiment: The experiment, ready to be run
+        """
+        scan_journal, result = ScanJournal.resume(journal)
+        experiment = cls(
+            analyzer,
+            positioner,
+            result.thetas,
+            result.phis,
+            scan_journal.polarizations,
+            result.frequency,
+            dtype=result.dtype,
+        )
+        experiment._result = result
+        experiment._journal = scan_journal
 
-        self._result = ExperimentResult(self._thetas, self._phis, [pol[0] for pol in polarizations], self._frequency)
+        return experiment
 
     def run(self) -> ExperimentResult:
         """Run the experiment.
 
-        Runs the experiment as defined. This command will display status
-        information using the rich library.
+        Runs the experiment as defined, blocking until it's done. If the rich
+        library is installed, this command will display status information
+        using it. If it's called from a running event loop (e.g. in a Jupyter
+        notebook), the experiment runs in a separate thread with its own event
+        loop, and the running loop is blocked until it's done. Await
+        `run_async` instead to keep it free.
+
+        Returns:
+            ExperimentResult: Measured data from the experiment
+        """
+        try:
+            display = _RichDisplay()
+        except ImportError:
+            return _run_blocking(self.run_async(progress=_log_progress))
+
+        with display:
+            return _run_blocking(self.run_async(progress=display.update))
+
+    async def run_async(self, progress: Callable[[ExperimentProgress], None] | None = None) -> ExperimentResult:
+        """Run the experiment without blocking the event loop.
+
+        Positioner moves and VNA reads run in an executor thread. If the task
+        running this is cancelled, the experiment stops after the point it's
+        measuring (which can't be interrupted), and everything measured until
+        then is kept in the result.
+
+        Args:
+            progress: Called in the event loop with the progress of the
+                experiment after each point and whenever its status changes
 
         Returns:
             ExperimentResult: Measured data from the experiment
         """
+        async for _ in self.stream(progress=progress):
+            pass
+        return self._result
+
+    async def stream(
+        self, progress: Callable[[ExperimentProgress], None] | None = None
+    ) -> AsyncIterator[AcquiredPoint]:
+        """Run the experiment, yielding each point as it's measured.
+
+        ```
+        async for point in experiment.stream():
+            print(point.theta, point.phi)
+        ```
+
+        Breaking out of the loop (or cancelling the task running it) stops the
+        experiment as in `run_async`.
+
+        Args:
+            progress: Called in the event loop with the progress of the
+                experiment after each point and whenever its status changes
+
+        Yields:
+            AcquiredPoint: Each point, once it's been added to the result
+        """
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue[tuple[str, Any]] = asyncio.Queue()
+        stop = threading.Event()
+
+        def emit(kind: str, item: Any) -> None:
+            loop.call_soon_threadsafe(events.put_nowait, (kind, item))
+
+        def acquire() -> None:
+            try:
+                self._acquire(emit, stop.is_set)
+            finally:
+                emit("done", None)
+
+        task = loop.run_in_executor(None, acquire)
+        try:
+            while True:
+                kind, item = await events.get()
+                if kind == "done":
+                    break
+                if kind == "progress":
+                    if progress is not None:
+                        progress(item)
+                else:
+                    yield item
+        finally:
+            stop.set()
+            # The point being measured can't be interrupted, so wait for it
+            await asyncio.wait({task})
+        task.result()
+
+    def _acquire(self, emit: Callable[[str, Any], None], should_stop: Callable[[], bool]) -> None:
+        # Runs the experiment in an executor thread. Progress and points are
+        # sent back to the event loop with `emit`
+        acquisition = _Acquisition(self, emit)
+        timings = acquisition.timings
+        self._result.timings = timings
+
+        if self._journal is None and self._journal_path is not None:
+            self._journal = ScanJournal.create(self._journal_path, self._result, self._polarizations)
+
+        reader = reader_for(self._analyzer, self._polarizations)
+        started = time.monotonic()
+        try:
+            reader.setup()
+            for n_pass in itertools.count():
+                if n_pass > 0:
+                    # Refine the grid measured so far, if it needs it
+                    elapsed = time.monotonic() - started
+                    if should_stop() or not self._refine(acquisition.message, n_pass, elapsed, acquisition.n_measured):
+                        break
+                acquisition.plan()
+
+                if self._continuous:
+                    self._run_continuous(reader, should_stop, acquisition.report, acquisition.record_cut)
+                elif self._pipelined:
+                    pipeline = AcquisitionPipeline(acquisition.move, reader, acquisition.record, timings=timings)
+                    pipeline.run(acquisition.todo, should_stop=should_stop)
+                else:
+                    acquire_serially(
+                        acquisition.todo,
+                        acquisition.move,
+                        reader,
+                        acquisition.record,
+                        should_stop=should_stop,
+                        timings=timings,
+                    )
+
+                if self._adaptive is None:
+                    break
+        finally:
+            reader.teardown()
+            if self._journal is not None:
+                self._journal.close()
+
+        if len(timings) > 0:
+            acquisition.message(timings.summary())
+
+    def _refine(self, message: Callable[[str], None], n_pass: int, elapsed: float, n_measured: int) -> bool:
+        # Add angles for the next pass of an adaptive scan. False if there's
+        # nothing to refine or the budget's run out
+        adaptive = self._adaptive
+        if n_pass > adaptive.max_passes:
+            return False
+
+        budget = None
+        if adaptive.max_points is not None:
+            budget = adaptive.max_points - len(self._thetas) * len(self._phis)
+        if adaptive.max_time is not None and n_measured > 0:
+            time_budget = int((adaptive.max_time - elapsed) / (elapsed / n_measured))
+            budget = time_budget if budget is None else min(budget, time_budget)
+        if budget is not None and budget <= 0:
+            return False
+
+        thetas, phis = adaptive.refine(self._result, budget)
+        if len(thetas) == 0 and len(phis) == 0:
+            return False
+        message(f"Refinement pass {n_pass}: adding {len(thetas)} thetas and {len(phis)} phis")
+        self._result.insert_angles(thetas=thetas, phis=phis)
+        self._thetas = self._result.thetas
+        self._phis = self._result.phis
+        return True
+
+    def _run_continuous(
+        self,
+        reader,
+        should_stop: Callable[[], bool],
+        report: Callable[..., None],
+        record_cut: Callable[[float, list[skrf.Network], int], None],
+    ) -> None:
+        scan = ContinuousScan(self._positioner, reader, speed=self._phi_speed)
+        thetas = [
+            theta for theta in self._thetas if not all(self._result.is_measured(theta, phi) for phi in self._phis)
+        ]
+        for i, theta in enumerate(thetas):
+            if should_stop():
+                break
+            report(status=f"Moving theta to {theta}")
+            self._positioner.move_theta_absolute(theta)
+            report(status=f"Capturing theta={theta}")
+            # Alternate directions so phi never has to rewind
+            sweeps = scan.measure_cut(self._phis, reverse=i % 2 == 1)
+            data = {
+                pol_name: np.stack([sweep.ntwks[j].s.reshape(-1) for sweep in sweeps])
+                for j, (pol_name, _, _) in enumerate(self._polarizations)
+            }
+            unmeasured = sum(not self._result.is_measured(theta, phi) for phi in self._phis)
+            ntwks = self._result.append_continuous(theta, [sweep.phi for sweep in sweeps], data)
+            if self._journal is not None:
+                for ntwk in ntwks:
+                    self._journal.append(ntwk)
+            record_cut(theta, ntwks, unmeasured)
+
+    def _rows(self, message: Callable[[str], None]) -> list[list[tuple[float, float]]]:
+        if self._scan_order != PLANNED_ORDER:
+            return scan_rows(self._thetas, self._phis, self._scan_order)
+
+        points = [
+            point
+            for row in scan_rows(self._thetas, self._phis)
+            for point in row
+            if not self._result.is_measured(*point)
+        ]
+        plan = plan_for_positioner(points, self._positioner)
+        message(
+            f"Planned scan: {plan.estimated_time:.0f} s of estimated motion,"
+            f" {plan.time_saved:.0f} s less than the naive order"
+        )
+        return plan.rows()
+
+
+class _Acquisition:
+    # The state of one run of an experiment, which moves the positioner and
+    # records each point. Runs in the executor thread of `Experiment.stream`
+
+    def __init__(self, experiment: Experiment, emit: Callable[[str, Any], None]) -> None:
+        self.experiment = experiment
+        self.emit = emit
+        self.state = ExperimentProgress()
+        # Continuous scans measure whole cuts at once, so aren't timed per point
+        self.timings = ScanTimings()
+        self.rows: list[list[tuple[float, float]]] = []
+        # Each point still to be measured, and the row it's in
+        self.todo: dict[tuple[float, float], int] = {}
+        # The (theta, phi) the positioner was last moved to
+        self.position: tuple[float | None, float | None] = (None, None)
+        self.cut_row: int | None = None
+        self.n_measured = 0
+
+    def report(self, **changes) -> None:
+        for name, value in changes.items():
+            setattr(self.state, name, value)
+        self.emit("progress", replace(self.state))
+
+    def message(self, text: str) -> None:
+        self.emit("progress", replace(self.state, message=text))
+
+    def plan(self) -> None:
+        # Work out the order of the points still to be measured. Called again
+        # after each refinement pass of an adaptive scan
+        experiment = self.experiment
+        result = experiment._result
+        if experiment._continuous:
+            self.rows = scan_rows(experiment._thetas, experiment._phis)
+        else:
+            self.rows = experiment._rows(self.message)
+        self.todo = {
+            (theta, phi): i
+            for i, row in enumerate(self.rows)
+            for theta, phi in row
+            if not result.is_measured(theta, phi)
+        }
+        self.cut_row = None
+        n_points = len(experiment._thetas) * len(experiment._phis)
+        self.report(total=n_points, completed=n_points - len(self.todo))
+
+    def move(self, theta: float, phi: float) -> None:
+        # Each axis is only moved if its position changes, and both at once if
+        # they both do
+        positioner = self.experiment._positioner
+        last_theta, last_phi = self.position
+        if theta != last_theta and phi != last_phi:
+            self.report(status=f"Moving to theta={theta}, phi={phi}")
+            positioner.move_absolute(phi, theta)
+        elif theta != last_theta:
+            self.report(status=f"Moving theta to {theta}")
+            positioner.move_theta_absolute(theta)
+        elif phi != last_phi:
+            self.report(status=f"Moving phi to {phi}")
+            positioner.move_phi_absolute(phi)
+        self.position = (theta, phi)
+        self.report(status=f"Capturing theta={theta}, phi={phi}")
+
+    def record(self, theta: float, phi: float, ntwks: list[skrf.Network]) -> None:
+        experiment = self.experiment
+        result = experiment._result
+        row = self.todo[(theta, phi)]
+        if row != self.cut_row:
+            self.cut_row = row
+            measured = sum(result.is_measured(*point) for point in self.rows[row])
+            self.state.cut_total, self.state.cut_completed = len(self.rows[row]), measured
+
+        with self.timings.time((theta, phi), "record"):
+            for (pol_name, _, _), ntwk in zip(experiment._polarizations, ntwks, strict=True):
+                ntwk.params = {"phi": phi, "theta": theta, "polarization": pol_name, "calibrated": False}
+                if experiment._journal is not None:
+                    experiment._journal.append(ntwk)
+        with self.timings.time((theta, phi), "append"):
+            result.append_many(ntwks)
+        self.n_measured += 1
+        self.emit("point", AcquiredPoint(theta, phi, ntwks))
+        self.report(completed=self.state.completed + 1, cut_completed=self.state.cut_completed + 1)
+
+    def record_cut(self, theta: float, ntwks: list[skrf.Network], measured: int) -> None:
+        self.n_measured += measured
+        by_phi: dict[float, list[skrf.Network]] = {}
+        for ntwk in ntwks:
+            by_phi.setdefault(ntwk.params["phi"], []).append(ntwk)
+        for phi, point_ntwks in by_phi.items():
+            self.emit("point", AcquiredPoint(theta, phi, point_ntwks))
+        n_phis = len(self.experiment._phis)
+        self.report(completed=self.state.completed + measured, cut_total=n_phis, cut_completed=n_phis)
+
+
+class _RichDisplay:
+    # Shows the progress of an experiment in the terminal with rich
+
+    def __init__(self) -> None:
         from rich import progress
         from rich.console import Console, Group
         from rich.live import Live
@@ -66,35 +516,52 @@ class Experiment:
         from rich.rule import Rule
         from rich.table import Table
 
-        pro = Progress(
+        self.pro = Progress(
             progress.TextColumn("[progress.description]{task.description}"),
             progress.BarColumn(complete_style="plum1"),
             progress.TaskProgressColumn(),
             progress.TimeRemainingColumn(),
             progress.TimeElapsedColumn(),
         )
-        total = pro.add_task("Total Progress", total=len(self._thetas) * len(self._phis))
-        cut = pro.add_task("Cut Progress", total=len(self._thetas))
-        status = Console().status("", spinner="toggle6")
-        group = Group(pro, Padding(Rule("Status"), (1, 0, 0, 0)), status)
+        self.console = Console()
+        self.total = self.pro.add_task("Total Progress", total=None)
+        self.cut = self.pro.add_task("Cut Progress", total=None)
+        self.status = self.console.status("", spinner="toggle6")
+        group = Group(self.pro, Padding(Rule("Status"), (1, 0, 0, 0)), self.status)
         progress_table = Table.grid(expand=True)
         progress_table.add_row(Panel.fit(group, title="Current Experiment", padding=(1, 0, 0, 0)))
+        self.live = Live(progress_table, console=self.console, refresh_per_second=10)
 
-        with Live(progress_table, refresh_per_second=10):
-            for theta in self._thetas:
-                status.update(f"Moving theta to {theta}")
-                self._positioner.move_theta_absolute(theta)
-                for phi in self._phis:
-                    status.update(f"Moving phi to {phi}")
-                    self._positioner.move_phi_absolute(phi)
-                    for pol_name, a, b in self._polarizations:
-                        status.update(f"Capturing {pol_name} polarization")
-                        ntwk = self._analyzer.ch1.get_sdata(a, b)
-                        ntwk.params = {"phi": phi, "theta": theta, "polarization": pol_name, "calibrated": False}
-
-                        self._result.append(ntwk)
-                    pro.update(cut, advance=1)
-                    pro.update(total, advance=1)
-                pro.reset(cut)
+    def __enter__(self) -> _RichDisplay:
+        self.live.__enter__()
+        return self
 
-        return self._result
+    def __exit__(self, *args) -> None:
+        self.live.__exit__(*args)
+
+    def update(self, progress: ExperimentProgress) -> None:
+        if progress.message:
+            self.console.print(progress.message)
+            return
+        self.pro.update(self.total, total=progress.total, completed=progress.completed)
+        self.pro.update(self.cut, total=progress.cut_total, completed=progress.cut_completed)
+        self.status.update(progress.status)
+
+
+def _run_blocking(coro: Coroutine[Any, Any, ExperimentResult]) -> ExperimentResult:
+    # asyncio.run can't be called while an event loop is running in this
+    # thread, so run the coroutine in a thread of its own then
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+def _log_progress(progress: ExperimentProgress) -> None:
+    # Without rich, only messages are shown
+    if progress.message:
+        from pychamber.app.logger import LOG
+
+        LOG.info(progress.message)
@@ -0,0 +1,241 @@
+"""Running several experiments back to back.
+
+Measuring a device usually takes more than one scan (e.g. a coarse full sphere
+and a few fine cuts, at different frequencies). An `ExperimentQueue` holds the
+settings of each scan, and runs them one after the other on the same analyzer
+and positioner, saving each result as soon as it's done so nothing needs
+attending to between scans.
+
+Rather than running the scans in the order they were added, the queue starts
+each scan with the one that the positioner can reach fastest from where the
+last one ended (see `order_queue`).
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from skrf.vi.vna import VNA
+
+    from pychamber.calibration import Calibration
+    from pychamber.experiment import ExperimentProgress
+    from pychamber.experiment_result import ExperimentResult
+    from pychamber.positioner import Positioner
+
+import pathlib
+from dataclasses import dataclass
+
+import numpy as np
+import skrf
+
+from pychamber.experiment import Experiment
+from pychamber.experiment_result import BINARY_SUFFIX
+from pychamber.planner import PLANNED_ORDER, route_time
+from pychamber.positioner import AxisMotion
+from pychamber.scan import scan_rows
+
+Point = tuple[float, float]
+
+
+@dataclass
+class QueuedExperiment:
+    """The settings of one experiment in a queue.
+
+    Attributes:
+        thetas: Array of theta locations (in degrees)
+        phis: Array of phi locations (in degrees)
+        polarizations: List of (name, a, b), where a, b are port numbers
+            representing which S parameters correspond to the polarization
+        frequency: The frequencies to measure
+        if_bandwidth: The IF bandwidth of the analyzer (in Hz). None to leave
+            it as it is
+        calibration: If passed, applied to the result before it's saved
+        name: Used to name the saved result
+    """
+
+    thetas: np.ndarray
+    phis: np.ndarray
+    polarizations: list[tuple[str, int, int]]
+    frequency: skrf.Frequency
+    if_bandwidth: float | None = None
+    calibration: Calibration | None = None
+    name: str = ""
+
+    def configure(self, analyzer: VNA) -> None:
+        """Set the analyzer up to run this experiment."""
+        analyzer.ch1.frequency = self.frequency
+        if self.if_bandwidth is not None:
+            analyzer.ch1.if_bandwidth = self.if_bandwidth
+
+    def endpoints(self, scan_order: str = "raster") -> tuple[Point, Point]:
+        """The first and last (theta, phi) point the experiment measures.
+
+        A planned order isn't known until the experiment starts, so it's
+        treated as raster.
+        """
+        rows = scan_rows(self.thetas, self.phis, "raster" if scan_order == PLANNED_ORDER else scan_order)
+        return rows[0][0], rows[-1][-1]
+
+
+def order_queue(
+    items: Sequence[QueuedExperiment],
+    theta_axis: AxisMotion | None = None,
+    phi_axis: AxisMotion | None = None,
+    start: Point | None = None,
+    scan_order: str = "raster",
+) -> list[QueuedExperiment]:
+    """Order experiments so each one starts near where the last one ended.
+
+    Starting from `start`, the experiment whose first point the positioner can
+    reach fastest (as estimated by `pychamber.planner.route_time`) runs next.
+    Ties keep the order the experiments were given in.
+
+    Args:
+        items: The experiments to run
+        theta_axis: The motion of the theta axis. Defaults to `AxisMotion()`
+        phi_axis: The motion of the phi axis. Defaults to `AxisMotion()`
+        start: The current (theta, phi) position of the positioner. If None,
+            the first experiment given runs first
+        scan_order: The scan order the experiments are run with
+
+    Returns:
+        list[QueuedExperiment]: The experiments, in the order to run them
+    """
+    theta_axis = AxisMotion() if theta_axis is None else theta_axis
+    phi_axis = AxisMotion() if phi_axis is None else phi_axis
+    remaining = [(item, *item.endpoints(scan_order)) for item in items]
+    order = []
+    position = start
+    while remaining:
+        if position is None:
+            best = 0
+        else:
+            times = [route_time([first], theta_axis, phi_axis, position) for _, first, _ in remaining]
+            best = int(np.argmin(times))
+        item, _, position = remaining.pop(best)
+        order.append(item)
+    return order
+
+
+class ExperimentQueue:
+    """Experiments to run back to back on the same analyzer and positioner.
+
+    ```
+    queue = ExperimentQueue(analyzer, positioner, "results/")
+    queue.add(QueuedExperiment(thetas, phis, polarizations, freq, name="coarse"))
+    queue.add(QueuedExperiment(thetas, fine_phis, polarizations, other_freq, if_bandwidth=100, name="fine"))
+    results = queue.run()
+    ```
+
+    Each result is saved to `save_dir` as soon as its experiment finishes, as
+    `<n>_<name>.npz`, where n is the position it ran in.
+    """
+
+    def __init__(
+        self,
+        analyzer: VNA,
+        positioner: Positioner,
+        save_dir: str | pathlib.Path,
+        suffix: str = BINARY_SUFFIX,
+        **experiment_kwargs,
+    ) -> None:
+        """
+        Args:
+            analyzer: Network Analyzer
+            positioner: Positioner instance
+            save_dir: The directory to save each result in. Created if it
+                doesn't exist
+            suffix: The extension (and so the format) to save results with
+            experiment_kwargs: Passed to every `Experiment` (e.g. `scan_order`
+                or `dtype`)
+        """
+        self.analyzer = analyzer
+        self.positioner = positioner
+        self.save_dir = pathlib.Path(save_dir)
+        self.suffix = suffix
+        self._experiment_kwargs = experiment_kwargs
+        self._items: list[QueuedExperiment] = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def items(self) -> list[QueuedExperiment]:
+        """The experiments in the queue, in the order they were added."""
+        return list(self._items)
+
+    def add(self, item: QueuedExperiment) -> None:
+        """Add an experiment to the queue."""
+        self._items.append(item)
+
+    def clear(self) -> None:
+        """Remove every experiment from the queue."""
+        self._items.clear()
+
+    def ordered(self) -> list[QueuedExperiment]:
+        """The experiments in the queue, in the order they'll run. See `order_queue`."""
+        try:
+            start = (float(self.positioner.theta), float(self.positioner.phi))
+        except NotImplementedError:
+            start = None
+        return order_queue(
+            self._items,
+            self.positioner.theta_motion,
+            self.positioner.phi_motion,
+            start,
+            self._experiment_kwargs.get("scan_order", "raster"),
+        )
+
+    def run(self) -> list[ExperimentResult]:
+        """Run every experiment in the queue, blocking until they're all done.
+
+        Returns:
+            list[ExperimentResult]: The result of each experiment, in the order
+                they ran
+        """
+        results = []
+        for n, item in enumerate(self.ordered()):
+            results.append(self._save(n, item, self._experiment(item).run()))
+        return results
+
+    async def run_async(
+        self, progress: Callable[[ExperimentProgress], None] | None = None
+    ) -> list[ExperimentResult]:
+        """Run every experiment in the queue without blocking the event loop.
+
+        Cancelling the task running this stops the current experiment as in
+        `Experiment.run_async`, and the rest don't run.
+
+        Args:
+            progress: Called with the progress of each experiment. See
+                `Experiment.run_async`
+
+        Returns:
+            list[ExperimentResult]: The result of each experiment, in the order
+                they ran
+        """
+        results = []
+        for n, item in enumerate(self.ordered()):
+            results.append(self._save(n, item, await self._experiment(item).run_async(progress)))
+        return results
+
+    def _experiment(self, item: QueuedExperiment) -> Experiment:
+        item.configure(self.analyzer)
+        return Experiment(
+            self.analyzer,
+            self.positioner,
+            item.thetas,
+            item.phis,
+            item.polarizations,
+            item.frequency,
+            **self._experiment_kwargs,
+        )
+
+    def _save(self, n: int, item: QueuedExperiment, result: ExperimentResult) -> ExperimentResult:
+        if item.calibration is not None:
+            result.apply_calibration(item.calibration)
+        self.save_dir.mkdir(parents=True, exist_ok=True)
+        result.save(self.save_dir / f"{n:02d}_{item.name or 'experiment'}{self.suffix}")
+        return result
@@ -3,18 +3,29 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
     from typing import Any
 
+    from pychamber.timing import ScanTimings
+
 import pathlib
 import uuid
 from datetime import datetime
-from typing import cast
 
 import numpy as np
 import skrf
-from qtpy.QtCore import QObject, QReadWriteLock, Signal
+from qtpy.QtCore import QObject, QReadWriteLock, QTimer, Signal
+
+from pychamber import Calibration, result_io
+from pychamber.continuous import resample
+from pychamber.derived_cache import DerivedCache
+from pychamber.storage import STORAGE_DTYPES, ChunkedCube, MagPhaseCube
+
+BINARY_SUFFIX = ".npz"
+BINARY_FORMAT_VERSION = 1
 
-from pychamber import Calibration
+# Number of elements divided at once when applying a calibration
+_CALIBRATION_BLOCK_SIZE = 1 << 22
 
 
 class InvalidFileError(Exception):
@@ -27,6 +38,87 @@ class InvalidFileError(Exception):
     pass
 
 
+class DirtyRegions:
+    """The points of a result that were changed by one or more appends.
+
+    This is sent with `ExperimentResult.dataAppended` so that listeners (e.g.
+    plots) can skip updates that don't touch the data they're showing.
+    """
+
+    def __init__(self) -> None:
+        # (polarization, calibrated) -> {(phi index, theta index), ...}
+        self._points: dict[tuple[str, bool], set[tuple[int, int]]] = {}
+
+    def __bool__(self) -> bool:
+        return any(self._points.values())
+
+    def __repr__(self) -> str:
+        return f"DirtyRegions({self._points})"
+
+    def add(self, polarization: str, calibrated: bool, phi_idx: int, theta_idx: int) -> None:
+        """Mark a point as changed.
+
+        Args:
+            polarization: The polarization of the point
+            calibrated: Whether the calibrated data changed
+            phi_idx: The phi index of the point
+            theta_idx: The theta index of the point
+        """
+        self._points.setdefault((polarization, calibrated), set()).add((int(phi_idx), int(theta_idx)))
+
+    def update(self, other: DirtyRegions) -> None:
+        """Mark every point changed in another set of regions as changed."""
+        for key, points in other._points.items():
+            self._points.setdefault(key, set()).update(points)
+
+    @property
+    def polarizations(self) -> list[str]:
+        """The polarizations with changed points"""
+        return list(dict.fromkeys(pol for pol, _ in self._points))
+
+    def points(self, polarization: str, calibrated: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """The changed points of a polarization.
+
+        Args:
+            polarization: The polarization
+            calibrated: Whether to get the changed calibrated points
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The (sorted) phi and theta indices of the changed points
+        """
+        points = sorted(self._points.get((polarization, calibrated), set()))
+        phi_idxs = np.array([phi_idx for phi_idx, _ in points], dtype=np.intp)
+        theta_idxs = np.array([theta_idx for _, theta_idx in points], dtype=np.intp)
+        return phi_idxs, theta_idxs
+
+    def intersects(
+        self,
+        polarization: str,
+        calibrated: bool | None = None,
+        phi_idx: int | None = None,
+        theta_idx: int | None = None,
+    ) -> bool:
+        """Whether any changed point is part of a slice of data.
+
+        Args:
+            polarization: The polarization of the slice
+            calibrated: Whether the slice is calibrated data. None for either
+            phi_idx: The phi index of the slice. None if it spans every phi
+            theta_idx: The theta index of the slice. None if it spans every theta
+
+        Returns:
+            bool: True if the slice changed
+        """
+        for (pol, is_caled), points in self._points.items():
+            if pol != polarization or (calibrated is not None and is_caled != calibrated):
+                continue
+            for point_phi_idx, point_theta_idx in points:
+                phi_matches = phi_idx is None or point_phi_idx == phi_idx
+                if phi_matches and (theta_idx is None or point_theta_idx == theta_idx):
+                    return True
+        return False
+
+
 class ExperimentResult(QObject):
     """Results from an experiment.
 
@@ -37,10 +129,16 @@ class ExperimentResult(QObject):
 
     Attributes:
         dataAppended (PySide6.QtCore.Signal):
-            PyQt signal emitted when a data append operation has completed
+            PyQt signal emitted when a data append operation has completed.
+            It carries a `DirtyRegions` of the points that changed. If
+            `notify_interval` is set, appends made within that window are
+            coalesced into a single emission
+        timings (ScanTimings | None):
+            How long each stage of measuring each point took, if the result
+            was measured by an experiment. See `pychamber.timing`
     """
 
-    dataAppended = Signal()
+    dataAppended = Signal(object)
 
     def __init__(
         self,
@@ -49,6 +147,11 @@ class ExperimentResult(QObject):
         polarizations: list[str],
         frequency: skrf.Frequency,
         parent: QObject | None = None,
+        allocate: bool = True,
+        scratch_dir: str | pathlib.Path | None = None,
+        chunks: tuple[int, int, int] | None = None,
+        notify_interval: int = 0,
+        dtype: str = "complex128",
     ) -> None:
         """
         Args:
@@ -58,24 +161,72 @@ class ExperimentResult(QObject):
                 List of (name, a, b), where a, b are port numbers representing
                 which S parameters correspond to the polarization.
             frequency (skrf.frequency.Frequency): The frequency range of this measurement
+            allocate:
+                Whether to allocate the data arrays. Only pass False if you
+                are going to provide the arrays yourself (e.g. when loading)
+            scratch_dir:
+                If passed, the data is stored in chunked, memory-mapped scratch
+                files in this directory rather than in memory, so the size of
+                the result is limited by disk space rather than RAM. See
+                `pychamber.storage.ChunkedCube`
+            chunks:
+                The (frequency, phi, theta) chunk shape of the scratch files.
+                Only used with `scratch_dir`
+            notify_interval:
+                Time (in ms) to coalesce `dataAppended` emissions over. If 0,
+                the signal is emitted by every append
+            dtype:
+                How the data is stored. One of
+                `pychamber.storage.STORAGE_DTYPES`: "complex128" (full
+                precision), "complex64" (half the size) or "magphase16" (a
+                quarter of the size, as 16-bit dB and phase; see
+                `pychamber.storage.MagPhaseCube`). Either reduced precision is
+                far below the uncertainty of a VNA measurement
+
+        Raises:
+            ValueError: If the dtype isn't one of the storage dtypes
         """
         super().__init__(parent)
+        if dtype not in STORAGE_DTYPES:
+            raise ValueError(f"Unknown storage dtype {dtype!r}. Expected one of {STORAGE_DTYPES}")
 
         self.rw_lock = QReadWriteLock()
-        self._ntwk_set = skrf.NetworkSet()
         self._thetas = np.sort(thetas)
         self._phis = np.sort(phis)
         self._polarizations = polarizations
         self._frequency = frequency
-        self._s_data = {
-            pol: np.full((len(frequency), len(phis), len(thetas)), np.nan, dtype=complex) for pol in polarizations
-        }
-        self._caled_s_data = {
-            pol: np.full((len(frequency), len(phis), len(thetas)), np.nan, dtype=complex) for pol in polarizations
-        }
+        self._scratch_dir = scratch_dir
+        self._chunks = chunks
+        self._dtype = dtype
+        self._s_data = {}
+        self._caled_s_data = {}
+        if allocate:
+            self._s_data = {pol: self._new_cube() for pol in polarizations}
+            self._caled_s_data = {pol: self._new_cube() for pol in polarizations}
+        # Order in which each (phi, theta) point was first filled, or -1 if it
+        # hasn't been measured yet. This is all append needs to touch, so the
+        # networks are only built when someone actually asks for them.
+        self._fill_order = {pol: np.full((len(phis), len(thetas)), -1, dtype=np.int64) for pol in polarizations}
+        self._caled_fill_order = {pol: np.full((len(phis), len(thetas)), -1, dtype=np.int64) for pol in polarizations}
+        self._n_filled = 0
+        self._ntwk_set_cache: skrf.NetworkSet | None = None
+        self._derived = DerivedCache()
+
+        self.notify_interval = notify_interval
+        self._pending_dirty = DirtyRegions()
+        self._notify_timer = QTimer(self)
+        self._notify_timer.setSingleShot(True)
+        self._notify_timer.timeout.connect(self.flush_notifications)
+
+        # Lookups: exact angle -> index for writing data points, and a sort
+        # order of the frequencies for nearest-value searches
+        self._phi_index = {float(phi): i for i, phi in enumerate(self._phis)}
+        self._theta_index = {float(theta): i for i, theta in enumerate(self._thetas)}
+        self._f_sorter = np.argsort(frequency.f, kind="stable")
 
         self._created = datetime.now()
         self._uuid = uuid.uuid4()
+        self.timings: ScanTimings | None = None
 
     def __str__(self) -> str:
         return (
@@ -84,7 +235,7 @@ class ExperimentResult(QObject):
         )
 
     def __len__(self) -> int:
-        return len(self._ntwk_set)
+        return self._n_filled
 
     def __iter__(self):
         return iter(self._ntwk_set)
@@ -92,15 +243,90 @@ class ExperimentResult(QObject):
     def __getitem__(self, index: int):
         return self._ntwk_set[index]
 
+    @property
+    def _ntwk_set(self) -> skrf.NetworkSet:
+        """The data as a NetworkSet, built on first use and cached until the next write."""
+        if self._ntwk_set_cache is None:
+            self._ntwk_set_cache = skrf.NetworkSet(self._build_networks())
+        return self._ntwk_set_cache
+
+    @property
+    def is_disk_backed(self) -> bool:
+        """Whether the data is stored in scratch files rather than in memory"""
+        return self._scratch_dir is not None
+
+    @property
+    def dtype(self) -> str:
+        """How the data is stored. One of `pychamber.storage.STORAGE_DTYPES`"""
+        return self._dtype
+
+    def _new_cube(self) -> np.ndarray | ChunkedCube | MagPhaseCube:
+        shape = (len(self._frequency), len(self._phis), len(self._thetas))
+        if self._dtype == "magphase16":
+            return MagPhaseCube.empty(
+                shape, chunks=self._chunks, dir=self._scratch_dir, disk_backed=self._scratch_dir is not None
+            )
+        if self._scratch_dir is None:
+            return np.full(shape, np.nan, dtype=self._dtype)
+        return ChunkedCube(shape, dtype=self._dtype, chunks=self._chunks, fill_value=np.nan, dir=self._scratch_dir)
+
+    def _filled_entries(self, calibrated: bool | None = None) -> list[tuple]:
+        # (fill order, polarization, calibrated, cube, phi index, theta index)
+        # of every filled point, in the order the points were filled
+        entries = []
+        for pol in self._polarizations:
+            for is_caled, fill_order, cube in [
+                (False, self._fill_order[pol], self._s_data[pol]),
+                (True, self._caled_fill_order[pol], self._caled_s_data[pol]),
+            ]:
+                if calibrated is not None and is_caled != calibrated:
+                    continue
+                phi_idxs, theta_idxs = np.nonzero(fill_order >= 0)
+                for phi_idx, theta_idx in zip(phi_idxs, theta_idxs, strict=True):
+                    entries.append((fill_order[phi_idx, theta_idx], pol, is_caled, cube, phi_idx, theta_idx))
+
+        entries.sort(key=lambda entry: entry[0])
+        return entries
+
+    def _build_networks(self, calibrated: bool | None = None) -> list[skrf.Network]:
+        return [
+            skrf.Network(
+                frequency=self._frequency,
+                s=cube[:, phi_idx, theta_idx].reshape((-1, 1, 1)),
+                name="",
+                params={
+                    "phi": self._phis[phi_idx],
+                    "theta": self._thetas[theta_idx],
+                    "polarization": pol,
+                    "calibrated": is_caled,
+                },
+            )
+            for _, pol, is_caled, cube, phi_idx, theta_idx in self._filled_entries(calibrated)
+        ]
+
+    def _mark_filled(self, fill_order: np.ndarray, phi_idx: np.ndarray, theta_idx: np.ndarray) -> None:
+        # Re-measuring a point overwrites its data but keeps its original place
+        # in the ordering, so it doesn't count as a new entry
+        if len(phi_idx) == 0 or len(theta_idx) == 0 or np.all(fill_order[phi_idx, theta_idx] >= 0):
+            return
+        fill_order[phi_idx, theta_idx] = self._n_filled
+        self._n_filled += 1
+
     @classmethod
-    def load(cls, path: str | pathlib.Path) -> ExperimentResult:
+    def load(cls, path: str | pathlib.Path, dtype: str = "complex128") -> ExperimentResult:
         """Load an experiment result from a file.
 
-        This loads an .mdif file and attempts to construct an ExperimentResult
-        from it.
+        Files ending in `.npz` are loaded as binary results (see `save`). The
+        data in a binary result is memory-mapped rather than read, so opening
+        even a very large result is nearly instant, and only the slices that
+        are actually requested are read from disk. Any other file is treated
+        as an .mdif file.
 
         Args:
             path (str | pathlib.Path): path to file
+            dtype (str):
+                How to store the data of an .mdif file (see `__init__`). Binary
+                results keep the dtype they were saved with
 
         Returns:
             ExperimentResult:
@@ -109,6 +335,54 @@ class ExperimentResult(QObject):
         Raises:
             InvalidFileError: When the file is not a valid PyChamber results file
         """
+        if pathlib.Path(path).suffix.lower() == BINARY_SUFFIX:
+            return cls._load_binary(path)
+
+        try:
+            return cls._load_mdif(path, dtype)
+        except result_io.MDIFFormatError:
+            # Not laid out the way PyChamber writes .mdif files, so let
+            # scikit-rf have a go at it
+            return cls._load_mdif_networks(path, dtype)
+
+    @classmethod
+    def _load_mdif(cls, path: str | pathlib.Path, dtype: str = "complex128") -> ExperimentResult:
+        with result_io.MDIFReader(path) as reader:
+            try:
+                phis = np.array([float(var["phi"]) for var in reader.variables])
+                thetas = np.array([float(var["theta"]) for var in reader.variables])
+                pols = [str(var["polarization"]) for var in reader.variables]
+                calibrated = [var["calibrated"] == "True" for var in reader.variables]
+            except (TypeError, ValueError, KeyError) as e:
+                raise InvalidFileError(f"{path} is an invalid pychamber results file") from e
+
+            ret = cls(
+                thetas=np.unique(thetas),
+                phis=np.unique(phis),
+                polarizations=list(dict.fromkeys(pols)),
+                frequency=skrf.Frequency.from_f(reader.f_scaled, unit=reader.unit.lower()),
+                dtype=dtype,
+            )
+            phi_idxs = np.searchsorted(ret._phis, phis)
+            theta_idxs = np.searchsorted(ret._thetas, thetas)
+
+            for i, s in enumerate(reader.blocks()):
+                pol = pols[i]
+                phi_idx = phi_idxs[i : i + 1]
+                theta_idx = theta_idxs[i : i + 1]
+                if calibrated[i]:
+                    ret._caled_s_data[pol][:, phi_idx, theta_idx] = s.reshape((-1, 1))
+                    ret._mark_filled(ret._caled_fill_order[pol], phi_idx, theta_idx)
+                else:
+                    ret._s_data[pol][:, phi_idx, theta_idx] = s.reshape((-1, 1))
+                    ret._mark_filled(ret._fill_order[pol], phi_idx, theta_idx)
+
+            ret._load_comments(reader.comments)
+
+        return ret
+
+    @classmethod
+    def _load_mdif_networks(cls, path: str | pathlib.Path, dtype: str = "complex128") -> ExperimentResult:
         ns = skrf.NetworkSet.from_mdif(str(path))
         if not ns.has_params():
             raise InvalidFileError(f"{path} is an invalid pychamber results file")
@@ -124,42 +398,143 @@ class ExperimentResult(QObject):
         for ntwk in ns:
             ntwk.params["calibrated"] = ntwk.params["calibrated"] == "True"
 
-        ret = cls(thetas=thetas, phis=phis, polarizations=pols, frequency=frequency)
+        ret = cls(thetas=thetas, phis=phis, polarizations=pols, frequency=frequency, dtype=dtype)
 
         for ntwk in ns:
             pol = ntwk.params["polarization"]
-            phi_idx = np.where(ret._phis == ntwk.params["phi"])[0]
-            theta_idx = np.where(ret._thetas == ntwk.params["theta"])[0]
+            phi_idx, theta_idx = ret._exact_indices(ntwk.params["phi"], ntwk.params["theta"])
             if ntwk.params["calibrated"]:
                 ret._caled_s_data[pol][:, phi_idx, theta_idx] = ntwk.s.reshape((-1, 1))
+                ret._mark_filled(ret._caled_fill_order[pol], phi_idx, theta_idx)
             else:
                 ret._s_data[pol][:, phi_idx, theta_idx] = ntwk.s.reshape((-1, 1))
-        ret._ntwk_set = ns
+                ret._mark_filled(ret._fill_order[pol], phi_idx, theta_idx)
 
-        comments = [c.strip() for c in ns.comments.split("@")[:-1]]
-        for comment in comments:
-            var, val, *_ = comment.split("=")
-            if var == "created":
-                ret._created = datetime.strptime(val, "%d %b %Y - %H:%M")
-            elif var == "uuid":
-                ret._uuid = uuid.UUID(val)
+        ret._load_comments(ns.comments.split("\n"))
 
         return ret
 
+    def _load_comments(self, comments: list[str]) -> None:
+        for comment in comments:
+            for item in [c.strip() for c in comment.split("@")[:-1]]:
+                var, val, *_ = item.split("=")
+                if var == "created":
+                    self._created = datetime.strptime(val, "%d %b %Y - %H:%M")
+                elif var == "uuid":
+                    self._uuid = uuid.UUID(val)
+
     def save(self, path: str | pathlib.Path) -> None:
         """Save the result to a file.
 
-        Saves this result to a .mdif file. This is a text-based file format.
+        If the path ends in `.npz`, the result is saved in PyChamber's binary
+        format: an uncompressed numpy archive containing the raw and calibrated
+        data arrays (in this result's `dtype`) along with the angles,
+        frequencies, uuid and creation time.
+        This is much faster to write and read than .mdif, and much smaller.
+
+        Otherwise, the result is exported to a .mdif file, a text-based file
+        format readable by other tools.
 
         Args:
             path (str | pathlib.Path): The file to save the results to
         """
-        # Saving to MDIF fails if networks dont have a name, so just set the names to ""
-        for ntwk in self._ntwk_set:
-            if ntwk.name is None:
-                ntwk.name = ""
+        if pathlib.Path(path).suffix.lower() == BINARY_SUFFIX:
+            self._save_binary(path)
+            return
+
+        blocks = (
+            (
+                {
+                    "phi": self._phis[phi_idx],
+                    "theta": self._thetas[theta_idx],
+                    "polarization": pol,
+                    "calibrated": is_caled,
+                },
+                cube[:, phi_idx, theta_idx],
+            )
+            for _, pol, is_caled, cube, phi_idx, theta_idx in self._filled_entries()
+        )
+        self.rw_lock.lockForRead()
+        try:
+            result_io.write_mdif(
+                path,
+                self.frequency.f_scaled,
+                self.frequency.unit,
+                blocks,
+                comments=[f"created={self.created}@", f"uuid={self.uuid}@"],
+            )
+        finally:
+            self.rw_lock.unlock()
+
+    def _save_binary(self, path: str | pathlib.Path) -> None:
+        arrays = {
+            "format_version": np.array(BINARY_FORMAT_VERSION),
+            "thetas": self._thetas,
+            "phis": self._phis,
+            "f": self.f,
+            "polarizations": np.array(self._polarizations, dtype=str),
+            "uuid": np.array(self.uuid),
+            "created": np.array(self._created.isoformat()),
+            "n_filled": np.array(self._n_filled),
+            "dtype": np.array(self._dtype),
+        }
+        for i, pol in enumerate(self._polarizations):
+            for name, cube in [(f"s_data_{i}", self._s_data[pol]), (f"caled_s_data_{i}", self._caled_s_data[pol])]:
+                if isinstance(cube, MagPhaseCube):
+                    arrays[f"{name}_magnitude"] = cube.magnitude
+                    arrays[f"{name}_phase"] = cube.phase
+                else:
+                    arrays[name] = cube
+            arrays[f"fill_order_{i}"] = self._fill_order[pol]
+            arrays[f"caled_fill_order_{i}"] = self._caled_fill_order[pol]
+
+        self.rw_lock.lockForRead()
+        try:
+            result_io.write_npz(path, arrays)
+        finally:
+            self.rw_lock.unlock()
+
+    @classmethod
+    def _load_binary(cls, path: str | pathlib.Path) -> ExperimentResult:
+        try:
+            arrays = result_io.open_npz(path)
+            thetas = np.asarray(arrays["thetas"])
+            phis = np.asarray(arrays["phis"])
+            pols = [str(pol) for pol in arrays["polarizations"]]
+            frequency = skrf.Frequency.from_f(np.asarray(arrays["f"]), unit="hz")
+            dtype = str(arrays["dtype"]) if "dtype" in arrays else "complex128"
+            if dtype == "magphase16":
+                s_data = {
+                    pol: MagPhaseCube(arrays[f"s_data_{i}_magnitude"], arrays[f"s_data_{i}_phase"])
+                    for i, pol in enumerate(pols)
+                }
+                caled_s_data = {
+                    pol: MagPhaseCube(arrays[f"caled_s_data_{i}_magnitude"], arrays[f"caled_s_data_{i}_phase"])
+                    for i, pol in enumerate(pols)
+                }
+            else:
+                s_data = {pol: arrays[f"s_data_{i}"] for i, pol in enumerate(pols)}
+                caled_s_data = {pol: arrays[f"caled_s_data_{i}"] for i, pol in enumerate(pols)}
+            fill_order = {pol: np.array(arrays[f"fill_order_{i}"]) for i, pol in enumerate(pols)}
+            caled_fill_order = {pol: np.array(arrays[f"caled_fill_order_{i}"]) for i, pol in enumerate(pols)}
+            n_filled = int(arrays["n_filled"])
+            created = datetime.fromisoformat(str(arrays["created"]))
+            uuid_ = uuid.UUID(str(arrays["uuid"]))
+        except (result_io.ResultFileError, KeyError, ValueError) as e:
+            raise InvalidFileError(f"{path} is an invalid pychamber results file") from e
+        if dtype not in STORAGE_DTYPES:
+            raise InvalidFileError(f"{path} has an unknown storage dtype {dtype!r}")
+
+        ret = cls(thetas=thetas, phis=phis, polarizations=pols, frequency=frequency, allocate=False, dtype=dtype)
+        ret._s_data = s_data
+        ret._caled_s_data = caled_s_data
+        ret._fill_order = fill_order
+        ret._caled_fill_order = caled_fill_order
+        ret._n_filled = n_filled
+        ret._created = created
+        ret._uuid = uuid_
 
-        self._ntwk_set.write_mdif(path, comments=[f"created={self.created}@", f"uuid={self.uuid}@"])
+        return ret
 
     def get_unique_param_vals(self, param: str) -> list[Any]:
         """Get a list of unique values for the specified parameter.
@@ -205,18 +580,83 @@ class ExperimentResult(QObject):
             list[Any]:
                 List of unique values associated with the specified parameter.
         """
-        if len(self._ntwk_set) == 0:
+        if len(self) == 0:
             return []
-        if self._ntwk_set.params_values is None:
-            return []
-        try:
-            return list(set(self._ntwk_set.params_values[param]))
-        except KeyError:
+
+        filled = {pol: self._fill_order[pol] >= 0 for pol in self._polarizations}
+        caled_filled = {pol: self._caled_fill_order[pol] >= 0 for pol in self._polarizations}
+        if param == "phi":
+            any_filled = np.logical_or.reduce([*filled.values(), *caled_filled.values()])
+            return list(set(self._phis[any_filled.any(axis=1)]))
+        elif param == "theta":
+            any_filled = np.logical_or.reduce([*filled.values(), *caled_filled.values()])
+            return list(set(self._thetas[any_filled.any(axis=0)]))
+        elif param == "polarization":
+            return [pol for pol in self._polarizations if filled[pol].any() or caled_filled[pol].any()]
+        elif param == "calibrated":
+            has_raw = any(mask.any() for mask in filled.values())
+            has_caled = any(mask.any() for mask in caled_filled.values())
+            return [val for val, present in [(False, has_raw), (True, has_caled)] if present]
+        else:
             return []
 
-    def _find_nearest(self, array, value) -> tuple:
-        idx = np.nanargmin(np.abs(array - value))
-        return (idx, array[idx])
+    @staticmethod
+    def _nearest_index(array: np.ndarray, values, sorter: np.ndarray | None = None) -> np.ndarray:
+        # Index of the closest element of `array` (sorted, or sorted by
+        # `sorter`) to each value. Ties go to the lower value
+        values = np.asarray(values, dtype=float)
+        sorted_array = array if sorter is None else array[sorter]
+        right = np.clip(np.searchsorted(sorted_array, values), 1, max(len(sorted_array) - 1, 1))
+        left = right - 1
+        if len(sorted_array) == 1:
+            idx = np.zeros_like(right)
+        else:
+            idx = np.where(values - sorted_array[left] <= sorted_array[right] - values, left, right)
+        if sorter is not None:
+            idx = sorter[idx]
+        return idx[()] if idx.ndim == 0 else idx
+
+    def _exact_indices(self, phi: float, theta: float) -> tuple[np.ndarray, np.ndarray]:
+        # Indices of an exact (phi, theta) location, as arrays that are empty
+        # if the location isn't part of this result
+        phi_idx = self._phi_index.get(float(phi))
+        theta_idx = self._theta_index.get(float(theta))
+        return (
+            np.array([] if phi_idx is None else [phi_idx], dtype=np.intp),
+            np.array([] if theta_idx is None else [theta_idx], dtype=np.intp),
+        )
+
+    def indices_for(
+        self,
+        thetas: float | np.ndarray | None = None,
+        phis: float | np.ndarray | None = None,
+        freqs: float | np.ndarray | None = None,
+    ) -> tuple[np.ndarray | None, np.ndarray | None, np.ndarray | None]:
+        """Find the indices of the closest thetas, phis and frequencies.
+
+        Each argument can be a single value or an array of any shape; the
+        returned indices have the same shape. This is much faster than
+        looking up many values one at a time. For example, to get the data at
+        several (theta, phi) points:
+
+        ```
+        theta_idx, phi_idx, _ = result.indices_for(thetas=[0, 10, 20], phis=[90, 90, 45])
+        ```
+
+        Args:
+            thetas: Theta values to look up (in degrees)
+            phis: Phi values to look up (in degrees)
+            freqs: Frequencies to look up (in Hz)
+
+        Returns:
+            tuple[np.ndarray | None, np.ndarray | None, np.ndarray | None]:
+                The (theta, phi, frequency) indices. Any lookup whose values
+                weren't passed is None
+        """
+        theta_idx = None if thetas is None else self._nearest_index(self._thetas, thetas)
+        phi_idx = None if phis is None else self._nearest_index(self._phis, phis)
+        f_idx = None if freqs is None else self._nearest_index(self.f, freqs, self._f_sorter)
+        return theta_idx, phi_idx, f_idx
 
     @property
     def frequency(self) -> skrf.Frequency:
@@ -246,17 +686,19 @@ class ExperimentResult(QObject):
     @property
     def params(self) -> list | None:
         """The parameter names in this result"""
-        return self._ntwk_set.params
+        if len(self) == 0:
+            return None
+        return ["phi", "theta", "polarization", "calibrated"]
 
     @property
     def raw_data(self) -> skrf.NetworkSet:
         """The subset of this result that has not been calibrated"""
-        return self._ntwk_set.sel({"calibrated": False})
+        return skrf.NetworkSet([ntwk for ntwk in self._ntwk_set if not ntwk.params["calibrated"]])
 
     @property
     def calibrated_data(self) -> skrf.NetworkSet:
         """The subset of this result that has been calibrated"""
-        return self._ntwk_set.sel({"calibrated": True})
+        return skrf.NetworkSet([ntwk for ntwk in self._ntwk_set if ntwk.params["calibrated"]])
 
     @property
     def uuid(self) -> str:
@@ -271,10 +713,48 @@ class ExperimentResult(QObject):
     @property
     def has_calibrated_data(self) -> bool:
         """Whether or not this result contains calibrated data"""
-        calibrated = self._ntwk_set.params_values["calibrated"]
-        return True in calibrated
+        return any((fill_order >= 0).any() for fill_order in self._caled_fill_order.values())
+
+    def is_measured(self, theta: float, phi: float, polarization: str | None = None) -> bool:
+        """Whether raw data has been appended at the specified location.
 
-    def get_theta_cut(self, polarization: str, frequency: float, phi: float, calibrated: bool = False):
+        Args:
+            theta (float): The theta value of the point
+            phi (float): The phi value of the point
+            polarization (str | None):
+                The polarization to check. If None, the point only counts as
+                measured if every polarization has been measured there
+
+        Returns:
+            bool: True if the point has been measured
+        """
+        phi_idx, theta_idx = self._exact_indices(phi, theta)
+        if len(phi_idx) == 0 or len(theta_idx) == 0:
+            return False
+
+        pols = self._polarizations if polarization is None else [polarization]
+        return all(np.all(self._fill_order[pol][phi_idx, theta_idx] >= 0) for pol in pols)
+
+    def _get_slice(
+        self,
+        polarization: str,
+        calibrated: bool,
+        quantity: str | None,
+        f_idx: int | None,
+        phi_idx: int | None,
+        theta_idx: int | None,
+    ) -> np.ndarray:
+        cube = self._caled_s_data[polarization] if calibrated else self._s_data[polarization]
+        key = tuple(slice(None) if idx is None else idx for idx in (f_idx, phi_idx, theta_idx))
+        if quantity is None:
+            return cube[key]
+
+        slice_key = tuple(None if idx is None else int(idx) for idx in (f_idx, phi_idx, theta_idx))
+        return self._derived.get(polarization, calibrated, quantity, slice_key, lambda: cube[key])
+
+    def get_theta_cut(
+        self, polarization: str, frequency: float, phi: float, calibrated: bool = False, quantity: str | None = None
+    ):
         """Get a subset of data for all thetas and a specific phi.
 
         Args:
@@ -282,19 +762,23 @@ class ExperimentResult(QObject):
             frequency (float): What frequency you want data for
             phi (float): The phi value you want a theta cut for
             calibrated (bool): Pass True to request calibrated data
+            quantity (str | None):
+                If passed, get this quantity (one of
+                `pychamber.derived_cache.QUANTITIES`, e.g. "db") instead of the
+                complex data. Derived quantities are cached until a point in
+                the cut changes, and are read-only
 
         Returns:
-            (np.ndarray): A numpy array of the requested data
+            (np.ndarray):
+                A numpy array of the requested data. Complex data is
+                complex64 if the result is stored at reduced precision
         """
-        f_idx, _ = self._find_nearest(self.f, frequency)
-        phi_idx, _ = self._find_nearest(self._phis, phi)
+        _, phi_idx, f_idx = self.indices_for(phis=phi, freqs=frequency)
+        return self._get_slice(polarization, calibrated, quantity, f_idx, phi_idx, None)
 
-        if calibrated:
-            return self._caled_s_data[polarization][f_idx, phi_idx, :]
-
-        return self._s_data[polarization][f_idx, phi_idx, :]
-
-    def get_phi_cut(self, polarization: str, frequency: float, theta: float, calibrated: bool = False):
+    def get_phi_cut(
+        self, polarization: str, frequency: float, theta: float, calibrated: bool = False, quantity: str | None = None
+    ):
         """Get a subset of data for all phis and a specific theta.
 
         Args:
@@ -302,19 +786,17 @@ class ExperimentResult(QObject):
             frequency (float): What frequency you want data for
             theta (float): The theta value you want a phi cut for
             calibrated (bool): Pass True to request calibrated data
+            quantity (str | None): If passed, get this derived quantity instead (see `get_theta_cut`)
 
         Returns:
             (np.ndarray): A numpy array of the requested data
         """
-        f_idx, _ = self._find_nearest(self.f, frequency)
-        theta_idx, _ = self._find_nearest(self._thetas, theta)
-
-        if calibrated:
-            return self._caled_s_data[polarization][f_idx, :, theta_idx]
-
-        return self._s_data[polarization][f_idx, :, theta_idx]
+        theta_idx, _, f_idx = self.indices_for(thetas=theta, freqs=frequency)
+        return self._get_slice(polarization, calibrated, quantity, f_idx, None, theta_idx)
 
-    def get_over_freq_vals(self, polarization: str, theta: float, phi: float, calibrated: bool = False):
+    def get_over_freq_vals(
+        self, polarization: str, theta: float, phi: float, calibrated: bool = False, quantity: str | None = None
+    ):
         """Get a subset of data for all frequencies at the specified theta and phi.
 
         Args:
@@ -322,41 +804,95 @@ class ExperimentResult(QObject):
             theta (float): The theta value you want a phi cut for
             phi (float): The phi value you want a theta cut for
             calibrated (bool): Pass True to request calibrated data
+            quantity (str | None): If passed, get this derived quantity instead (see `get_theta_cut`)
 
         Returns:
             (np.ndarray): A numpy array of the requested data
         """
-        phi_idx, _ = self._find_nearest(self._phis, phi)
-        theta_idx, _ = self._find_nearest(self._thetas, theta)
+        theta_idx, phi_idx, _ = self.indices_for(thetas=theta, phis=phi)
+        return self._get_slice(polarization, calibrated, quantity, None, phi_idx, theta_idx)
 
-        if calibrated:
-            return self._caled_s_data[polarization][:, phi_idx, theta_idx]
-
-        return self._s_data[polarization][:, phi_idx, theta_idx]
-
-    def get_3d_data(self, polarization: str, frequency: float, calibrated: bool = False):
+    def get_3d_data(self, polarization: str, frequency: float, calibrated: bool = False, quantity: str | None = None):
         """Get a subset of data for all thetas and phis at the specified frequency.
 
         Args:
             polarization (str): The name of the polarization you want data for
             frequency (float): What frequency you want data for
             calibrated (bool): Pass True to request calibrated data
+            quantity (str | None): If passed, get this derived quantity instead (see `get_theta_cut`)
 
         Returns:
             (np.ndarray): A 2D numpy array of the requested data
         """
-        f_idx, _ = self._find_nearest(self.f, frequency)
+        _, _, f_idx = self.indices_for(freqs=frequency)
+        return self._get_slice(polarization, calibrated, quantity, f_idx, None, None)
 
-        if calibrated:
-            return self._caled_s_data[polarization][f_idx]
+    def insert_angles(self, thetas=None, phis=None) -> None:
+        """Add thetas and/or phis to the result.
 
-        return self._s_data[polarization][f_idx]
+        The new angles can go anywhere on their axes (which stay sorted), so
+        the result doesn't have to be a uniform grid. Every point at a new
+        angle starts out unmeasured. Angles the result already has are
+        ignored. The data is copied into larger arrays, so it's much faster to
+        insert angles in batches than one at a time.
+
+        Args:
+            thetas: Theta values to add (in degrees)
+            phis: Phi values to add (in degrees)
+        """
+        new_thetas = np.setdiff1d(np.asarray([] if thetas is None else thetas, dtype=float), self._thetas)
+        new_phis = np.setdiff1d(np.asarray([] if phis is None else phis, dtype=float), self._phis)
+        if len(new_thetas) == 0 and len(new_phis) == 0:
+            return
+
+        all_thetas = np.sort(np.concatenate([self._thetas, new_thetas]))
+        all_phis = np.sort(np.concatenate([self._phis, new_phis]))
+        # Where each existing angle ends up
+        theta_pos = np.searchsorted(all_thetas, self._thetas)
+        phi_pos = np.searchsorted(all_phis, self._phis)
+
+        self.rw_lock.lockForWrite()
+
+        old_data = (self._s_data, self._caled_s_data)
+        self._thetas = all_thetas
+        self._phis = all_phis
+        self._s_data, self._caled_s_data = (
+            {pol: self._grow_cube(cube, phi_pos, theta_pos) for pol, cube in data.items()} for data in old_data
+        )
+        for fill_orders in (self._fill_order, self._caled_fill_order):
+            for pol, fill_order in fill_orders.items():
+                grown = np.full((len(all_phis), len(all_thetas)), -1, dtype=np.int64)
+                grown[np.ix_(phi_pos, theta_pos)] = fill_order
+                fill_orders[pol] = grown
+        self._phi_index = {float(phi): i for i, phi in enumerate(self._phis)}
+        self._theta_index = {float(theta): i for i, theta in enumerate(self._thetas)}
+        self._derived.clear()
+        self._ntwk_set_cache = None
+
+        self.rw_lock.unlock()
+
+    def _grow_cube(self, cube, phi_pos: np.ndarray, theta_pos: np.ndarray):
+        # A new cube the size of the current axes with the old data moved to
+        # its new positions, copied a phi at a time to bound memory use
+        grown = self._new_cube()
+        if isinstance(cube, MagPhaseCube):
+            # Copy the encoded data as is, rather than decoding and re-encoding
+            pairs = [(cube.magnitude, grown.magnitude), (cube.phase, grown.phase)]
+        else:
+            pairs = [(cube, grown)]
+        for src, dst in pairs:
+            for i, pos in enumerate(phi_pos):
+                dst[:, pos, theta_pos] = src[:, i, :]
+        return grown
 
     def append(self, ntwk: skrf.Network, calibration: Calibration | None = None) -> None:
         """Append a data point to the result.
 
-        This command locks the internal QReadWriteLock, which really only
-        matters when running in a QApplication.
+        Only the underlying data arrays are written to, so appending takes the
+        same time whether the result is empty or nearly full. Only the cached
+        derived quantities (see `get_theta_cut`) containing this point are
+        dropped. This command locks the internal QReadWriteLock, which really
+        only matters when running in a QApplication.
 
         Args:
             ntwk (skrf.network.Network): The data to append
@@ -364,35 +900,114 @@ class ExperimentResult(QObject):
                 If a calibration is passed, the raw data and the data after
                 applying the calibration will be appended to the result
         """
-        name = self._ntwk_set.name
-        pol = ntwk.params["polarization"]
-        phi_idx = np.where(self._phis == ntwk.params["phi"])[0]
-        theta_idx = np.where(self._thetas == ntwk.params["theta"])[0]
-        new_ns_list = [*self._ntwk_set, ntwk]
-
-        caled_ntwk: skrf.Network | None = None
+        self.append_many([ntwk], calibration=calibration)
 
-        if calibration is not None:
-            cal = cast(skrf.Network, calibration.get_polarization(pol))
-            calibrated = ntwk / cal.interpolate(self.frequency, kind="nearest")
-            caled_ntwk = calibrated.copy()
-            caled_ntwk.params = calibrated.params.copy()
-            caled_ntwk.params["calibrated"] = True
+    def append_many(self, ntwks: Iterable[skrf.Network], calibration: Calibration | None = None) -> None:
+        """Append several data points to the result at once.
 
-        if caled_ntwk is not None:
-            new_ns_list.append(caled_ntwk)
-        new_ns = skrf.NetworkSet(new_ns_list, name=name)
+        This is the same as calling `append` for each network, but the lock is
+        only taken once and `dataAppended` is only emitted once. Networks whose
+        "calibrated" param is True (e.g. replayed from a journal) are written
+        to the calibrated data rather than the raw data.
 
+        Args:
+            ntwks (Iterable[skrf.network.Network]): The data to append
+            calibration (Calibration | None):
+                If a calibration is passed, the raw data and the data after
+                applying the calibration will be appended to the result
+        """
+        points = []
+        for ntwk in ntwks:
+            pol = ntwk.params["polarization"]
+            phi_idx, theta_idx = self._exact_indices(ntwk.params["phi"], ntwk.params["theta"])
+            if len(phi_idx) == 0 or len(theta_idx) == 0:
+                continue
+            s = ntwk.s.reshape(-1)
+            if ntwk.params.get("calibrated", False):
+                points.append((pol, phi_idx, theta_idx, None, s))
+                continue
+            caled_s = None if calibration is None else s / calibration.get_interpolated(pol, self.frequency)
+            points.append((pol, phi_idx, theta_idx, s, caled_s))
+
+        dirty = DirtyRegions()
         self.rw_lock.lockForWrite()
 
-        self._ntwk_set = new_ns
-        if caled_ntwk is not None:
-            self._caled_s_data[pol][:, phi_idx, theta_idx] = caled_ntwk.s.reshape((-1, 1))
-        self._s_data[pol][:, phi_idx, theta_idx] = ntwk.s.reshape((-1, 1))
+        for pol, phi_idx, theta_idx, s, caled_s in points:
+            # The raw data is filled first, so it comes before the calibrated
+            # data when iterating
+            if s is not None:
+                self._s_data[pol][:, phi_idx, theta_idx] = s.reshape((-1, 1))
+                self._mark_filled(self._fill_order[pol], phi_idx, theta_idx)
+                dirty.add(pol, False, phi_idx[0], theta_idx[0])
+            if caled_s is not None:
+                self._caled_s_data[pol][:, phi_idx, theta_idx] = caled_s.reshape((-1, 1))
+                self._mark_filled(self._caled_fill_order[pol], phi_idx, theta_idx)
+                dirty.add(pol, True, phi_idx[0], theta_idx[0])
+            # None invalidates both the raw and calibrated data
+            calibrated = None if s is not None and caled_s is not None else s is None
+            self._derived.invalidate(pol, calibrated=calibrated, phi_idx=phi_idx[0], theta_idx=theta_idx[0])
+        self._ntwk_set_cache = None
 
         self.rw_lock.unlock()
 
-        self.dataAppended.emit()
+        self._notify(dirty)
+
+    def append_continuous(
+        self,
+        theta: float,
+        phis,
+        data: dict[str, np.ndarray],
+        method: str = "interpolate",
+        calibration: Calibration | None = None,
+    ) -> list[skrf.Network]:
+        """Append a cut measured with phi moving, resampled onto the phi grid.
+
+        Every phi point of the result between the first and last sample is
+        filled in. See `pychamber.continuous`.
+
+        Args:
+            theta (float): The theta of the cut
+            phis: The phi each sample was taken at (in degrees)
+            data (dict[str, np.ndarray]): The samples of each polarization,
+                shaped (sample, frequency)
+            method (str): How to resample. One of `pychamber.continuous.RESAMPLE_METHODS`
+            calibration (Calibration | None):
+                If a calibration is passed, the raw data and the data after
+                applying the calibration will be appended to the result
+
+        Returns:
+            list[skrf.Network]: The appended networks
+        """
+        phis = np.asarray(phis, dtype=float)
+        grid = self.phis[(self.phis >= phis.min()) & (self.phis <= phis.max())]
+        ntwks = []
+        for pol, samples in data.items():
+            resampled = resample(phis, samples, grid, method)
+            for phi, s in zip(grid, resampled, strict=True):
+                ntwk = skrf.Network(frequency=self.frequency, s=s.reshape((-1, 1, 1)))
+                ntwk.params = {"phi": float(phi), "theta": theta, "polarization": pol, "calibrated": False}
+                ntwks.append(ntwk)
+
+        self.append_many(ntwks, calibration=calibration)
+        return ntwks
+
+    def _notify(self, dirty: DirtyRegions) -> None:
+        if not dirty:
+            return
+        if self.notify_interval <= 0:
+            self.dataAppended.emit(dirty)
+            return
+
+        self._pending_dirty.update(dirty)
+        if not self._notify_timer.isActive():
+            self._notify_timer.start(self.notify_interval)
+
+    def flush_notifications(self) -> None:
+        """Emit `dataAppended` for any appends still waiting out `notify_interval`."""
+        self._notify_timer.stop()
+        dirty, self._pending_dirty = self._pending_dirty, DirtyRegions()
+        if dirty:
+            self.dataAppended.emit(dirty)
 
     def apply_calibration(self, calibration: Calibration) -> None:
         """Applies a calibration to this result.
@@ -412,30 +1027,33 @@ class ExperimentResult(QObject):
             if pol not in calibration.polarizations:
                 raise ValueError(f"Cannot apply this calibration. It does not contain data for polarization: {pol}.")
 
-        calibrated_ntwks = []
-        for pol in self.polarizations:
-            uncalibrated = self._ntwk_set.sel({"polarization": pol})
-            cal_ntwk = cast(skrf.Network, calibration.get_polarization(pol))
-            calibrated = uncalibrated / cal_ntwk.interpolate(self.frequency, kind="nearest")
-            # Fix when skrf #887 merged
-            for ntwk in calibrated:
-                caled_ntwk = ntwk.copy()
-                caled_ntwk.params = ntwk.params.copy()
-                caled_ntwk.params["calibrated"] = True
-                calibrated_ntwks.append(caled_ntwk)
-
-        name = self._ntwk_set.name
-        new_ns_list = [*self._ntwk_set.ntwk_set, *calibrated_ntwks]
-        new_ns = skrf.NetworkSet(new_ns_list, name=name)
-
         self.rw_lock.lockForWrite()
 
-        self._ntwk_set = new_ns
-        for ntwk in calibrated_ntwks:
-            pol = ntwk.params["polarization"]
-            phi_idx = np.where(self._phis == ntwk.params["phi"])[0]
-            theta_idx = np.where(self._thetas == ntwk.params["theta"])[0]
-
-            self._caled_s_data[pol][:, phi_idx, theta_idx] = ntwk.s.reshape((-1, 1))
+        for pol in self.polarizations:
+            filled = self._fill_order[pol] >= 0
+            n_points = int(filled.sum())
+            if n_points == 0:
+                continue
+
+            cal = calibration.get_interpolated(pol, self.frequency)
+            raw = self._s_data[pol]
+            caled = self._caled_s_data[pol]
+            # Divide every measured point at once, a block of frequencies at a
+            # time so a disk-backed cube never has to fit in memory
+            step = max(1, _CALIBRATION_BLOCK_SIZE // n_points)
+            for start in range(0, len(cal), step):
+                block = slice(start, start + step)
+                caled[block, filled] = raw[block, filled] / cal[block, np.newaxis]
+
+            # Newly calibrated points are ordered after everything else, in the
+            # order their raw data was measured
+            caled_order = self._caled_fill_order[pol]
+            new = filled & (caled_order < 0)
+            ranks = np.argsort(np.argsort(self._fill_order[pol][new], kind="stable"), kind="stable")
+            caled_order[new] = self._n_filled + ranks
+            self._n_filled += int(new.sum())
+
+        self._ntwk_set_cache = None
+        self._derived.invalidate(calibrated=True)
 
         self.rw_lock.unlock()
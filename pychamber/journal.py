@@ -0,0 +1,341 @@
+"""Crash-safe journaling of experiments in progress.
+
+While an experiment runs, each acquired data point is appended to a journal
+file. If the experiment is interrupted (power loss, a VISA timeout, a crash,
+etc.), the journal can be used to rebuild everything measured so far and to
+resume the experiment from the first missing point.
+
+A journal file consists of
+
+- a magic line (`PYCHAMBER-JOURNAL <version>\\n`)
+- a header: a little-endian uint32 length followed by that many bytes of JSON
+  describing the experiment (angles, polarizations, frequencies, etc.)
+- any number of fixed-size records, one per acquired network, each ending in a
+  CRC32 so a record torn by a crash can be detected and discarded
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pychamber.experiment_result import ExperimentResult
+
+import contextlib
+import json
+import os
+import pathlib
+import queue
+import struct
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime
+
+import numpy as np
+import platformdirs
+import skrf
+
+JOURNAL_VERSION = 1
+JOURNAL_SUFFIX = ".pcj"
+
+_MAGIC = f"PYCHAMBER-JOURNAL {JOURNAL_VERSION}\n".encode("ascii")
+_HEADER_LEN = struct.Struct("<I")
+_RECORD_HEADER = struct.Struct("<IddB")  # polarization index, phi, theta, calibrated
+_CRC = struct.Struct("<I")
+
+
+def journal_dir() -> pathlib.Path:
+    """The directory the GUI keeps journals in, created if necessary."""
+    path = pathlib.Path(platformdirs.user_data_dir("PyChamber", "PyChamber")) / "journals"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+class JournalError(Exception):
+    """Raised when a journal file can't be read."""
+
+    pass
+
+
+class ScanJournal:
+    """An append-only journal of an experiment in progress.
+
+    Appending to the journal only places the data in a queue; a background
+    thread does the actual writing, flushing the file whenever the queue
+    empties and fsync'ing it at most every `sync_interval` seconds. This way,
+    journaling never blocks the thread acquiring data. If writing fails (e.g.
+    the disk is full), the error is raised from the next `append` or `close`.
+
+    Use `ScanJournal.create` to start a new journal, or `ScanJournal.resume` to
+    continue an existing one.
+    """
+
+    def __init__(self, path: str | pathlib.Path, header: dict, sync_interval: float = 1.0) -> None:
+        """
+        Args:
+            path: The journal file. It must already contain a valid header
+            header: The journal header
+            sync_interval: Maximum time (in seconds) between fsyncs
+        """
+        self.path = path
+        self.header = header
+        self.sync_interval = sync_interval
+
+        self._pol_idx = {pol[0]: i for i, pol in enumerate(header["polarizations"])}
+        self._n_freq = len(header["f"])
+        self._queue: queue.Queue[tuple[int, float, float, bool, np.ndarray] | None] = queue.Queue()
+        self._fp = open(path, "ab")  # noqa: SIM115
+        # The error the writer thread stopped on, if it failed
+        self._error: OSError | None = None
+        self._writer = threading.Thread(target=self._write_loop, name="ScanJournalWriter", daemon=True)
+        self._writer.start()
+
+    @classmethod
+    def create(
+        cls,
+        path: str | pathlib.Path,
+        result: ExperimentResult,
+        polarizations: list[tuple[str, int, int]],
+        sync_interval: float = 1.0,
+    ) -> ScanJournal:
+        """Create a new journal for an experiment.
+
+        Args:
+            path: Where to create the journal. An existing file is overwritten
+            result: The (empty) result the experiment will be filling
+            polarizations: List of (name, a, b) being measured
+            sync_interval: Maximum time (in seconds) between fsyncs
+
+        Returns:
+            ScanJournal: The new journal, ready to be appended to
+        """
+        header = {
+            "uuid": result.uuid,
+            "created": result._created.isoformat(),
+            "thetas": [float(theta) for theta in result.thetas],
+            "phis": [float(phi) for phi in result.phis],
+            "polarizations": [[name, a, b] for name, a, b in polarizations],
+            "f": [float(f) for f in result.f],
+            "dtype": result.dtype,
+        }
+        header_bytes = json.dumps(header).encode("utf-8")
+        with open(path, "wb") as fp:
+            fp.write(_MAGIC)
+            fp.write(_HEADER_LEN.pack(len(header_bytes)))
+            fp.write(header_bytes)
+            fp.flush()
+            os.fsync(fp.fileno())
+
+        return cls(path, header, sync_interval=sync_interval)
+
+    @staticmethod
+    def default_path(result: ExperimentResult) -> pathlib.Path:
+        """Where the GUI keeps the journal for a result.
+
+        Args:
+            result: The result being journaled
+
+        Returns:
+            Path: `<user data dir>/journals/<uuid>.pcj`
+        """
+        return journal_dir() / f"{result.uuid}{JOURNAL_SUFFIX}"
+
+    @classmethod
+    def resume(cls, path: str | pathlib.Path, sync_interval: float = 1.0) -> tuple[ScanJournal, ExperimentResult]:
+        """Reopen a partial journal to continue an experiment.
+
+        Any incomplete record at the end of the file (e.g. from a crash in the
+        middle of a write) is discarded before appending resumes.
+
+        Args:
+            path: The journal file
+            sync_interval: Maximum time (in seconds) between fsyncs
+
+        Returns:
+            tuple[ScanJournal, ExperimentResult]:
+                The reopened journal and a result containing everything
+                recorded in it so far
+        """
+        header, result, valid_len = cls._read(path)
+        with open(path, "r+b") as fp:
+            fp.truncate(valid_len)
+
+        return cls(path, header, sync_interval=sync_interval), result
+
+    @classmethod
+    def read(cls, path: str | pathlib.Path) -> ExperimentResult:
+        """Rebuild the result recorded in a journal.
+
+        Args:
+            path: The journal file
+
+        Returns:
+            ExperimentResult: A result containing everything in the journal
+
+        Raises:
+            JournalError: If the file isn't a valid journal
+        """
+        _, result, _ = cls._read(path)
+        return result
+
+    @classmethod
+    def read_header(cls, path: str | pathlib.Path) -> dict:
+        """Read just the header of a journal.
+
+        Args:
+            path: The journal file
+
+        Returns:
+            dict: The header
+
+        Raises:
+            JournalError: If the file isn't a valid journal
+        """
+        with open(path, "rb") as fp:
+            return cls._read_header(fp, path)
+
+    @staticmethod
+    def _read_header(fp, path: str | pathlib.Path) -> dict:
+        if fp.read(len(_MAGIC)) != _MAGIC:
+            raise JournalError(f"{path} is not a PyChamber journal")
+        try:
+            (header_len,) = _HEADER_LEN.unpack(fp.read(_HEADER_LEN.size))
+            header = json.loads(fp.read(header_len).decode("utf-8"))
+        except (struct.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise JournalError(f"{path} has a corrupt header") from e
+        else:
+            return header
+
+    @classmethod
+    def _read(cls, path: str | pathlib.Path) -> tuple[dict, ExperimentResult, int]:
+        from pychamber.app.logger import LOG
+        from pychamber.experiment_result import ExperimentResult
+
+        with open(path, "rb") as fp:
+            header = cls._read_header(fp, path)
+            valid_len = fp.tell()
+
+            pols = [pol[0] for pol in header["polarizations"]]
+            frequency = skrf.Frequency.from_f(np.array(header["f"]), unit="hz")
+            result = ExperimentResult(
+                thetas=np.array(header["thetas"]),
+                phis=np.array(header["phis"]),
+                polarizations=pols,
+                frequency=frequency,
+                dtype=header.get("dtype", "complex128"),
+            )
+            result._uuid = uuid.UUID(header["uuid"])
+            result._created = datetime.fromisoformat(header["created"])
+
+            data_size = len(frequency) * np.dtype(complex).itemsize
+            record_size = _RECORD_HEADER.size + data_size + _CRC.size
+            ntwks = []
+            while True:
+                record = fp.read(record_size)
+                if len(record) < record_size:
+                    break
+                body, (crc,) = record[: -_CRC.size], _CRC.unpack(record[-_CRC.size :])
+                if zlib.crc32(body) != crc:
+                    LOG.warning(f"Discarding corrupt journal record at offset {valid_len} in {path}")
+                    break
+
+                pol_idx, phi, theta, calibrated = _RECORD_HEADER.unpack(body[: _RECORD_HEADER.size])
+                s = np.frombuffer(body[_RECORD_HEADER.size :], dtype=complex)
+                ntwk = skrf.Network(
+                    frequency=frequency,
+                    s=s.reshape((-1, 1, 1)),
+                    params={"phi": phi, "theta": theta, "polarization": pols[pol_idx], "calibrated": bool(calibrated)},
+                )
+                ntwks.append(ntwk)
+                valid_len += record_size
+
+        # Adaptive scans add angles as they go, which aren't in the header
+        result.insert_angles(
+            thetas=[ntwk.params["theta"] for ntwk in ntwks], phis=[ntwk.params["phi"] for ntwk in ntwks]
+        )
+        result.append_many(ntwks)
+        return header, result, valid_len
+
+    @property
+    def polarizations(self) -> list[tuple[str, int, int]]:
+        """The polarizations being measured, as (name, a, b)"""
+        return [(name, a, b) for name, a, b in self.header["polarizations"]]
+
+    def append(self, ntwk: skrf.Network) -> None:
+        """Queue a network to be written to the journal.
+
+        This returns immediately; the network is written in the background.
+
+        Args:
+            ntwk: The network to record. Its params must contain the phi,
+                theta, polarization and calibrated keys
+
+        Raises:
+            OSError: If writing to the journal has failed
+        """
+        self._raise_error()
+        params = ntwk.params
+        s = np.ascontiguousarray(ntwk.s.reshape(-1), dtype=complex)
+        if len(s) != self._n_freq:
+            raise ValueError(f"Expected {self._n_freq} frequency points, got {len(s)}")
+        pol_idx = self._pol_idx[params["polarization"]]
+        self._queue.put((pol_idx, float(params["phi"]), float(params["theta"]), bool(params["calibrated"]), s))
+
+    def close(self) -> None:
+        """Write everything still queued, sync the file, and close it.
+
+        Raises:
+            OSError: If writing to the journal has failed
+        """
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _write_loop(self) -> None:
+        last_sync = time.monotonic()
+        # Whether anything has been written since the last fsync
+        unsynced = False
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.sync_interval)
+                except queue.Empty:
+                    if unsynced:
+                        os.fsync(self._fp.fileno())
+                        unsynced = False
+                    last_sync = time.monotonic()
+                    continue
+
+                if item is None:
+                    break
+
+                pol_idx, phi, theta, calibrated, s = item
+                body = _RECORD_HEADER.pack(pol_idx, phi, theta, calibrated) + s.tobytes()
+                self._fp.write(body + _CRC.pack(zlib.crc32(body)))
+                unsynced = True
+
+                if self._queue.empty():
+                    self._fp.flush()
+                    if time.monotonic() - last_sync >= self.sync_interval:
+                        os.fsync(self._fp.fileno())
+                        unsynced = False
+                        last_sync = time.monotonic()
+
+            self._fp.flush()
+            if unsynced:
+                os.fsync(self._fp.fileno())
+        except OSError as e:
+            from pychamber.app.logger import LOG
+
+            LOG.exception(f"Failed writing to journal {self.path}")
+            self._error = e
+        finally:
+            # Closing flushes, which fails again if writing did
+            with contextlib.suppress(OSError):
+                self._fp.close()
@@ -0,0 +1,189 @@
+"""Pipelined acquisition.
+
+Measuring a point takes a few steps: move the positioner there, sweep the VNA,
+transfer and parse the data, then record it (append it to the result, journal
+it, update plots, etc.). Done one after the other, the positioner sits idle
+for everything after the sweep.
+
+Only the move and the sweep need the positioner, so `AcquisitionPipeline`
+splits acquisition into two stages running in parallel:
+
+- the motion stage (in the calling thread) moves to each point and sweeps
+- the transfer stage (in a background thread) fetches the data of each sweep
+  and hands it off to be recorded
+
+The stages are connected by a bounded queue. As soon as a sweep completes, the
+motion stage starts moving to the next point while the transfer stage reads
+and records the last one. The VNA is only ever used by one stage at a time:
+the next sweep waits until the data of the last one has been fetched.
+
+How much is moved off the critical path depends on the reader: any reader can
+overlap recording the data with the next move, and a reader that can fetch
+data separately from sweeping (like `pychamber.capture.BulkCapture`) overlaps
+the transfer as well.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    import skrf
+
+    from pychamber.timing import ScanTimings
+
+import contextlib
+import queue
+import threading
+
+Point = tuple[float, float]
+
+
+class Reader(Protocol):
+    """Reads the data of every polarization at a point from a VNA.
+
+    `sweep` is called with the positioner stopped at the point, and must not
+    return until the positioner is free to move again. `fetch` is called
+    afterwards (possibly while the positioner is moving) and returns the data
+    of the last sweep. `setup` and `teardown` are called once, before the
+    first and after the last point. See `pychamber.capture` for readers.
+    """
+
+    def setup(self) -> None:
+        ...
+
+    def teardown(self) -> None:
+        ...
+
+    def sweep(self) -> None:
+        ...
+
+    def fetch(self) -> list[skrf.Network]:
+        ...
+
+
+class AcquisitionPipeline:
+    """Runs the motion and transfer stages of an acquisition in parallel.
+
+    Any exception raised in the transfer stage stops the pipeline and is
+    re-raised from `run`.
+    """
+
+    def __init__(
+        self,
+        move: Callable[[float, float], None],
+        reader: Reader,
+        record: Callable[[float, float, list[skrf.Network]], None],
+        timings: ScanTimings | None = None,
+    ) -> None:
+        """
+        Args:
+            move: Moves the positioner to a (theta, phi) point, returning once
+                the move completes
+            reader: Reads the VNA
+            record: Called in the transfer stage with the theta, phi and data
+                of each point
+            timings: If passed, the move, sweep and transfer of each point are
+                timed in it
+        """
+        self.move = move
+        self.reader = reader
+        self.record = record
+        self.timings = timings
+
+        # Since the next sweep waits for the last one to be fetched, at most
+        # one point is ever waiting here
+        self._queue: queue.Queue[Point | None] = queue.Queue(maxsize=1)
+        # Held from the start of a sweep until its data has been fetched
+        self._vna_free = threading.Semaphore(1)
+        self._stopped = threading.Event()
+        self._error: BaseException | None = None
+
+    def stop(self) -> None:
+        """Stop after the current point. Points already swept are still recorded."""
+        self._stopped.set()
+
+    def run(self, points: Iterable[Point], should_stop: Callable[[], bool] | None = None) -> None:
+        """Measure every point.
+
+        Args:
+            points: The (theta, phi) points, in the order to measure them
+            should_stop: Polled before each point. If it returns True, the
+                pipeline stops as if `stop` was called
+        """
+        transfer = threading.Thread(target=self._transfer_loop, name="AcquisitionTransfer", daemon=True)
+        transfer.start()
+        try:
+            for theta, phi in points:
+                if self._stopped.is_set() or (should_stop is not None and should_stop()):
+                    break
+                with _timed(self.timings, (theta, phi), "move"):
+                    self.move(theta, phi)
+                self._vna_free.acquire()
+                if self._stopped.is_set():
+                    self._vna_free.release()
+                    break
+                try:
+                    with _timed(self.timings, (theta, phi), "sweep"):
+                        self.reader.sweep()
+                except BaseException:
+                    self._vna_free.release()
+                    raise
+                self._queue.put((theta, phi))
+        finally:
+            # The transfer stage keeps draining the queue until it sees this,
+            # even after an error, so this never blocks for long
+            self._queue.put(None)
+            transfer.join()
+
+        if self._error is not None:
+            raise self._error
+
+    def _transfer_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                continue
+
+            theta, phi = item
+            try:
+                try:
+                    with _timed(self.timings, (theta, phi), "transfer"):
+                        ntwks = self.reader.fetch()
+                finally:
+                    self._vna_free.release()
+                self.record(theta, phi, ntwks)
+            except BaseException as e:
+                self._error = e
+                self._stopped.set()
+
+
+def acquire_serially(
+    points: Iterable[Point],
+    move: Callable[[float, float], None],
+    reader: Reader,
+    record: Callable[[float, float, list[skrf.Network]], None],
+    should_stop: Callable[[], bool] | None = None,
+    timings: ScanTimings | None = None,
+) -> None:
+    """Measure every point one step after the other, without pipelining.
+
+    Takes the same arguments as `AcquisitionPipeline` and `AcquisitionPipeline.run`.
+    """
+    for theta, phi in points:
+        if should_stop is not None and should_stop():
+            break
+        with _timed(timings, (theta, phi), "move"):
+            move(theta, phi)
+        with _timed(timings, (theta, phi), "sweep"):
+            reader.sweep()
+        with _timed(timings, (theta, phi), "transfer"):
+            ntwks = reader.fetch()
+        record(theta, phi, ntwks)
+
+
+def _timed(timings: ScanTimings | None, point: Point, stage: str):
+    return contextlib.nullcontext() if timings is None else timings.time(point, stage)
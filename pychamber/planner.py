@@ -0,0 +1,212 @@
+"""Planning the order an experiment visits its points in.
+
+The time an experiment spends moving the positioner depends heavily on the
+order its points are visited in. `plan_scan` estimates the time of every move
+from a simple model of each axis (`AxisMotion`) and searches for the order
+that minimizes the total: it compares the raster and serpentine orders from
+`pychamber.scan`, and for point sets small enough to search, a nearest
+neighbor tour refined with 2-opt (a classic travelling salesman heuristic).
+
+Experiments move both axes at once (see `Positioner.move_absolute`), so the
+time of a move is the time of whichever axis takes longer.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from pychamber.positioner import Positioner
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from pychamber.positioner.motion import AxisMotion
+from pychamber.scan import SCAN_ORDERS, scan_rows
+
+# Point sets larger than this are only compared against the raster and
+# serpentine orders, since the tour search is quadratic in the number of points
+MAX_SEARCH_POINTS = 1000
+# The scan order that runs a plan. See `pychamber.experiment.Experiment`
+PLANNED_ORDER = "planned"
+# Maximum number of 2-opt passes over the tour
+_MAX_PASSES = 50
+
+
+@dataclass
+class ScanPlan:
+    """An order to visit points in, and how long its motion should take.
+
+    Attributes:
+        points: The (theta, phi) points, in the order to visit them
+        estimated_time: Estimated time spent moving (in seconds) when following
+            the plan
+        naive_time: Estimated time spent moving (in seconds) when visiting the
+            points in the order given
+    """
+
+    points: list[tuple[float, float]]
+    estimated_time: float
+    naive_time: float
+
+    @property
+    def time_saved(self) -> float:
+        """Estimated time saved (in seconds) compared with the order given"""
+        return self.naive_time - self.estimated_time
+
+    def rows(self) -> list[list[tuple[float, float]]]:
+        """Split the plan into rows of points that share a theta or phi.
+
+        This is the same shape as `pychamber.scan.scan_rows`, so a plan can be
+        run the same way as any other scan order.
+
+        Returns:
+            list[list[tuple[float, float]]]: The rows of (theta, phi) points
+        """
+        rows: list[list[tuple[float, float]]] = []
+        shared_axis = None
+        for point in self.points:
+            if rows:
+                row = rows[-1]
+                if shared_axis is None and len(row) == 1:
+                    shared_axis = next((axis for axis in (0, 1) if point[axis] == row[0][axis]), None)
+                if shared_axis is not None and point[shared_axis] == row[0][shared_axis]:
+                    row.append(point)
+                    continue
+            rows.append([point])
+            shared_axis = None
+        return rows
+
+
+def route_time(
+    points: Sequence[tuple[float, float]],
+    theta_axis: AxisMotion,
+    phi_axis: AxisMotion,
+    start: tuple[float, float] | None = None,
+) -> float:
+    """Estimate the time spent moving to visit points in order.
+
+    Args:
+        points: The (theta, phi) points, in order
+        theta_axis: The motion of the theta axis
+        phi_axis: The motion of the phi axis
+        start: The (theta, phi) position of the positioner before the first
+            point. If None, moving to the first point is free
+
+    Returns:
+        float: The estimated time, in seconds
+    """
+    coords = np.asarray(list(points) if start is None else [start, *points], dtype=float).reshape((-1, 2))
+    steps = np.diff(coords, axis=0)
+    return float(np.sum(np.maximum(theta_axis.move_time(steps[:, 0]), phi_axis.move_time(steps[:, 1]))))
+
+
+def plan_scan(
+    points: Sequence[tuple[float, float]],
+    theta_axis: AxisMotion | None = None,
+    phi_axis: AxisMotion | None = None,
+    start: tuple[float, float] | None = None,
+    max_search_points: int = MAX_SEARCH_POINTS,
+) -> ScanPlan:
+    """Find an order to visit points in that minimizes the time spent moving.
+
+    Args:
+        points: The (theta, phi) points to visit, in the naive order they'd
+            otherwise be visited in
+        theta_axis: The motion of the theta axis. Defaults to `AxisMotion()`
+        phi_axis: The motion of the phi axis. Defaults to `AxisMotion()`
+        start: The current (theta, phi) position of the positioner, if known
+        max_search_points: Only search for a tour if there are at most this
+            many points
+
+    Returns:
+        ScanPlan: The best order found
+    """
+    theta_axis = AxisMotion() if theta_axis is None else theta_axis
+    phi_axis = AxisMotion() if phi_axis is None else phi_axis
+    points = [(float(theta), float(phi)) for theta, phi in points]
+    naive_time = route_time(points, theta_axis, phi_axis, start)
+
+    candidates = [points, *(_grid_order(points, order) for order in SCAN_ORDERS)]
+    if 2 < len(points) <= max_search_points:
+        candidates.append(_search_tour(points, theta_axis, phi_axis, start))
+
+    times = [route_time(candidate, theta_axis, phi_axis, start) for candidate in candidates]
+    best = int(np.argmin(times))
+    return ScanPlan(points=candidates[best], estimated_time=times[best], naive_time=naive_time)
+
+
+def plan_for_positioner(points: Sequence[tuple[float, float]], positioner: Positioner) -> ScanPlan:
+    """Plan a scan using a positioner's motion model and current position.
+
+    Args:
+        points: The (theta, phi) points to visit, in the naive order
+        positioner: The positioner that will be moving
+
+    Returns:
+        ScanPlan: The best order found
+    """
+    try:
+        start = (float(positioner.theta), float(positioner.phi))
+    except NotImplementedError:
+        start = None
+    return plan_scan(points, positioner.theta_motion, positioner.phi_motion, start)
+
+
+def _grid_order(points: list[tuple[float, float]], order: str) -> list[tuple[float, float]]:
+    # Visit the points in a scan order from `pychamber.scan`, skipping any
+    # grid location that isn't one of the points
+    thetas = sorted({theta for theta, _ in points})
+    phis = sorted({phi for _, phi in points})
+    wanted = set(points)
+    return [point for row in scan_rows(thetas, phis, order) for point in row if point in wanted]
+
+
+def _search_tour(
+    points: list[tuple[float, float]],
+    theta_axis: AxisMotion,
+    phi_axis: AxisMotion,
+    start: tuple[float, float] | None,
+) -> list[tuple[float, float]]:
+    # Node 0 is the starting position. If it isn't known, moving from it is free
+    coords = np.asarray([start if start is not None else (0.0, 0.0), *points], dtype=float)
+    cost = np.maximum(
+        theta_axis.move_time(coords[:, np.newaxis, 0] - coords[np.newaxis, :, 0]),
+        phi_axis.move_time(coords[:, np.newaxis, 1] - coords[np.newaxis, :, 1]),
+    )
+    if start is None:
+        cost[0, :] = 0
+        cost[:, 0] = 0
+
+    # Nearest neighbor tour
+    n = len(coords)
+    tour = np.zeros(n, dtype=np.intp)
+    visited = np.zeros(n, dtype=bool)
+    visited[0] = True
+    for i in range(1, n):
+        row = np.where(visited, np.inf, cost[tour[i - 1]])
+        tour[i] = np.argmin(row)
+        visited[tour[i]] = True
+
+    # 2-opt: reverse the segment tour[i + 1 : j + 1] when that shortens the
+    # tour. The tour is an open path, so the last edge can be dropped, and
+    # the start (node 0) never moves
+    for _ in range(_MAX_PASSES):
+        improved = False
+        for i in range(n - 2):
+            a, b = tour[i], tour[i + 1]
+            c = tour[i + 2 :]
+            d = np.append(tour[i + 3 :], -1)
+            after = np.where(d >= 0, cost[c, d], 0.0)
+            delta = cost[a, c] + np.where(d >= 0, cost[b, d], 0.0) - cost[a, b] - after
+            best = int(np.argmin(delta))
+            if delta[best] < -1e-9:
+                j = i + 2 + best
+                tour[i + 1 : j + 1] = tour[i + 1 : j + 1][::-1].copy()
+                improved = True
+        if not improved:
+            break
+
+    return [points[node - 1] for node in tour[1:]]
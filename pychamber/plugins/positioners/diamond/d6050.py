@@ -1,31 +1,19 @@
 from __future__ import annotations
 
 import math
-from dataclasses import dataclass
+import threading
+import time
 
 import qtawesome as qta
 import serial
 from qtpy.QtWidgets import QWidget
 
-from pychamber.positioner import (Positioner, PositionerConnectionError,
-                                  PositionerLimitException)
-from pychamber.settings import CONF
+from pychamber.positioner import (AxisMotion, MotionFuture, Positioner,
+                                  PositionerConnectionError,
+                                  PositionerLimitException, PositionStore)
 
 from .d6050_widget import Ui_D6050Widget
-
-
-@dataclass
-class BoardResponse:
-    """Response from the positioner."""
-
-    type_: str
-    address: str
-    status: str
-    response: str
-
-    def __str__(self) -> str:
-        """String representation of the response."""
-        return f"{self.type_}{self.address}{self.status}{self.response}"
+from .transport import BoardResponse, BoardTransport
 
 
 class Diamond_D6050Widget(QWidget, Ui_D6050Widget):
@@ -50,7 +38,12 @@ class Diamond_D6050(Positioner):
     _model = "D6050"
 
     _serial_baudrate = 57600
+    # How long to wait for a reply to a command, and how long each read of the
+    # port blocks for (in seconds)
     _serial_timeout = 1
+    _read_timeout = 0.05
+    # How often to poll the status of a moving axis (in seconds)
+    _poll_interval = 0.02
 
     _phi_steps_per_deg = 320
     _theta_steps_per_deg = 800
@@ -89,19 +82,21 @@ class Diamond_D6050(Positioner):
 
     def __init__(self, address: str, parent: QWidget | None = None) -> None:
         super().__init__(parent=parent)
-        self.serial_connection = serial.Serial(
-            port=address, baudrate=self._serial_baudrate, timeout=self._serial_timeout
+        self._address = address
+        self.transport = BoardTransport(
+            serial.Serial(port=address, baudrate=self._serial_baudrate, timeout=self._read_timeout),
+            timeout=self._serial_timeout,
         )
+        self.poll_interval = self._poll_interval
+        # The configuration commands (keyed by setting) applied to the
+        # controller since connecting. See `reset`
+        self._applied_settings: dict[str, str] = {}
 
-        stored_phi = CONF["diamond_d6050_phi"]
-        if stored_phi is None:
-            CONF["diamond_d6050_phi"] = 0
-        stored_theta = CONF["diamond_d6050_theta"]
-        if stored_theta is None:
-            CONF["diamond_d6050_theta"] = 0
-
-        self._phi = float(CONF["diamond_d6050_phi"])
-        self._theta = float(CONF["diamond_d6050_theta"])
+        self.positions = PositionStore("diamond_d6050")
+        self._phi = self.positions.phi
+        self._theta = self.positions.theta
+        # (start time, start phi, end phi, speed) of the phi sweep in progress
+        self._phi_sweep: tuple[float, float, float, float] | None = None
 
         self.test_connection()
         self.reset()
@@ -119,6 +114,14 @@ class Diamond_D6050(Positioner):
     def theta(self) -> float:
         return self._theta
 
+    @property
+    def phi_motion(self) -> AxisMotion:
+        return AxisMotion(speed=self._x_end_speed / self._phi_steps_per_deg)
+
+    @property
+    def theta_motion(self) -> AxisMotion:
+        return AxisMotion(speed=self._y_end_speed / self._theta_steps_per_deg)
+
     def test_connection(self) -> None:
         resp = self.write("X0")
         if resp is None:
@@ -128,34 +131,62 @@ class Diamond_D6050(Positioner):
         self.write("X0*")
         self.write("Y0*")
         self.write("Z0*")
+        self.positions.flush()
         self.jogAborted.emit()
 
     def zero_all(self) -> None:
         self._phi = 0
         self._theta = 0
-        CONF["diamond_d6050_phi"] = 0
-        CONF["diamond_d6050_theta"] = 0
+        self.positions.set(phi=0, theta=0)
 
     def zero_phi(self) -> None:
         self._phi = 0
-        CONF["diamond_d6050_phi"] = 0
+        self.positions.set(phi=0)
 
     def zero_theta(self) -> None:
         self._theta = 0
-        CONF["diamond_d6050_theta"] = 0
+        self.positions.set(theta=0)
 
     def move(self, axis: str, steps: str) -> None:
         self.write(f"{axis}RN{steps}")
+        self.wait_for_move(axis)
+
+    def wait_for_move(self, axis: str, stop: threading.Event | None = None) -> bool:
+        """Poll an axis until it's done moving. See `wait_for_moves`."""
+        return self.wait_for_moves([axis], stop)
+
+    def wait_for_moves(self, axes: list[str], stop: threading.Event | None = None) -> bool:
+        """Poll axes every `poll_interval` seconds until they're all done moving.
+
+        Args:
+            axes: The axes to poll
+            stop: If set, polling stops straight away (the axes aren't
+                stopped)
+
+        Returns:
+            bool: True if every move finished, False if polling was stopped
+
+        Raises:
+            PositionerLimitException: If an axis hit a limit switch
+        """
+        stop = threading.Event() if stop is None else stop
+        moving = list(axes)
         while True:
-            resp = self.write(f"{axis}")
-            if not resp:
-                continue
-            if resp.status == "f" or resp.status == ">":
-                break
-            elif resp.status == "H":
-                raise PositionerLimitException("Home limit")
-            elif resp.status == "L":
-                raise PositionerLimitException("Max limit")
+            if stop.is_set():
+                return False
+            for axis in list(moving):
+                resp = self.write(f"{axis}")
+                if not resp:
+                    continue
+                if resp.status == "f" or resp.status == ">":
+                    moving.remove(axis)
+                elif resp.status == "H":
+                    raise PositionerLimitException("Home limit")
+                elif resp.status == "L":
+                    raise PositionerLimitException("Max limit")
+            if not moving:
+                return True
+            stop.wait(self.poll_interval)
 
     def move_phi_absolute(self, phi: float) -> None:
         diff = phi - self.phi
@@ -169,7 +200,7 @@ class Diamond_D6050(Positioner):
         steps = int(self._phi_steps_per_deg * angle)
         self.move(self._phi_axis, f"{steps:+}")
         self._phi += angle
-        CONF["diamond_d6050_phi"] = self._phi
+        self.positions.set(phi=self._phi)
         self.jogCompleted.emit()
 
     def move_theta_absolute(self, theta: float) -> None:
@@ -184,9 +215,114 @@ class Diamond_D6050(Positioner):
         steps = -int(self._theta_steps_per_deg * angle)
         self.move(self._theta_axis, f"{steps:+}")
         self._theta += angle
-        CONF["diamond_d6050_theta"] = self._theta
+        self.positions.set(theta=self._theta)
+        self.jogCompleted.emit()
+
+    def move_absolute(self, phi: float, theta: float) -> None:
+        self.start_move_absolute(phi, theta).wait()
+
+    def start_move_phi_absolute(self, phi: float) -> MotionFuture:
+        return self.start_move_absolute(phi, self.theta)
+
+    def start_move_theta_absolute(self, theta: float) -> MotionFuture:
+        return self.start_move_absolute(self.phi, theta)
+
+    def start_move_absolute(self, phi: float, theta: float) -> MotionFuture:
+        # Both axes are started back to back, then polled from a background
+        # thread until both are done. Cancelling stops the polling, and the
+        # polling thread then stops the axes. The position is unknown after
+        # that, so it's left where it was
+        steps = {
+            self._phi_axis: int(self._phi_steps_per_deg * (phi - self.phi)),
+            self._theta_axis: -int(self._theta_steps_per_deg * (theta - self.theta)),
+        }
+        moving = [axis for axis, n in steps.items() if n != 0]
+
+        def arrive() -> None:
+            self._phi = phi
+            self._theta = theta
+            self.positions.set(phi=phi, theta=theta)
+            self.jogCompleted.emit()
+
+        self.jogStarted.emit()
+        if not moving:
+            arrive()
+            return MotionFuture.completed()
+
+        for axis in moving:
+            self.write(f"{axis}RN{steps[axis]:+}")
+        stop = threading.Event()
+        future = MotionFuture(cancel=stop.set)
+
+        def poll() -> None:
+            try:
+                finished = self.wait_for_moves(moving, stop)
+            except Exception as e:
+                # Don't leave the other axis running
+                for axis in moving:
+                    self.write(f"{axis}*")
+                future.set_exception(e)
+                return
+            if not finished:
+                for axis in moving:
+                    self.write(f"{axis}*")
+                self.jogAborted.emit()
+                return
+            arrive()
+            future.set_done()
+
+        threading.Thread(target=poll, name="D6050Move", daemon=True).start()
+        return future
+
+    def start_phi_sweep(self, phi: float, speed: float) -> float:
+        self.jogStarted.emit()
+        # Rounded, so a target a hair short of a whole step isn't a step short
+        steps = round(self._phi_steps_per_deg * (phi - self._phi))
+        # Starting at full speed (no ramp) keeps the whole move at a constant
+        # velocity, so the position can be interpolated from the time
+        steps_per_sec = max(1, round(speed * self._phi_steps_per_deg))
+        self._applied_settings.pop(f"{self._phi_axis} start speed", None)
+        self._applied_settings.pop(f"{self._phi_axis} end speed", None)
+        self.set_start_speed(self._phi_axis, steps_per_sec)
+        self.set_end_speed(self._phi_axis, steps_per_sec)
+        self.write(f"{self._phi_axis}RN{steps:+}")
+        self._phi_sweep = (
+            time.monotonic(),
+            self._phi,
+            self._phi + steps / self._phi_steps_per_deg,
+            steps_per_sec / self._phi_steps_per_deg,
+        )
+        return self._phi_sweep[2]
+
+    def finish_phi_sweep(self) -> None:
+        if self._phi_sweep is None:
+            return
+        try:
+            self.wait_for_move(self._phi_axis)
+        finally:
+            self.set_start_speed(self._phi_axis, self._x_start_speed)
+            self.set_end_speed(self._phi_axis, self._x_end_speed)
+        self._phi = self._phi_sweep[2]
+        self._phi_sweep = None
+        self.positions.set(phi=self._phi)
         self.jogCompleted.emit()
 
+    def read_phi(self) -> float:
+        """An estimate of the current phi position, including while a sweep is in progress.
+
+        The D6050 can't report its position, so during a sweep this is
+        interpolated from the time since the sweep started, assuming it moves
+        at its set speed the whole way. Any ramp or stall of the motor, and
+        the latency of the command that started it, make this off by a little.
+        """
+        if self._phi_sweep is None:
+            return self._phi
+        start_time, start, end, speed = self._phi_sweep
+        travelled = speed * (time.monotonic() - start_time)
+        if travelled >= abs(end - start):
+            return end
+        return start + math.copysign(travelled, end - start)
+
     def move_z_relative(self, dist: float) -> none:
         self.jogStarted.emit()
         if math.isclose(dist, 0.0):
@@ -198,68 +334,97 @@ class Diamond_D6050(Positioner):
         self.jogCompleted.emit()
 
     def write(self, cmd: str) -> BoardResponse | None:
-        self.serial_connection.reset_input_buffer()
-        self.serial_connection.write(f"{cmd}\r".encode("ascii"))
+        return self.transport.request(cmd)
 
-        return self.check_response()
+    def close(self) -> None:
+        self.transport.close()
+        self.positions.close()
+        self._applied_settings.clear()
 
     def abort_all(self) -> None:
         self.write("X0*")
         self.write("Y0*")
         self.write("Z0*")
+        self.positions.flush()
+
+    def reset(self, force: bool = False) -> None:
+        """Configure both axes of the controller.
+
+        The controller can't report its settings, so settings already applied
+        since connecting are skipped (e.g. after a phi sweep, only the speeds
+        of phi are set again). Every setting is applied when the positioner
+        is connected. The absolute counts are always set, since they change as
+        the axes move.
+
+        Args:
+            force: Apply every setting, even ones already applied (e.g. if
+                the controller was power cycled)
+
+        Raises:
+            PositionerConnectionError: If the controller didn't reply to a
+                command
+        """
+        if force:
+            self._applied_settings.clear()
+        axes = {self._x: self._axis_settings(self._x, "x"), self._y: self._axis_settings(self._y, "y")}
+        # Each setting of both axes in turn, with the absolute counts set right
+        # after the mode
+        commands: list[tuple[str | None, str]] = [(f"{axis} mode", settings["mode"]) for axis, settings in axes.items()]
+        commands += [(None, f"{self._x}A{self._initial_pos_x}"), (None, f"{self._y}A{self._initial_pos_y}")]
+        commands += [
+            (f"{axis} {setting}", settings[setting])
+            for setting in axes[self._x]
+            if setting != "mode"
+            for axis, settings in axes.items()
+        ]
+        self.configure(
+            [(name, cmd) for name, cmd in commands if name is None or self._applied_settings.get(name) != cmd]
+        )
 
-    def check_response(self) -> BoardResponse | None:
-        buffer = self.serial_connection.read_until(b"\r")
-        if buffer:
-            try:
-                buffer = buffer.decode("ascii")
-                if buffer.startswith("x0") or buffer.startswith("y0") or buffer.startswith("z0"):
-                    return BoardResponse(
-                        buffer[0],
-                        buffer[1],
-                        buffer[2],
-                        buffer[3:-2] if len(buffer) >= 4 else "",
-                    )
-                else:
-                    return None
-            except IndexError:
-                return None
-        else:
-            return None
-
-    def reset(self) -> None:
-        self.write(f"{self._x}N-0cz00")
-        self.write(f"{self._y}N-0cz00")
-
-        self.set_abs_count(self._x, self._initial_pos_x)
-        self.set_abs_count(self._y, self._initial_pos_y)
-
-        self.set_motor_currents(self._x, self._x_run_current, self._x_hold_current, self._x_dwell)
-        self.set_motor_currents(self._y, self._y_run_current, self._y_hold_current, self._y_dwell)
-
-        self.set_motor_hold(self._x, True)
-        self.set_motor_hold(self._y, True)
-
-        self.set_stepping_mode(self._x, self._x_stepping_mode)
-        self.set_stepping_mode(self._y, self._y_stepping_mode)
-
-        self.set_encoder_mode(self._x, self._x_encoder_mode)
-        self.set_encoder_mode(self._y, self._y_encoder_mode)
-
-        self.set_axis_direction(self._x, self._x_axis_direction)
-        self.set_axis_direction(self._y, self._y_axis_direction)
-
-        self.enable_encoder(self._x)
-        self.enable_encoder(self._y)
-
-        self.set_start_speed(self._x, self._x_start_speed)
-        self.set_start_speed(self._y, self._y_start_speed)
-
-        self.set_end_speed(self._x, self._x_end_speed)
-        self.set_end_speed(self._y, self._y_end_speed)
-
-        self.set_move_slope(self._x, self._x_slope)
-        self.set_move_slope(self._y, self._y_slope)
+    def configure(self, commands: list[tuple[str | None, str]]) -> None:
+        """Send configuration commands in one pipelined batch, then check they were all answered.
+
+        Args:
+            commands: (setting, command) of each command to send, in order.
+                Answered commands are remembered by their setting, so `reset`
+                can skip them. Commands with a setting of None aren't
+                remembered
+
+        Raises:
+            PositionerConnectionError: If the controller didn't reply to a
+                command
+        """
+        if not commands:
+            return
+        replies = self.transport.request_many([cmd for _, cmd in commands])
+
+        missing = []
+        for (name, cmd), reply in zip(commands, replies, strict=True):
+            if reply is None:
+                missing.append(cmd)
+            elif name is not None:
+                self._applied_settings[name] = cmd
+        if missing:
+            raise PositionerConnectionError(f"The controller didn't reply to {missing}")
+
+    def _axis_settings(self, axis: str, name: str) -> dict[str, str]:
+        # The command that applies each setting of an axis, keyed by setting.
+        # `name` is the prefix of the axis' class attributes
+        def value(setting: str):
+            return getattr(self, f"_{name}_{setting}")
+
+        return {
+            "mode": f"{axis}N-0cz00",
+            "motor currents": f"{axis}P3,{value('run_current')},{value('hold_current')},{value('dwell')}",
+            "motor hold": f"{axis}P1",
+            "stepping mode": f"{axis}H{value('stepping_mode')}",
+            "encoder mode": f"{axis}qm{value('encoder_mode')}",
+            "direction": f"{axis}qN{value('axis_direction')}",
+            "encoder": f"{axis}qE",
+            "start speed": f"{axis}B{value('start_speed')}",
+            "end speed": f"{axis}E{value('end_speed')}",
+            "slope": f"{axis}S{value('slope')}",
+        }
 
     def set_abs_count(self, axis: str, pos: int) -> None:
         self.write(f"{axis}A{pos}")
@@ -0,0 +1,171 @@
+"""Serial transport for Diamond Engineering controllers.
+
+Every command sent to the controller is answered with a line starting with
+the (lowercase) axis it was sent to. Rather than writing a command and then
+blocking on the port until a line comes back, `BoardTransport` reads the port
+from a background thread, parses each line into a `BoardResponse` as it
+arrives, and hands it to the oldest request still waiting on that axis.
+Requests to different axes can be in flight at once, and nothing spins while
+waiting for a reply.
+
+Since replies are matched to requests in order, commands can also be
+pipelined: `request_many` writes a whole batch before waiting for any of the
+replies, so a batch takes about one round trip rather than one per command.
+A request that times out keeps its place in the queue, so that its reply is
+thrown away if it turns up late rather than being handed to the next request.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    import serial
+
+import collections
+import threading
+import time
+from dataclasses import dataclass
+
+_AXES = ("x0", "y0", "z0")
+
+
+@dataclass
+class BoardResponse:
+    """Response from the positioner."""
+
+    type_: str
+    address: str
+    status: str
+    response: str
+
+    def __str__(self) -> str:
+        """String representation of the response."""
+        return f"{self.type_}{self.address}{self.status}{self.response}"
+
+    @classmethod
+    def parse(cls, line: bytes) -> BoardResponse | None:
+        """Parse a line read from the controller, or None if it isn't a response."""
+        try:
+            # Drop anything left over from the end of the last line
+            text = line.decode("ascii").lstrip()
+            if not text.startswith(_AXES):
+                return None
+            response = cls(text[0], text[1], text[2], text[3:-2] if len(text) >= 4 else "")
+        except (UnicodeDecodeError, IndexError):
+            return None
+        else:
+            return response
+
+
+class _Request:
+    # A command waiting for its reply
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.response: BoardResponse | None = None
+        # Whether it timed out, so its reply should be discarded
+        self.abandoned = False
+
+
+class BoardTransport:
+    """Sends commands to a controller and matches its replies to them."""
+
+    def __init__(self, connection: serial.Serial, timeout: float = 1.0) -> None:
+        """
+        Args:
+            connection: The open serial port. Its read timeout is how often
+                the reader thread checks whether it should stop, so keep it
+                short
+            timeout: How long to wait for the reply to a command (in seconds)
+        """
+        self.connection = connection
+        self.timeout = timeout
+        self._write_lock = threading.Lock()
+        # Axis ("x", "y" or "z") -> requests waiting for a reply, oldest first
+        self._pending: dict[str, collections.deque[_Request]] = collections.defaultdict(collections.deque)
+        self._pending_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._reader = threading.Thread(target=self._read_loop, name="BoardTransportReader", daemon=True)
+        self._reader.start()
+
+    def request(self, cmd: str) -> BoardResponse | None:
+        """Send a command and wait for its reply.
+
+        Args:
+            cmd: The command, starting with the axis it's for (e.g. "X0RN+100")
+
+        Returns:
+            BoardResponse | None: The reply, or None if there wasn't one within
+                the timeout
+        """
+        return self.request_many([cmd])[0]
+
+    def request_many(self, cmds: Sequence[str]) -> list[BoardResponse | None]:
+        """Send commands back to back, then wait for all of their replies.
+
+        Args:
+            cmds: The commands, each starting with the axis it's for
+
+        Returns:
+            list[BoardResponse | None]: The reply to each command, or None for
+                commands without a reply within the timeout
+        """
+        requests = [_Request() for _ in cmds]
+        with self._write_lock:
+            for cmd, request in zip(cmds, requests, strict=True):
+                with self._pending_lock:
+                    self._pending[cmd[:1].lower()].append(request)
+                self.connection.write(f"{cmd}\r".encode("ascii"))
+
+        deadline = time.monotonic() + self.timeout
+        for cmd, request in zip(cmds, requests, strict=True):
+            if not request.event.wait(max(0.0, deadline - time.monotonic())):
+                with self._pending_lock:
+                    # The reply may have come in since the wait timed out
+                    if request.event.is_set():
+                        continue
+                    request.abandoned = True
+                from pychamber.app.logger import LOG
+
+                LOG.debug(f"No reply to {cmd!r}")
+        return [request.response for request in requests]
+
+    def close(self) -> None:
+        """Stop the reader thread and close the port."""
+        self._closed.set()
+        self._reader.join()
+        self.connection.close()
+
+    def _read_loop(self) -> None:
+        from pychamber.app.logger import LOG
+
+        buffer = b""
+        while not self._closed.is_set():
+            try:
+                buffer += self.connection.read_until(b"\r")
+            except Exception:
+                # Requests time out from here on
+                if not self._closed.is_set():
+                    LOG.exception("Reading from the controller failed")
+                return
+            # A read can time out part way through a line
+            if not buffer.endswith(b"\r"):
+                continue
+            line, buffer = buffer, b""
+
+            response = BoardResponse.parse(line)
+            if response is None:
+                LOG.debug(f"Ignoring unexpected line {line!r}")
+                continue
+            with self._pending_lock:
+                queue = self._pending[response.type_]
+                request = queue.popleft() if queue else None
+                if request is not None and not request.abandoned:
+                    request.response = response
+                    request.event.set()
+                    continue
+            if request is None:
+                LOG.debug(f"Ignoring unrequested response {response}")
+            else:
+                LOG.debug(f"Ignoring late response {response}")
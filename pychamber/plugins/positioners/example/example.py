@@ -1,13 +1,13 @@
 from __future__ import annotations
 
 import math
+import threading
 import time
 
 from qtpy.QtCore import QObject
 from qtpy.QtWidgets import QWidget
 
-from pychamber.positioner import Positioner
-from pychamber.settings import CONF
+from pychamber.positioner import AxisMotion, MotionFuture, Positioner, PositionStore
 
 from .example_positioner_widget import Ui_ExamplePositionerWidget
 
@@ -29,15 +29,11 @@ class ExamplePositioner(Positioner):
 
         self._port = address
 
-        stored_phi = CONF["example_positioner_phi"]
-        if stored_phi is None:
-            CONF["example_positioner_phi"] = 0
-        stored_theta = CONF["example_positioner_theta"]
-        if stored_theta is None:
-            CONF["example_positioner_theta"] = 0
-
-        self._phi = float(CONF["example_positioner_phi"])
-        self._theta = float(CONF["example_positioner_theta"])
+        self.positions = PositionStore("example_positioner")
+        self._phi = self.positions.phi
+        self._theta = self.positions.theta
+        # (start time, start phi, end phi, speed) of the phi sweep in progress
+        self._phi_sweep: tuple[float, float, float, float] | None = None
 
         self.test_connection()
 
@@ -60,26 +56,40 @@ class ExamplePositioner(Positioner):
     def theta(self) -> float:
         return self._theta
 
+    @property
+    def phi_motion(self) -> AxisMotion:
+        return AxisMotion(speed=1000 / self._msecs_per_deg)
+
+    @property
+    def theta_motion(self) -> AxisMotion:
+        return AxisMotion(speed=1000 / self._msecs_per_deg)
+
     def test_connection(self) -> None:
         return
 
+    def close(self) -> None:
+        self.positions.close()
+
     def abort_movement(self) -> None:
-        # TODO
+        if self._phi_sweep is not None:
+            self._phi = self.read_phi()
+            self._phi_sweep = None
+            self.positions.set(phi=self._phi)
+        self.positions.flush()
         self.jogAborted.emit()
 
     def zero_all(self) -> None:
         self._phi = 0
         self._theta = 0
-        CONF["example_positioner_phi"] = 0
-        CONF["example_positioner_theta"] = 0
+        self.positions.set(phi=0, theta=0)
 
     def zero_phi(self) -> None:
         self._phi = 0
-        CONF["example_positioner_phi"] = 0
+        self.positions.set(phi=0)
 
     def zero_theta(self) -> None:
         self._theta = 0
-        CONF["example_positioner_theta"] = 0
+        self.positions.set(theta=0)
 
     def move_phi_absolute(self, phi: float) -> None:
         diff = phi - self._phi
@@ -91,7 +101,7 @@ class ExamplePositioner(Positioner):
             self.jogCompleted.emit()
             return
         self._phi += angle
-        CONF["example_positioner_phi"] = self._phi
+        self.positions.set(phi=self._phi)
         time.sleep(abs(angle) * self._msecs_per_deg / 1000)
         self.jogCompleted.emit()
 
@@ -105,6 +115,73 @@ class ExamplePositioner(Positioner):
             self.jogCompleted.emit()
             return
         self._theta += angle
-        CONF["example_positioner_theta"] = self._theta
+        self.positions.set(theta=self._theta)
         time.sleep(abs(angle) * self._msecs_per_deg / 1000)
         self.jogCompleted.emit()
+
+    def move_absolute(self, phi: float, theta: float) -> None:
+        # Both axes move at once
+        self.jogStarted.emit()
+        duration = max(abs(phi - self._phi), abs(theta - self._theta)) * self._msecs_per_deg / 1000
+        self._phi = phi
+        self._theta = theta
+        self.positions.set(phi=self._phi, theta=self._theta)
+        time.sleep(duration)
+        self.jogCompleted.emit()
+
+    def start_move_phi_absolute(self, phi: float) -> MotionFuture:
+        return self._start_move("phi", phi)
+
+    def start_move_theta_absolute(self, theta: float) -> MotionFuture:
+        return self._start_move("theta", theta)
+
+    def _start_move(self, axis: str, target: float) -> MotionFuture:
+        self.jogStarted.emit()
+        start = getattr(self, f"_{axis}")
+        duration = abs(target - start) * self._msecs_per_deg / 1000
+        started = time.monotonic()
+
+        def set_position(position: float) -> None:
+            setattr(self, f"_{axis}", position)
+            self.positions.set(**{axis: position})
+
+        def complete() -> None:
+            set_position(target)
+            self.jogCompleted.emit()
+            future.set_done()
+
+        def cancel() -> None:
+            # Stop wherever the move had got to
+            timer.cancel()
+            progress = min(1.0, (time.monotonic() - started) / duration) if duration > 0 else 1.0
+            set_position(start + (target - start) * progress)
+            self.jogAborted.emit()
+
+        timer = threading.Timer(duration, complete)
+        future = MotionFuture(cancel=cancel)
+        timer.start()
+        return future
+
+    def start_phi_sweep(self, phi: float, speed: float) -> float:
+        self.jogStarted.emit()
+        self._phi_sweep = (time.monotonic(), self._phi, phi, speed)
+        return phi
+
+    def finish_phi_sweep(self) -> None:
+        if self._phi_sweep is None:
+            return
+        start_time, start, end, speed = self._phi_sweep
+        time.sleep(max(0.0, start_time + abs(end - start) / speed - time.monotonic()))
+        self._phi_sweep = None
+        self._phi = end
+        self.positions.set(phi=self._phi)
+        self.jogCompleted.emit()
+
+    def read_phi(self) -> float:
+        if self._phi_sweep is None:
+            return self._phi
+        start_time, start, end, speed = self._phi_sweep
+        travelled = speed * (time.monotonic() - start_time)
+        if travelled >= abs(end - start):
+            return end
+        return start + math.copysign(travelled, end - start)
@@ -2,8 +2,10 @@ from pychamber import positioner
 
 from .diamond.d6050 import Diamond_D6050
 from .example.example import ExamplePositioner
+from .simulated.simulated import SimulatedPositioner
 
 
 def initialize() -> None:
     positioner.register("Diamond Eng.", "D6050", Diamond_D6050)
     positioner.register("Example", "Example Positioner", ExamplePositioner)
+    positioner.register("Simulated", "Simulated Positioner", SimulatedPositioner)
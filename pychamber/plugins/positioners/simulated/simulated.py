@@ -0,0 +1,297 @@
+"""A simulated positioner, for trying out and benchmarking scans without hardware.
+
+Unlike `ExamplePositioner`, which moves at a constant speed, each axis of
+`SimulatedPositioner` follows a trapezoidal velocity profile (see
+`pychamber.positioner.AxisMotion`): it accelerates up to its top speed, slows
+down again, and then takes a while to settle. Every command to the positioner
+takes `latency` seconds to get there, reversing an axis first takes up its
+backlash, and moving past the limits of an axis stops it at the limit with a
+`PositionerLimitException`. Both axes can move at once, and moves can be
+aborted part way, so changes to how scans are ordered and pipelined can be
+timed realistically on any machine:
+
+```
+positioner = pychamber.positioner.connect("Simulated", "Simulated Positioner", "")
+positioner.phi_motion = AxisMotion(speed=20.0, acceleration=40.0, settle=0.2)
+```
+"""
+from __future__ import annotations
+
+import functools
+import math
+import threading
+import time
+
+from qtpy.QtCore import QObject
+
+from pychamber.positioner import AxisMotion, MotionFuture, Positioner, PositionerLimitException, PositionStore
+
+
+def _travelled(motion: AxisMotion, distance: float, elapsed: float) -> float:
+    # How far along a move of `distance` degrees an axis is after `elapsed`
+    # seconds. The inverse of `AxisMotion.move_time`, ignoring the settle time
+    if elapsed <= 0:
+        return 0.0
+    if motion.acceleration is None or motion.acceleration <= 0:
+        return min(distance, motion.speed * elapsed)
+    accel = motion.acceleration
+    # Time spent accelerating (and decelerating), and at top speed
+    ramp_time = min(motion.speed / accel, math.sqrt(distance / accel))
+    speed = accel * ramp_time
+    cruise_time = (distance - speed * ramp_time) / speed if speed > 0 else 0.0
+    total = 2 * ramp_time + cruise_time
+    if elapsed >= total:
+        return distance
+    if elapsed < ramp_time:
+        return 0.5 * accel * elapsed**2
+    if elapsed < ramp_time + cruise_time:
+        return 0.5 * speed * ramp_time + speed * (elapsed - ramp_time)
+    return distance - 0.5 * accel * (total - elapsed) ** 2
+
+
+class _AxisMove:
+    # A move of one axis in progress
+
+    def __init__(self, motion: AxisMotion, start: float, target: float, backlash: float) -> None:
+        self.motion = motion
+        self.start = start
+        self.target = target
+        # Reversing first takes up the backlash, without the axis moving
+        self.backlash = backlash
+        self.duration = float(motion.move_time(abs(target - start) + backlash))
+        self.started = time.monotonic()
+
+    def position(self, now: float) -> float:
+        travelled = _travelled(self.motion, abs(self.target - self.start) + self.backlash, now - self.started)
+        return self.start + math.copysign(max(0.0, travelled - self.backlash), self.target - self.start)
+
+
+class SimulatedPositioner(Positioner):
+    _manufacturer = "Simulated"
+    _model = "Simulated Positioner"
+
+    # Defaults for the constructor arguments of the same name
+    _phi_motion = AxisMotion(speed=30.0, acceleration=60.0, settle=0.05)
+    _theta_motion = AxisMotion(speed=15.0, acceleration=30.0, settle=0.1)
+    _latency = 0.005
+    _backlash = {"phi": 0.1, "theta": 0.1}
+    _limits = {"phi": (-180.0, 180.0), "theta": (-90.0, 90.0)}
+
+    def __init__(
+        self,
+        address: str,
+        parent: QObject | None = None,
+        phi_motion: AxisMotion | None = None,
+        theta_motion: AxisMotion | None = None,
+        latency: float | None = None,
+        backlash: dict[str, float] | None = None,
+        limits: dict[str, tuple[float, float]] | None = None,
+    ) -> None:
+        """
+        Args:
+            address: Ignored
+            parent: The parent QObject
+            phi_motion: How the phi axis moves
+            theta_motion: How the theta axis moves
+            latency: How long each command takes to reach the positioner (in
+                seconds)
+            backlash: The backlash of each axis ("phi" and "theta"), in degrees
+            limits: The (lowest, highest) angle each axis can reach
+        """
+        super().__init__(parent)
+
+        self._port = address
+        self._motion = {
+            "phi": self._phi_motion if phi_motion is None else phi_motion,
+            "theta": self._theta_motion if theta_motion is None else theta_motion,
+        }
+        self.latency = self._latency if latency is None else latency
+        self.backlash = {**self._backlash, **(backlash or {})}
+        self.limits = {**self._limits, **(limits or {})}
+
+        self.positions = PositionStore("simulated_positioner")
+        self._position = {"phi": self.positions.phi, "theta": self.positions.theta}
+        # The direction each axis last moved in, for the backlash
+        self._direction = {"phi": 0.0, "theta": 0.0}
+        # Axis -> (move, future) of the moves in progress
+        self._moves: dict[str, tuple[_AxisMove, MotionFuture]] = {}
+        self._lock = threading.Lock()
+        self._phi_sweep: MotionFuture | None = None
+
+        self.test_connection()
+
+    @property
+    def phi(self) -> float:
+        return self._position["phi"]
+
+    @property
+    def theta(self) -> float:
+        return self._position["theta"]
+
+    @property
+    def phi_motion(self) -> AxisMotion:
+        return self._motion["phi"]
+
+    @phi_motion.setter
+    def phi_motion(self, motion: AxisMotion) -> None:
+        self._motion["phi"] = motion
+
+    @property
+    def theta_motion(self) -> AxisMotion:
+        return self._motion["theta"]
+
+    @theta_motion.setter
+    def theta_motion(self, motion: AxisMotion) -> None:
+        self._motion["theta"] = motion
+
+    def test_connection(self) -> None:
+        time.sleep(self.latency)
+
+    def close(self) -> None:
+        self.abort_movement()
+        self.positions.close()
+
+    def abort_movement(self) -> None:
+        time.sleep(self.latency)
+        with self._lock:
+            futures = {future for _, future in self._moves.values()}
+        for future in futures:
+            future.cancel()
+        self._phi_sweep = None
+        self.positions.flush()
+
+    def zero_all(self) -> None:
+        self._set_position(phi=0.0, theta=0.0)
+
+    def zero_phi(self) -> None:
+        self._set_position(phi=0.0)
+
+    def zero_theta(self) -> None:
+        self._set_position(theta=0.0)
+
+    def move_phi_absolute(self, phi: float) -> None:
+        self.start_move_phi_absolute(phi).wait()
+
+    def move_phi_relative(self, angle: float) -> None:
+        self.move_phi_absolute(self.phi + angle)
+
+    def move_theta_absolute(self, theta: float) -> None:
+        self.start_move_theta_absolute(theta).wait()
+
+    def move_theta_relative(self, angle: float) -> None:
+        self.move_theta_absolute(self.theta + angle)
+
+    def move_absolute(self, phi: float, theta: float) -> None:
+        self.start_move_absolute(phi, theta).wait()
+
+    def start_move_absolute(self, phi: float, theta: float) -> MotionFuture:
+        return self._start_move({"phi": phi, "theta": theta})
+
+    def start_move_phi_absolute(self, phi: float) -> MotionFuture:
+        return self._start_move({"phi": phi})
+
+    def start_move_theta_absolute(self, theta: float) -> MotionFuture:
+        return self._start_move({"theta": theta})
+
+    def start_phi_sweep(self, phi: float, speed: float) -> float:
+        # Like the D6050, a sweep starts at full speed so its speed is constant
+        motion = AxisMotion(speed=min(speed, self.phi_motion.speed))
+        # Stopped at the limits
+        targets = {"phi": phi}
+        self._phi_sweep = self._start_move(targets, {"phi": motion})
+        return targets["phi"]
+
+    def finish_phi_sweep(self) -> None:
+        if self._phi_sweep is None:
+            return
+        self._phi_sweep.wait()
+        self._phi_sweep = None
+
+    def read_phi(self) -> float:
+        with self._lock:
+            if "phi" in self._moves:
+                return self._moves["phi"][0].position(time.monotonic())
+            return self._position["phi"]
+
+    def _set_position(self, **positions: float) -> None:
+        with self._lock:
+            self._position.update(positions)
+        self.positions.set(**positions)
+
+    def _start_move(self, targets: dict[str, float], motions: dict[str, AxisMotion] | None = None) -> MotionFuture:
+        self.jogStarted.emit()
+        # One command per axis
+        time.sleep(self.latency * len(targets))
+
+        limit_hit = None
+        for axis, target in targets.items():
+            low, high = self.limits[axis]
+            if not low <= target <= high:
+                limit_hit = "Home limit" if target < low else "Max limit"
+                targets[axis] = min(max(target, low), high)
+
+        # Stop the moves of any axis this move takes over
+        with self._lock:
+            replaced = {self._moves[axis][1] for axis in targets if axis in self._moves}
+        for other in replaced:
+            other.cancel()
+
+        with self._lock:
+            moves = {}
+            for axis, target in targets.items():
+                start = self._position[axis]
+                if math.isclose(target, start):
+                    continue
+                direction = math.copysign(1.0, target - start)
+                backlash = self.backlash[axis] if self._direction[axis] not in (0.0, direction) else 0.0
+                self._direction[axis] = direction
+                motion = (motions or {}).get(axis, self._motion[axis])
+                moves[axis] = _AxisMove(motion, start, target, backlash)
+
+            future = MotionFuture(cancel=functools.partial(self._cancel, moves))
+            for axis, move in moves.items():
+                self._moves[axis] = (move, future)
+
+        def arrive() -> None:
+            with self._lock:
+                # Axes that were stopped part way aren't moved to the target
+                arrived = {axis: move.target for axis, move in moves.items() if self._moving(axis, move)}
+                for axis in arrived:
+                    del self._moves[axis]
+                self._position.update(arrived)
+            if future.done():
+                return
+            self.positions.set(**arrived)
+            self.jogCompleted.emit()
+            if limit_hit is not None:
+                future.set_exception(PositionerLimitException(limit_hit))
+            else:
+                future.set_done()
+
+        duration = max((move.duration for move in moves.values()), default=0.0)
+        if duration <= 0:
+            arrive()
+            return future
+        timer = threading.Timer(duration, arrive)
+        timer.daemon = True
+        future.add_done_callback(lambda _: timer.cancel())
+        timer.start()
+        return future
+
+    def _cancel(self, moves: dict[str, _AxisMove]) -> None:
+        # Stop the axes of a move wherever they've got to
+        with self._lock:
+            for axis, move in moves.items():
+                if self._moving(axis, move):
+                    self._stop_axis(axis)
+        self.positions.set(**{axis: self._position[axis] for axis in moves})
+        self.jogAborted.emit()
+
+    def _moving(self, axis: str, move: _AxisMove) -> bool:
+        # Whether `move` is still moving `axis`. Called with the lock held
+        return axis in self._moves and self._moves[axis][0] is move
+
+    def _stop_axis(self, axis: str) -> None:
+        # Called with the lock held
+        move, _ = self._moves.pop(axis)
+        self._position[axis] = move.position(time.monotonic())
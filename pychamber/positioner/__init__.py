@@ -1,3 +1,5 @@
 from .factory import available_models, connect, register, unregister
 from .interface import (Positioner, PositionerConnectionError,
                         PositionerLimitException)
+from .motion import AxisMotion, MotionCancelledError, MotionFuture
+from .persistence import PositionStore
@@ -1,6 +1,10 @@
+import functools
+
 from qtpy.QtCore import QObject, Signal
 from qtpy.QtWidgets import QWidget
 
+from .motion import AxisMotion, MotionFuture
+
 
 class PositionerLimitException(Exception):
     pass
@@ -40,9 +44,23 @@ class Positioner(QObject):
     def theta(self) -> float:
         raise NotImplementedError("Must be implemented in subclass")
 
+    @property
+    def phi_motion(self) -> AxisMotion:
+        """How the phi axis moves, used to plan scans. Override with the real values if they're known."""
+        return AxisMotion()
+
+    @property
+    def theta_motion(self) -> AxisMotion:
+        """How the theta axis moves, used to plan scans. Override with the real values if they're known."""
+        return AxisMotion()
+
     def test_connection(self) -> None:
         raise NotImplementedError("Must be implemented in subclass")
 
+    def close(self) -> None:
+        """Release the connection to the positioner. Does nothing unless overridden."""
+        return
+
     def abort_movement(self) -> None:
         raise NotImplementedError("Must be implemented in subclass")
 
@@ -66,3 +84,72 @@ class Positioner(QObject):
 
     def move_theta_relative(self, angle: float) -> None:
         raise NotImplementedError("Must be implemented in subclass")
+
+    def move_absolute(self, phi: float, theta: float) -> None:
+        """Move both axes, blocking until they're both there.
+
+        By default, this moves theta and then phi. Override it if the
+        positioner can move both axes at once, so a diagonal move takes as long
+        as the slower axis rather than the sum of both.
+        """
+        self.move_theta_absolute(theta)
+        self.move_phi_absolute(phi)
+
+    def move_relative(self, phi: float, theta: float) -> None:
+        """Move both axes by the given angles, blocking until they're both there. See `move_absolute`."""
+        self.move_absolute(self.phi + phi, self.theta + theta)
+
+    def start_move_absolute(self, phi: float, theta: float) -> MotionFuture:
+        """Start moving both axes, returning immediately.
+
+        By default, this runs `move_absolute` in a background thread. See
+        `start_move_phi_absolute`.
+
+        Returns:
+            MotionFuture: Done once both axes are there
+        """
+        return MotionFuture.run_in_thread(functools.partial(self.move_absolute, phi, theta), cancel=self.abort_movement)
+
+    def start_move_phi_absolute(self, phi: float) -> MotionFuture:
+        """Start moving phi to `phi`, returning immediately.
+
+        By default, this runs `move_phi_absolute` in a background thread, and
+        cancelling the move calls `abort_movement`. Override it to drive the
+        hardware without a blocking call.
+
+        Returns:
+            MotionFuture: Done once phi is at `phi`
+        """
+        return MotionFuture.run_in_thread(functools.partial(self.move_phi_absolute, phi), cancel=self.abort_movement)
+
+    def start_move_theta_absolute(self, theta: float) -> MotionFuture:
+        """Start moving theta to `theta`, returning immediately.
+
+        See `start_move_phi_absolute`.
+
+        Returns:
+            MotionFuture: Done once theta is at `theta`
+        """
+        return MotionFuture.run_in_thread(
+            functools.partial(self.move_theta_absolute, theta), cancel=self.abort_movement
+        )
+
+    def start_phi_sweep(self, phi: float, speed: float) -> float:
+        """Start moving phi to `phi` at a constant `speed` (in degrees/second), returning immediately.
+
+        Used by continuous scans (see `pychamber.continuous`). The move is
+        completed with `finish_phi_sweep`.
+
+        Returns:
+            float: The angle phi will stop at. This can differ a little from
+                `phi`, e.g. for positioners that move in whole steps
+        """
+        raise NotImplementedError("Must be implemented in subclass")
+
+    def finish_phi_sweep(self) -> None:
+        """Wait for the move started by `start_phi_sweep` to complete."""
+        raise NotImplementedError("Must be implemented in subclass")
+
+    def read_phi(self) -> float:
+        """The current phi position, including while a sweep is in progress."""
+        raise NotImplementedError("Must be implemented in subclass")
@@ -0,0 +1,226 @@
+"""Models of how positioners move, and handles to moves that run in the background.
+
+`AxisMotion` estimates how long a move of one axis takes. Positioners report
+one for each axis (`Positioner.phi_motion` and `Positioner.theta_motion`),
+which `pychamber.planner` uses to plan scans.
+
+The `Positioner.start_move_*` methods start a move and return a
+`MotionFuture` straight away, so the caller can keep working (or start
+another move) while the positioner moves, and wait for it only when it needs
+to be there:
+
+```
+future = positioner.start_move_phi_absolute(90.0)
+future.add_done_callback(lambda _: print("Arrived"))
+...
+future.wait()
+```
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+_PENDING = "pending"
+_DONE = "done"
+_CANCELLED = "cancelled"
+
+
+@dataclass
+class AxisMotion:
+    """A model of how long one positioner axis takes to move.
+
+    The axis accelerates at a constant rate up to its top speed (or as close
+    as it gets before it has to slow down again), moves at that speed, slows
+    down at the same rate, and then takes `settle` seconds to settle.
+
+    Attributes:
+        speed: Top speed, in degrees per second
+        acceleration: Acceleration, in degrees per second squared. None if the
+            axis reaches its top speed instantly
+        settle: Time to settle after a move, in seconds
+    """
+
+    speed: float = 10.0
+    acceleration: float | None = None
+    settle: float = 0.0
+
+    def move_time(self, distance: float | np.ndarray) -> float | np.ndarray:
+        """Estimate how long moves take.
+
+        Args:
+            distance: The distance of each move, in degrees
+
+        Returns:
+            float | np.ndarray: The time each move takes, in seconds
+        """
+        distance = np.abs(np.asarray(distance, dtype=float))
+        if self.acceleration is None or self.acceleration <= 0:
+            time = distance / self.speed
+        else:
+            # The distance needed to reach top speed and stop again
+            ramp = self.speed**2 / self.acceleration
+            time = np.where(
+                distance < ramp,
+                2 * np.sqrt(distance / self.acceleration),
+                distance / self.speed + self.speed / self.acceleration,
+            )
+        time = np.where(distance > 0, time + self.settle, 0.0)
+        return time[()] if time.ndim == 0 else time
+
+
+class MotionCancelledError(RuntimeError):
+    pass
+
+
+class MotionFuture:
+    """A move that's in progress.
+
+    Positioner implementations complete the future with `set_done` (after
+    updating their position) or `set_exception`, from whichever thread the
+    move finishes on. Everything else may be called from any thread.
+    """
+
+    def __init__(self, cancel: Callable[[], None] | None = None) -> None:
+        """
+        Args:
+            cancel: Called to stop the move when the future is cancelled. If
+                None, the move can't be cancelled
+        """
+        self._cancel = cancel
+        self._condition = threading.Condition()
+        self._state = _PENDING
+        self._exception: BaseException | None = None
+        self._callbacks: list[Callable[[MotionFuture], None]] = []
+
+    @classmethod
+    def completed(cls) -> MotionFuture:
+        """A future for a move that's already done (e.g. one that doesn't need to move at all)."""
+        future = cls()
+        future.set_done()
+        return future
+
+    @classmethod
+    def run_in_thread(cls, fn: Callable[[], None], cancel: Callable[[], None] | None = None) -> MotionFuture:
+        """Run a blocking move in a background thread.
+
+        Args:
+            fn: Makes the move, returning once it's done
+            cancel: Called to stop the move if the future is cancelled
+
+        Returns:
+            MotionFuture: Done when `fn` returns
+        """
+        future = cls(cancel)
+
+        def run() -> None:
+            try:
+                fn()
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_done()
+
+        threading.Thread(target=run, name="PositionerMove", daemon=True).start()
+        return future
+
+    def done(self) -> bool:
+        """Whether the move has finished, failed or been cancelled."""
+        with self._condition:
+            return self._state != _PENDING
+
+    def cancelled(self) -> bool:
+        """Whether the move was cancelled."""
+        with self._condition:
+            return self._state == _CANCELLED
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Block until the move is done.
+
+        Args:
+            timeout: The longest to wait (in seconds). None to wait for as long
+                as the move takes
+
+        Raises:
+            TimeoutError: If the move isn't done within `timeout`
+            MotionCancelledError: If the move was cancelled
+            Exception: Whatever the move failed with (e.g.
+                `PositionerLimitException`)
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._state != _PENDING, timeout):
+                raise TimeoutError(f"The move didn't finish within {timeout} s")
+            if self._state == _CANCELLED:
+                raise MotionCancelledError("The move was cancelled")
+            if self._exception is not None:
+                raise self._exception
+
+    def add_done_callback(self, fn: Callable[[MotionFuture], None]) -> None:
+        """Call `fn` with this future once the move is done.
+
+        If the move is already done, `fn` is called straight away. Otherwise
+        it's called from the thread that finishes the move.
+        """
+        with self._condition:
+            if self._state == _PENDING:
+                self._callbacks.append(fn)
+                return
+        self._call(fn)
+
+    def cancel(self) -> bool:
+        """Stop the move.
+
+        Where the positioner ends up after a cancelled move depends on the
+        positioner.
+
+        Returns:
+            bool: True if the move was cancelled. False if it was already done
+                or can't be cancelled
+        """
+        if self._cancel is None or self.done():
+            return False
+        self._cancel()
+        return self._finish(_CANCELLED)
+
+    def set_done(self) -> bool:
+        """Mark the move as finished. Does nothing if it was already done or cancelled.
+
+        Returns:
+            bool: True if this finished the move
+        """
+        return self._finish(_DONE)
+
+    def set_exception(self, exception: BaseException) -> bool:
+        """Mark the move as failed. Does nothing if it was already done or cancelled.
+
+        Returns:
+            bool: True if this finished the move
+        """
+        return self._finish(_DONE, exception)
+
+    def _finish(self, state: str, exception: BaseException | None = None) -> bool:
+        with self._condition:
+            if self._state != _PENDING:
+                return False
+            self._state = state
+            self._exception = exception
+            callbacks, self._callbacks = self._callbacks, []
+            self._condition.notify_all()
+        for fn in callbacks:
+            self._call(fn)
+        return True
+
+    def _call(self, fn: Callable[[MotionFuture], None]) -> None:
+        try:
+            fn(self)
+        except Exception:
+            from pychamber.app.logger import LOG
+
+            LOG.exception("Exception in a motion done callback")
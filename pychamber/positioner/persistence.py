@@ -0,0 +1,106 @@
+"""Saving the last known angles of a positioner.
+
+Positioners don't know where they are when they're connected, so plugins save
+their angles to the settings to pick up where they left off. A full scan moves
+the positioner tens of thousands of times, and writing the settings after every
+move would put a disk write in the acquisition thread at every point.
+
+A `PositionStore` keeps the latest angles in memory instead, and writes them
+from a background timer at most once every `interval` seconds. Positioners also
+flush it when a move is aborted and when they're closed, and any stores still
+open are flushed when Python exits. Both angles are written together and synced
+in one go, so a crash leaves a recent position with phi and theta from the same
+moment:
+
+```
+self.positions = PositionStore("example_positioner")
+...
+self.positions.set(phi=self._phi)
+```
+"""
+from __future__ import annotations
+
+import atexit
+import threading
+import weakref
+
+from qtpy.QtCore import QSettings
+
+_STORES: weakref.WeakSet[PositionStore] = weakref.WeakSet()
+
+
+class PositionStore:
+    """The last known angles of a positioner, written to the settings in the background."""
+
+    def __init__(self, key: str, interval: float = 1.0, settings: QSettings | None = None) -> None:
+        """
+        Args:
+            key: Prefix of the settings the angles are saved to (e.g.
+                "diamond_d6050" saves to "diamond_d6050_phi" and
+                "diamond_d6050_theta")
+            interval: The longest a new position goes unsaved (in seconds)
+            settings: Where to save the angles. Defaults to PyChamber's
+                settings
+        """
+        self.key = key
+        self.interval = interval
+        # A separate QSettings object from CONF's, since it's written from the
+        # timer thread
+        self._settings = QSettings("PyChamber", "PyChamber") if settings is None else settings
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._dirty = False
+        self._phi = float(self._settings.value(f"{key}_phi", 0))
+        self._theta = float(self._settings.value(f"{key}_theta", 0))
+        _STORES.add(self)
+
+    @property
+    def phi(self) -> float:
+        return self._phi
+
+    @property
+    def theta(self) -> float:
+        return self._theta
+
+    def set(self, phi: float | None = None, theta: float | None = None) -> None:  # noqa: A003
+        """Update the angles. They're saved within `interval` seconds.
+
+        Args:
+            phi: The new phi, or None to leave it as is
+            theta: The new theta, or None to leave it as is
+        """
+        with self._lock:
+            if phi is not None:
+                self._phi = float(phi)
+            if theta is not None:
+                self._theta = float(theta)
+            self._dirty = True
+            # Every update until the timer fires is saved in one write
+            if self._timer is None:
+                self._timer = threading.Timer(self.interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Save the angles now, if they've changed since they were last saved."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            self._settings.setValue(f"{self.key}_phi", self._phi)
+            self._settings.setValue(f"{self.key}_theta", self._theta)
+            self._settings.sync()
+            self._dirty = False
+
+    def close(self) -> None:
+        """Save the angles, and stop saving them in the background."""
+        self.flush()
+        _STORES.discard(self)
+
+
+@atexit.register
+def _flush_all() -> None:
+    for store in list(_STORES):
+        store.flush()
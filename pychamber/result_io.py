@@ -0,0 +1,330 @@
+"""Storage for experiment results.
+
+Binary results are stored as uncompressed .npz archives. Every member of the
+archive is a plain .npy file, so the archive can still be opened with
+`numpy.load`, but because the members are stored rather than deflated, large
+arrays can also be memory-mapped directly out of the archive without reading
+the whole file.
+
+This module also contains a fast reader and writer for .mdif results. They
+only understand the exact layout PyChamber (through scikit-rf) writes: one
+1-port block per data point in real/imaginary format. Rather than creating a
+`skrf.Network` for every block, the reader jumps from block to block and
+converts each block's numbers in a single call.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping
+    from pathlib import Path
+    from typing import Any
+
+import mmap
+import struct
+import zipfile
+
+import numpy as np
+
+_LOCAL_HEADER_SIZE = 30
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+
+class ResultFileError(Exception):
+    """Raised when a binary result file can't be read."""
+
+    pass
+
+
+class MDIFFormatError(ResultFileError):
+    """Raised when an .mdif file isn't laid out the way PyChamber writes them."""
+
+    pass
+
+
+def write_npz(path: str | Path, arrays: Mapping[str, np.ndarray]) -> None:
+    """Write arrays to an uncompressed .npz archive.
+
+    Arrays are written one slab (along the first axis) at a time, so an array
+    that is itself memory-mapped doesn't need to fit in memory to be saved.
+
+    Args:
+        path: The file to write
+        arrays: Mapping of member name to array
+    """
+    with zipfile.ZipFile(path, mode="w", compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for name, array in arrays.items():
+            with zf.open(f"{name}.npy", mode="w", force_zip64=True) as fp:
+                _write_npy(fp, array)
+
+
+def _write_npy(fp, array: np.ndarray) -> None:
+    header = {
+        "descr": np.lib.format.dtype_to_descr(array.dtype),
+        "fortran_order": False,
+        "shape": array.shape,
+    }
+    np.lib.format.write_array_header_2_0(fp, header)
+    if array.ndim == 0:
+        fp.write(np.ascontiguousarray(array).tobytes())
+        return
+    for i in range(array.shape[0]):
+        fp.write(np.ascontiguousarray(array[i : i + 1]).tobytes())
+
+
+def open_npz(path: str | Path, mmap_mode: str | None = "c") -> dict[str, np.ndarray]:
+    """Open the arrays in an uncompressed .npz archive.
+
+    Args:
+        path: The file to open
+        mmap_mode:
+            Passed to `numpy.memmap`. The default, "c" (copy-on-write), lets
+            the arrays be modified in memory without changing the file. Pass
+            None to read everything into memory instead.
+
+    Returns:
+        dict[str, np.ndarray]: The arrays in the archive, keyed by name
+
+    Raises:
+        ResultFileError: If the file isn't an uncompressed .npz archive
+    """
+    try:
+        zf = zipfile.ZipFile(path, mode="r")
+    except (zipfile.BadZipFile, OSError) as e:
+        raise ResultFileError(f"{path} is not a valid result file") from e
+
+    arrays = {}
+    with zf, open(path, "rb") as fp:
+        for info in zf.infolist():
+            if not info.filename.endswith(".npy"):
+                continue
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ResultFileError(f"{info.filename} in {path} is compressed and can't be memory-mapped")
+
+            fp.seek(info.header_offset)
+            local_header = fp.read(_LOCAL_HEADER_SIZE)
+            if local_header[:4] != _LOCAL_HEADER_SIGNATURE:
+                raise ResultFileError(f"{path} is corrupt")
+            name_len, extra_len = struct.unpack("<HH", local_header[26:30])
+            fp.seek(info.header_offset + _LOCAL_HEADER_SIZE + name_len + extra_len)
+
+            version = np.lib.format.read_magic(fp)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(fp)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(fp)
+            offset = fp.tell()
+
+            name = info.filename[: -len(".npy")]
+            order = "F" if fortran_order else "C"
+            if mmap_mode is None or len(shape) == 0 or 0 in shape:
+                count = int(np.prod(shape))
+                data = np.fromfile(fp, dtype=dtype, count=count).reshape(shape, order=order)
+                arrays[name] = data
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape, order=order)
+
+    return arrays
+
+
+_MDIF_SEPARATOR = "!" + "-" * 79
+_MDIF_BEGIN = b"BEGIN ACDATA"
+_MDIF_END = b"\nEND"
+_FREQ_MULTIPLIERS = {"hz": 1.0, "khz": 1e3, "mhz": 1e6, "ghz": 1e9, "thz": 1e12}
+
+
+class MDIFReader:
+    """Reads the data points in an .mdif result one block at a time.
+
+    The file is memory-mapped, and opening it only scans the VAR lines of each
+    block (the data itself is skipped over), so the variables and frequencies
+    are known before any data is converted. The data is then read with
+    `blocks`.
+
+    Attributes:
+        comments: The comment lines at the top of the file
+        variables: The VAR values of each block, in file order
+        f_scaled: The frequencies, in `unit`
+        unit: The frequency unit the file was written in
+
+    Raises:
+        MDIFFormatError:
+            If the file isn't laid out the way PyChamber writes .mdif files.
+            Such files may still be readable by scikit-rf
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Args:
+            path: The file to read
+        """
+        self.path = path
+        self._fp = open(path, "rb")  # noqa: SIM115
+        try:
+            self._mm = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # Empty file
+            self._fp.close()
+            raise MDIFFormatError(f"{path} is empty") from e
+
+        self.unit = "Hz"
+        self.comments: list[str] = []
+        self.variables: list[dict[str, Any]] = []
+        self._spans: list[tuple[int, int]] = []
+        # Number of frequencies in every block, once the first is read
+        self._n_freq: int | None = None
+        try:
+            self._scan()
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self) -> MDIFReader:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def _scan(self) -> None:
+        pos = 0
+        while (begin := self._mm.find(_MDIF_BEGIN, pos)) != -1:
+            end = self._mm.find(_MDIF_END, begin)
+            if end == -1:
+                raise MDIFFormatError(f"{self.path} has an unterminated data block")
+
+            variables = {}
+            for line in self._mm[pos:begin].decode("utf-8", errors="replace").splitlines():
+                if line.lower().startswith("var"):
+                    name, _, value = line[3:].partition("=")
+                    variables[name.split("(")[0].strip()] = _parse_var(value.strip())
+                elif line.startswith("!") and line.strip("!-") and not self.variables and not variables:
+                    self.comments.append(line[1:].strip())
+            self.variables.append(variables)
+
+            self._spans.append(self._parse_block_header(begin, end))
+            pos = end + len(_MDIF_END)
+
+        if not self._spans:
+            raise MDIFFormatError(f"{self.path} contains no data")
+
+        first = self._parse_data(*self._spans[0])
+        self.f_scaled = first[:, 0]
+        self._n_freq = len(first)
+
+    def _parse_block_header(self, begin: int, end: int) -> tuple[int, int]:
+        # Skips the "%F ...", comment and option lines at the top of a block,
+        # returning the span of the numbers that follow
+        pos = self._mm.find(b"\n", begin) + 1
+        has_options = False
+        while pos < end:
+            line_end = self._mm.find(b"\n", pos)
+            line = self._mm[pos:line_end].strip()
+            if line.startswith(b"%"):
+                if line.split()[1:] != [b"n11x", b"n11y"]:
+                    raise MDIFFormatError(f"{self.path} does not contain 1-port data")
+            elif line.startswith(b"#"):
+                options = line[1:].decode("ascii", errors="replace").split()
+                if [opt.lower() for opt in options[:3]] not in ([unit, "s", "ri"] for unit in _FREQ_MULTIPLIERS):
+                    raise MDIFFormatError(f"{self.path} has unsupported options: {line!r}")
+                self.unit = options[0]
+                has_options = True
+            elif line and not line.startswith(b"!"):
+                break
+            pos = line_end + 1
+
+        if not has_options:
+            raise MDIFFormatError(f"{self.path} is missing its option line")
+        return pos, end
+
+    def _parse_data(self, start: int, end: int) -> np.ndarray:
+        text = self._mm[start:end].decode("ascii", errors="replace")
+        try:
+            values = np.array(text.split(), dtype=float)
+        except ValueError as e:
+            raise MDIFFormatError(f"{self.path} has a malformed data block") from e
+        if len(values) % 3 != 0 or (self._n_freq is not None and len(values) != 3 * self._n_freq):
+            raise MDIFFormatError(f"{self.path} has a malformed data block")
+        return values.reshape((-1, 3))
+
+    def blocks(self) -> Iterator[np.ndarray]:
+        """Iterate over the data in each block.
+
+        Yields:
+            np.ndarray: The complex S11 data of each block, in file order
+
+        Raises:
+            MDIFFormatError: If a block is malformed or uses different frequencies
+        """
+        for start, end in self._spans:
+            data = self._parse_data(start, end)
+            if not np.array_equal(data[:, 0], self.f_scaled):
+                raise MDIFFormatError(f"{self.path} has blocks with different frequencies")
+            yield data[:, 1] + 1j * data[:, 2]
+
+    def close(self) -> None:
+        """Close the file."""
+        self._mm.close()
+        self._fp.close()
+
+
+def _parse_var(value: str) -> Any:
+    # Same rules as scikit-rf: numbers are floats, anything else is a string
+    try:
+        return float(value)
+    except ValueError:
+        return value.replace('"', "")
+
+
+def _format_var(name: str, value: Any) -> str:
+    if isinstance(value, str):
+        return f'VAR {name}(2) = "{value}"'
+    if isinstance(value, bool | np.bool_):
+        return f"VAR {name}(0) = {bool(value)}"
+    return f"VAR {name}(0) = {float(value)!r}"
+
+
+def write_mdif(
+    path: str | Path,
+    f_scaled: np.ndarray,
+    unit: str,
+    blocks: Iterable[tuple[Mapping[str, Any], np.ndarray]],
+    comments: list[str] | None = None,
+) -> None:
+    """Write 1-port data points to an .mdif file.
+
+    The output is the same as `skrf.NetworkSet.write_mdif` gives for a set of
+    1-port networks, but the data is written block by block, so only one
+    point is in memory at a time.
+
+    Args:
+        path: The file to write
+        f_scaled: The frequencies of every point, in `unit`
+        unit: The frequency unit (e.g. "GHz")
+        blocks: (variables, data) for each point, where data is complex S11
+        comments: Comment lines to write at the top of the file
+    """
+    freqs = [repr(f) for f in np.asarray(f_scaled, dtype=float).tolist()]
+    option_lines = (
+        "%F n11x n11y \n"
+        "! network name: \n"
+        "!Created with skrf (http://scikit-rf.org).\n"
+        f"# {unit} S RI R 50.0 \n"
+        "!freq ReS11 ImS11\n"
+    )
+    with open(path, "w") as fp:
+        for comment in comments or []:
+            fp.write(f"! {comment}\n")
+
+        for variables, data in blocks:
+            fp.write(_MDIF_SEPARATOR + "\n")
+            for name, value in variables.items():
+                fp.write(_format_var(name, value) + "\n")
+            fp.write("\nBEGIN ACDATA\n")
+            fp.write(option_lines)
+            data = np.asarray(data, dtype=complex).reshape(-1)
+            rows = zip(freqs, data.real.tolist(), data.imag.tolist(), strict=True)
+            fp.write("".join(f"{f} {re!r} {im!r}\n" for f, re, im in rows))
+            fp.write("END\n\n")
@@ -0,0 +1,58 @@
+"""The order in which an experiment visits each (theta, phi) point.
+
+An experiment is measured one row at a time: the outer axis is moved to the
+row's position once, and then the inner axis is swept across every point of
+the row. With a plain raster, the inner axis sweeps in the same direction for
+every row, so after each row it has to travel the full span back to its start
+before measuring anything. A serpentine (boustrophedon) order instead sweeps
+alternate rows in reverse, so each row starts where the last one ended.
+
+Where the data ends up doesn't depend on the order it was measured in, since
+`ExperimentResult` places each point by its angles.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+SCAN_ORDERS = ("raster", "serpentine", "serpentine_theta")
+
+
+def scan_rows(thetas: Iterable[float], phis: Iterable[float], order: str = "raster") -> list[list[tuple[float, float]]]:
+    """Get the rows of points to measure, in the order to measure them.
+
+    - "raster": Theta is the outer axis, and phi is swept from first to last
+      in every row
+    - "serpentine": Theta is the outer axis, and phi is swept in alternating
+      directions
+    - "serpentine_theta": Phi is the outer axis, and theta is swept in
+      alternating directions
+
+    Args:
+        thetas: The theta locations (in degrees), in the order to visit them
+        phis: The phi locations (in degrees), in the order to visit them
+        order: One of `SCAN_ORDERS`
+
+    Returns:
+        list[list[tuple[float, float]]]: The rows of (theta, phi) points
+
+    Raises:
+        ValueError: If the order is unknown
+    """
+    if order not in SCAN_ORDERS:
+        raise ValueError(f"Unknown scan order {order!r}. Expected one of {SCAN_ORDERS}")
+
+    thetas = list(thetas)
+    phis = list(phis)
+    if order == "serpentine_theta":
+        return [
+            [(theta, phi) for theta in (thetas if i % 2 == 0 else reversed(thetas))] for i, phi in enumerate(phis)
+        ]
+
+    serpentine = order == "serpentine"
+    return [
+        [(theta, phi) for phi in (phis if i % 2 == 0 or not serpentine else reversed(phis))]
+        for i, theta in enumerate(thetas)
+    ]
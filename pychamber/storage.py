@@ -0,0 +1,303 @@
+"""Disk-backed storage for experiment data.
+
+A full-sphere scan at a fine angular step and many frequency points can easily
+be larger than the memory of the machine running it. `ChunkedCube` stores a
+3D (frequency, phi, theta) array in a memory-mapped scratch file instead, so
+the size of a scan is limited by disk space rather than RAM.
+
+The file is split into chunks of `chunks` elements along each axis, with each
+chunk stored contiguously. The default chunk shape is chosen so that a single
+frequency of a chunk is exactly one 4 KiB page of complex128 data. Reading a
+cut or a 3D slice at one frequency (`get_theta_cut`, `get_phi_cut`,
+`get_3d_data`) therefore only pages in the data that was asked for, and
+reading or writing every frequency at one point (`get_over_freq_vals`,
+`append`) touches one page per frequency, the same as a plain array would.
+
+Chunks are only initialized (filled with `fill_value`) the first time they're
+written to. Until then they read as `fill_value` without ever being touched on
+disk, so creating a cube for a huge scan is instant and the scratch file only
+grows as data is measured.
+
+Data can also be stored at reduced precision. complex64 halves the size of a
+result, and `MagPhaseCube` quarters it by storing 16-bit magnitude and phase,
+both still well below the measurement uncertainty of a VNA.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Any
+
+import tempfile
+
+import numpy as np
+
+DEFAULT_CHUNKS = (16, 16, 16)
+
+# Ways experiment data can be stored. "magphase16" is a `MagPhaseCube`
+STORAGE_DTYPES = ("complex128", "complex64", "magphase16")
+
+
+class ChunkedCube:
+    """A chunked, memory-mapped 3D array.
+
+    The cube supports the same indexing as a numpy array (integers, slices,
+    index arrays, etc.) for both reading and writing. Reading always returns a
+    new in-memory numpy array.
+
+    The scratch file backing the cube is anonymous and is deleted when the
+    cube is closed or garbage collected.
+    """
+
+    def __init__(
+        self,
+        shape: tuple[int, int, int],
+        dtype: Any = complex,
+        chunks: tuple[int, int, int] | None = None,
+        fill_value: Any = np.nan,
+        dir: str | Path | None = None,  # noqa: A002
+    ) -> None:
+        """
+        Args:
+            shape: The shape of the cube
+            dtype: The data type of the cube
+            chunks:
+                The shape of each chunk. Each dimension is clipped to the
+                size of the cube. Defaults to `DEFAULT_CHUNKS`
+            fill_value: The value of elements that haven't been written yet
+            dir: The directory to create the scratch file in. Defaults to the
+                system's temporary directory
+        """
+        chunks = DEFAULT_CHUNKS if chunks is None else chunks
+        if len(shape) != 3 or len(chunks) != 3:
+            raise ValueError("ChunkedCube must be 3 dimensional")
+        if any(n < 1 for n in chunks):
+            raise ValueError(f"Invalid chunk shape {chunks}")
+
+        self._shape = tuple(int(n) for n in shape)
+        self._dtype = np.dtype(dtype)
+        self._chunks = tuple(max(1, min(int(c), n)) for c, n in zip(chunks, self._shape, strict=True))
+        self.fill_value = fill_value
+
+        n_chunks = tuple(-(-n // c) for n, c in zip(self._shape, self._chunks, strict=True))
+        self._initialized = np.zeros(n_chunks, dtype=bool)
+        self._file = tempfile.TemporaryFile(prefix="pychamber-", suffix=".cube", dir=dir)
+        if 0 in self._shape:
+            self._data = np.empty(n_chunks + self._chunks, dtype=self._dtype)
+        else:
+            self._data = np.memmap(self._file, dtype=self._dtype, mode="w+", shape=n_chunks + self._chunks)
+
+    def __repr__(self) -> str:
+        return f"ChunkedCube(shape={self.shape}, dtype={self.dtype}, chunks={self.chunks})"
+
+    def __len__(self) -> int:
+        return self._shape[0]
+
+    def __array__(self, dtype=None) -> np.ndarray:
+        data = self[...]
+        return data if dtype is None else data.astype(dtype)
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        """The shape of the cube."""
+        return self._shape
+
+    @property
+    def ndim(self) -> int:
+        """The number of dimensions of the cube (always 3)."""
+        return 3
+
+    @property
+    def dtype(self) -> np.dtype:
+        """The data type of the cube."""
+        return self._dtype
+
+    @property
+    def chunks(self) -> tuple[int, int, int]:
+        """The shape of each chunk."""
+        return self._chunks
+
+    def _locate(self, key) -> tuple[tuple[np.ndarray, ...], tuple[np.ndarray, ...]]:
+        # Find the coordinates of every selected element by indexing a
+        # (zero-copy) grid of coordinates with the key. This gives exactly
+        # numpy's result shape for any key while only allocating the result.
+        coords = []
+        for axis, n in enumerate(self._shape):
+            grid_shape = [1, 1, 1]
+            grid_shape[axis] = n
+            grid = np.broadcast_to(np.arange(n).reshape(grid_shape), self._shape)
+            coords.append(np.asarray(grid[key]))
+
+        chunk_idx = tuple(c // n for c, n in zip(coords, self._chunks, strict=True))
+        offsets = tuple(c % n for c, n in zip(coords, self._chunks, strict=True))
+        return chunk_idx, offsets
+
+    def __getitem__(self, key) -> np.ndarray:
+        chunk_idx, offsets = self._locate(key)
+        data = self._data[chunk_idx + offsets]
+        data = np.where(self._initialized[chunk_idx], data, np.asarray(self.fill_value, dtype=self._dtype))
+        return data[()] if data.ndim == 0 else data
+
+    def __setitem__(self, key, value) -> None:
+        chunk_idx, offsets = self._locate(key)
+        uninitialized = ~self._initialized[chunk_idx]
+        if uninitialized.any():
+            new_chunks = tuple(np.unique(np.stack([idx[uninitialized] for idx in chunk_idx]), axis=1))
+            self._data[new_chunks] = self.fill_value
+            self._initialized[new_chunks] = True
+
+        self._data[chunk_idx + offsets] = value
+
+    def flush(self) -> None:
+        """Write any changes to the scratch file."""
+        if isinstance(self._data, np.memmap):
+            self._data.flush()
+
+    def close(self) -> None:
+        """Release the scratch file. The cube can't be used afterwards."""
+        self._data = None
+        self._file.close()
+
+
+class MagPhaseCube:
+    """A 3D complex array stored as 16-bit magnitude (in dB) and phase.
+
+    This is a quarter of the size of complex128 data, and still far more
+    precise than a VNA measurement: magnitudes are stored in steps of
+    `DB_STEP` dB (so are off by at most half that), and phases in steps of
+    `PHASE_STEP` degrees. Magnitudes are clipped to +/- ~327 dB, so an exact
+    zero reads back as a very small number rather than zero.
+
+    The encoded magnitudes and phases can be numpy arrays or `ChunkedCube`s.
+    Reading decodes to complex64, and writing encodes complex values, with
+    the same indexing as a numpy array.
+    """
+
+    DB_STEP = 0.01
+    PHASE_STEP = 360 / 65536
+    # Encoded magnitude of elements that haven't been written yet (NaN)
+    EMPTY = np.iinfo(np.int16).min
+
+    def __init__(self, magnitude: np.ndarray | ChunkedCube, phase: np.ndarray | ChunkedCube) -> None:
+        """
+        Args:
+            magnitude: The encoded magnitudes
+            phase: The encoded phases. Must be the same shape as `magnitude`
+        """
+        if magnitude.shape != phase.shape:
+            raise ValueError(f"Magnitude and phase shapes differ ({magnitude.shape} != {phase.shape})")
+        self.magnitude = magnitude
+        self.phase = phase
+
+    @classmethod
+    def empty(
+        cls,
+        shape: tuple[int, int, int],
+        chunks: tuple[int, int, int] | None = None,
+        dir: str | Path | None = None,  # noqa: A002
+        disk_backed: bool = False,
+    ) -> MagPhaseCube:
+        """Create a cube with every element unwritten (NaN).
+
+        Args:
+            shape: The shape of the cube
+            chunks: The chunk shape if disk-backed. See `ChunkedCube`
+            dir: The directory to create the scratch files in if disk-backed
+            disk_backed: Whether to store the encoded data in `ChunkedCube`s
+
+        Returns:
+            MagPhaseCube: The new cube
+        """
+        if disk_backed:
+            magnitude = ChunkedCube(shape, dtype=np.int16, chunks=chunks, fill_value=cls.EMPTY, dir=dir)
+            phase = ChunkedCube(shape, dtype=np.int16, chunks=chunks, fill_value=0, dir=dir)
+        else:
+            magnitude = np.full(shape, cls.EMPTY, dtype=np.int16)
+            phase = np.zeros(shape, dtype=np.int16)
+        return cls(magnitude, phase)
+
+    def __repr__(self) -> str:
+        return f"MagPhaseCube(shape={self.shape})"
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __array__(self, dtype=None) -> np.ndarray:
+        data = self[...]
+        return data if dtype is None else data.astype(dtype)
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        """The shape of the cube."""
+        return self.magnitude.shape
+
+    @property
+    def ndim(self) -> int:
+        """The number of dimensions of the cube (always 3)."""
+        return 3
+
+    @property
+    def dtype(self) -> np.dtype:
+        """The data type read from the cube."""
+        return np.dtype(np.complex64)
+
+    @classmethod
+    def encode(cls, values) -> tuple[np.ndarray, np.ndarray]:
+        """Encode complex values.
+
+        Args:
+            values: The complex values
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The encoded (magnitude, phase)
+        """
+        values = np.asarray(values, dtype=complex)
+        empty = np.isnan(values)
+        limit = np.iinfo(np.int16).max
+        with np.errstate(divide="ignore", invalid="ignore"):
+            db = 20 * np.log10(np.abs(values)) / cls.DB_STEP
+        magnitude = np.where(empty, cls.EMPTY, np.clip(np.rint(np.nan_to_num(db, neginf=-limit)), -limit, limit))
+        # +180 degrees wraps around to -180
+        phase = np.rint(np.where(empty, 0, np.angle(values, deg=True)) / cls.PHASE_STEP).astype(np.int64)
+        phase = (phase + 32768) % 65536 - 32768
+        return magnitude.astype(np.int16), phase.astype(np.int16)
+
+    @classmethod
+    def decode(cls, magnitude, phase) -> np.ndarray:
+        """Decode encoded values.
+
+        Args:
+            magnitude: The encoded magnitudes
+            phase: The encoded phases
+
+        Returns:
+            np.ndarray: The complex64 values
+        """
+        magnitude = np.asarray(magnitude)
+        linear = np.power(np.float32(10), magnitude.astype(np.float32) * np.float32(cls.DB_STEP / 20))
+        linear = np.where(magnitude == cls.EMPTY, np.float32(np.nan), linear)
+        radians = np.asarray(phase).astype(np.float32) * np.float32(np.deg2rad(cls.PHASE_STEP))
+        return (linear * np.exp(1j * radians)).astype(np.complex64)
+
+    def __getitem__(self, key) -> np.ndarray:
+        data = self.decode(self.magnitude[key], self.phase[key])
+        return data[()] if data.ndim == 0 else data
+
+    def __setitem__(self, key, value) -> None:
+        magnitude, phase = self.encode(value)
+        self.magnitude[key] = magnitude
+        self.phase[key] = phase
+
+    def flush(self) -> None:
+        """Write any changes to the scratch files, if disk-backed."""
+        for data in (self.magnitude, self.phase):
+            if isinstance(data, ChunkedCube | np.memmap):
+                data.flush()
+
+    def close(self) -> None:
+        """Release the scratch files, if disk-backed."""
+        for data in (self.magnitude, self.phase):
+            if isinstance(data, ChunkedCube):
+                data.close()
@@ -0,0 +1,169 @@
+"""Per-point timing of each stage of a scan.
+
+When a scan is slower than expected, the total time per point doesn't say
+why. `ScanTimings` records when each stage of measuring each point started and
+ended:
+
+- move: moving the positioner to the point (including settling)
+- sweep: sweeping the VNA
+- transfer: reading the data of the sweep from the VNA
+- record: tagging and journaling the data
+- deliver: handing the data from the acquisition thread to the GUI thread
+- append: appending the data to the result (including applying the calibration)
+
+The timings are kept in a compact numpy structured array (see `array`), and
+can be exported as CSV or as a Chrome trace (open it in chrome://tracing or
+https://ui.perfetto.dev) to see how the stages overlap.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pathlib
+    from collections.abc import Iterator
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+STAGES = ("move", "sweep", "transfer", "record", "deliver", "append")
+
+_EDGES = ("start", "end")
+_DTYPE = np.dtype(
+    [("theta", "f8"), ("phi", "f8")] + [(f"{stage}_{edge}", "f8") for stage in STAGES for edge in _EDGES]
+)
+
+Point = tuple[float, float]
+
+
+class ScanTimings:
+    """The start and end time of each stage of each point of a scan.
+
+    Times are in seconds since the timings were created. A stage that didn't
+    run for a point (e.g. "deliver" outside the GUI) is NaN. Stages can be
+    timed from any thread.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        """
+        Args:
+            capacity: The number of points to allocate space for up front. The
+                space grows as needed
+        """
+        self._origin = time.perf_counter()
+        self._data = np.full(max(1, capacity), np.nan, dtype=_DTYPE)
+        self._n = 0
+        self._rows: dict[Point, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._n
+
+    def start(self, point: Point, stage: str) -> None:
+        """Mark the start of a stage of a point."""
+        self._mark(point, stage, "start")
+
+    def end(self, point: Point, stage: str) -> None:
+        """Mark the end of a stage of a point."""
+        self._mark(point, stage, "end")
+
+    @contextmanager
+    def time(self, point: Point, stage: str) -> Iterator[None]:
+        """Time a stage of a point for the duration of a with block."""
+        self.start(point, stage)
+        try:
+            yield
+        finally:
+            self.end(point, stage)
+
+    def _mark(self, point: Point, stage: str, edge: str) -> None:
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage {stage!r}. Must be one of {STAGES}")
+        now = time.perf_counter() - self._origin
+        point = (float(point[0]), float(point[1]))
+        with self._lock:
+            row = self._rows.get(point)
+            if row is None:
+                if self._n == len(self._data):
+                    grown = np.full(2 * len(self._data), np.nan, dtype=_DTYPE)
+                    grown[: self._n] = self._data
+                    self._data = grown
+                row = self._n
+                self._n += 1
+                self._rows[point] = row
+                self._data["theta"][row], self._data["phi"][row] = point
+            self._data[f"{stage}_{edge}"][row] = now
+
+    @property
+    def array(self) -> np.ndarray:
+        """A copy of the timings, as a structured array with one row per point in the order they were first timed.
+
+        The fields are theta, phi, then `<stage>_start` and `<stage>_end` for each of `STAGES`.
+        """
+        with self._lock:
+            return self._data[: self._n].copy()
+
+    def durations(self, stage: str) -> np.ndarray:
+        """How long a stage took for each point (in seconds). NaN for points it didn't run for."""
+        data = self.array
+        return data[f"{stage}_end"] - data[f"{stage}_start"]
+
+    def summary(self) -> str:
+        """A one-line summary of the mean time of each stage per point."""
+        data = self.array
+        if len(data) == 0:
+            return "No points timed"
+        times = np.stack([data[field] for field in data.dtype.names[2:]])
+        wall_time = float(np.nanmax(times) - np.nanmin(times))
+
+        stages = []
+        for stage in STAGES:
+            durations = data[f"{stage}_end"] - data[f"{stage}_start"]
+            if not np.all(np.isnan(durations)):
+                stages.append(f"{stage} {np.nanmean(durations) * 1000:.1f} ms")
+        return (
+            f"{len(data)} points in {wall_time:.1f} s ({wall_time / len(data) * 1000:.1f} ms/point)."
+            f" Mean per point: {', '.join(stages)}"
+        )
+
+    def to_csv(self, path: str | pathlib.Path) -> None:
+        """Write the timings to a CSV file with a header row, in the layout of `array`."""
+        data = self.array
+        np.savetxt(
+            path,
+            np.column_stack([data[field] for field in data.dtype.names]).reshape((-1, len(data.dtype.names))),
+            delimiter=",",
+            header=",".join(data.dtype.names),
+            comments="",
+        )
+
+    def to_chrome_trace(self, path: str | pathlib.Path) -> None:
+        """Write the timings in the Chrome trace event format, with one track per stage."""
+        data = self.array
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": 0, "tid": tid, "args": {"name": stage}}
+            for tid, stage in enumerate(STAGES)
+        ]
+        for tid, stage in enumerate(STAGES):
+            for point in data:
+                start, end = point[f"{stage}_start"], point[f"{stage}_end"]
+                if np.isnan(start) or np.isnan(end):
+                    continue
+                events.append(
+                    {
+                        "name": stage,
+                        "ph": "X",
+                        "pid": 0,
+                        "tid": tid,
+                        "ts": float(start) * 1e6,
+                        "dur": float(end - start) * 1e6,
+                        "args": {"theta": float(point["theta"]), "phi": float(point["phi"])},
+                    }
+                )
+
+        with open(path, "w") as fp:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fp)
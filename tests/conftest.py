@@ -35,6 +35,20 @@ def DummySerial():
     return _dummyserial
 
 
+@pytest.fixture
+def make_point():
+    """Factory for the network of one measured point, as appended to an ExperimentResult."""
+
+    def _make_point(frequency, phi, theta, polarization, value=None):
+        # By default, the value encodes the angles so points can be told apart
+        value = phi + 1j * theta if value is None else value
+        s = np.full((len(frequency), 1, 1), value, dtype=complex)
+        params = {"phi": phi, "theta": theta, "polarization": polarization, "calibrated": False}
+        return skrf.Network(frequency=frequency, s=s, params=params)
+
+    return _make_point
+
+
 @pytest.fixture(scope="module")
 def example_result():
     f = skrf.Frequency(1, 10, 51, "ghz")
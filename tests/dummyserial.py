@@ -7,6 +7,7 @@ Dummy Serial Class Definitions
 
 import logging
 import logging.handlers
+import threading
 import time
 
 from serial.serialutil import PortNotOpenError, SerialBase, SerialException
@@ -79,6 +80,8 @@ class Serial(SerialBase):
 
         self._input_buffer = NO_DATA_PRESENT
         self._output_buffer = NO_DATA_PRESENT
+        # Responses are read from another thread than the one writing commands
+        self._lock = threading.Lock()
 
     def open(self):  # noqa: A003
         """Open a (previously initialized) port."""
@@ -114,12 +117,14 @@ class Serial(SerialBase):
             raise DSTypeError("The input must be type bytes. Given:" + repr(data))
 
         # Look up which data that should be waiting for subsequent read
-        # commands.
-        self._output_buffer = self.expected_responses.get(data)
-        if not self._output_buffer:
+        # commands. Like a real port, responses queue up until they're read
+        response = self.expected_responses.get(data)
+        if not response:
             if self.raise_on_unrecognized:
                 raise KeyError(f"Unrecognized command: {str(data)}. Add to expected_responses dict.")
-            self._output_buffer = NO_DATA_PRESENT
+            response = NO_DATA_PRESENT
+        with self._lock:
+            self._output_buffer += response
         self._logger.debug(f"{self._output_buffer=}")
 
     def read(self, size=1):
@@ -142,33 +147,43 @@ class Serial(SerialBase):
 
         # Do the actual reading from the waiting data, and simulate the
         # influence of size.
-        if self._output_buffer == DEFAULT_RESPONSE:
-            return_val = self._output_buffer
-        elif size == len(self._output_buffer):
-            return_val = self._output_buffer
-            self._output_buffer = NO_DATA_PRESENT
-        elif size < len(self._output_buffer):
-            self._logger.debug(
-                f"The size to read ({size}) is smaller than the available data ({len(self._output_buffer)}:"
-                f' "{self._output_buffer}"). Some bytes will be kept for later.'
-            )
-
-            return_val = self._output_buffer[:size]
-            self._output_buffer = self._output_buffer[size:]
-        else:  # Wait for timeout - we asked for more data than available!
+        with self._lock:
+            return_val = self._take(size)
+        if return_val is None:  # Wait for timeout - we asked for more data than available!
             self._logger.debug(
                 f"The size to read ({size}) is larger than the available data({len(self._output_buffer)}:"
                 f' "{self._output_buffer}"). Will sleep until timeout.'
             )
 
             time.sleep(self.timeout)
-            return_val = self._output_buffer
-            self._output_buffer = NO_DATA_PRESENT
+            with self._lock:
+                return_val = self._take(size)
+                if return_val is None:
+                    return_val = self._output_buffer
+                    self._output_buffer = NO_DATA_PRESENT
 
         self._logger.debug(f'Read ({len(return_val)}): "{return_val}"')
 
         return return_val
 
+    def _take(self, size):
+        # The next size bytes of the waiting data, or None if there isn't enough
+        if self._output_buffer == DEFAULT_RESPONSE:
+            return self._output_buffer
+        if size == len(self._output_buffer):
+            return_val = self._output_buffer
+            self._output_buffer = NO_DATA_PRESENT
+            return return_val
+        if size < len(self._output_buffer):
+            self._logger.debug(
+                f"The size to read ({size}) is smaller than the available data ({len(self._output_buffer)}:"
+                f' "{self._output_buffer}"). Some bytes will be kept for later.'
+            )
+            return_val = self._output_buffer[:size]
+            self._output_buffer = self._output_buffer[size:]
+            return return_val
+        return None
+
     def in_waiting(self):
         """Returns length of waiting input data."""
         return len(self._input_buffer)
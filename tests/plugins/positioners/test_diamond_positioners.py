@@ -1,8 +1,11 @@
 import functools
+import threading
 
+import numpy as np
 import pytest
 import serial
 
+from pychamber.continuous import ContinuousScan
 from pychamber.plugins.positioners.diamond.d6050 import Diamond_D6050
 
 
@@ -44,6 +47,10 @@ def dummy_positioner(DummySerial, monkeymodule):
         b"Y0RN+24000\r": b"y0>\r",
         b"X0RN-19200\r": b"x0>\r",
         b"Y0RN-48000\r": b"y0>\r",
+        # Constant-velocity sweeps
+        b"X0B6400\r": b"x0>\r",
+        b"X0E6400\r": b"x0>\r",
+        b"X0RN+864\r": b"x0>\r",
         # Aborts
         b"X0*\r": b"x0>\r",
         b"Y0*\r": b"y0>\r",
@@ -119,5 +126,75 @@ def test_el_move_unnecessary(dummy_positioner):
     assert dummy_positioner.elevation == pytest.approx(0.0)
 
 
+def test_phi_sweep(dummy_positioner):
+    dummy_positioner.zero_all()
+    dummy_positioner.start_phi_sweep(10.0, 20.0)
+    assert 0.0 <= dummy_positioner.read_phi() <= 10.0
+    dummy_positioner.finish_phi_sweep()
+    assert dummy_positioner.phi == pytest.approx(10.0)
+    assert dummy_positioner.read_phi() == pytest.approx(10.0)
+
+
+def test_continuous_cut_on_non_integer_grid(dummy_positioner, mocker):
+    dummy_positioner.zero_all()
+    # The last point is 2.6999999999999997, a hair short of a whole step
+    phis = np.arange(0, 2.8, 0.3)
+    scan = ContinuousScan(dummy_positioner, mocker.Mock(), speed=20.0)
+
+    sweeps = []
+    cut = threading.Thread(target=lambda: sweeps.extend(scan.measure_cut(phis)), daemon=True)
+    cut.start()
+    cut.join(timeout=5)
+
+    assert not cut.is_alive()
+    assert sweeps[-1].phi == dummy_positioner.phi == pytest.approx(2.7)
+
+
+def test_start_move(dummy_positioner):
+    dummy_positioner.zero_all()
+    phi = dummy_positioner.start_move_phi_absolute(10.0)
+    phi.wait(timeout=5)
+    assert dummy_positioner.phi == pytest.approx(10.0)
+
+    theta = dummy_positioner.start_move_theta_absolute(-10.0)
+    theta.wait(timeout=5)
+    assert dummy_positioner.theta == pytest.approx(-10.0)
+    assert dummy_positioner.start_move_theta_absolute(-10.0).done()
+
+
+def test_move_both_axes(dummy_positioner):
+    dummy_positioner.zero_all()
+    dummy_positioner.move_absolute(10.0, -10.0)
+    assert (dummy_positioner.phi, dummy_positioner.theta) == pytest.approx((10.0, -10.0))
+    dummy_positioner.move_relative(-20.0, 20.0)
+    assert (dummy_positioner.phi, dummy_positioner.theta) == pytest.approx((-10.0, 10.0))
+
+
 def test_abort_all(dummy_positioner):
     dummy_positioner.abort_all()
+
+
+def test_reset_skips_applied_settings(dummy_positioner, mocker):
+    configure = mocker.spy(Diamond_D6050, "configure")
+
+    # Connecting applies every setting, in the same order as ever
+    Diamond_D6050("test").close()
+    commands = [cmd for _, cmd in configure.call_args.args[1]]
+    assert len(commands) == 22
+    assert commands[:4] == ["X0N-0cz00", "Y0N-0cz00", "X0A2000000000", "Y0A2000000000"]
+    assert commands[-2:] == ["X0S8", "Y0S8"]
+
+    # The sweep changed the speeds of phi, so only those are sent again
+    dummy_positioner.zero_all()
+    dummy_positioner.start_phi_sweep(10.0, 20.0)
+    dummy_positioner.finish_phi_sweep()
+    dummy_positioner.reset()
+    assert configure.call_args.args[1] == [
+        (None, "X0A2000000000"),
+        (None, "Y0A2000000000"),
+        ("X0 start speed", "X0B1000"),
+        ("X0 end speed", "X0E5000"),
+    ]
+
+    dummy_positioner.reset(force=True)
+    assert len(configure.call_args.args[1]) == 22
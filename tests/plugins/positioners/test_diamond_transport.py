@@ -0,0 +1,106 @@
+import threading
+import time
+
+from pychamber.plugins.positioners.diamond.transport import BoardResponse, BoardTransport
+
+
+class DelayedConnection:
+    """Replies to each command after a delay per axis, so replies can arrive out of order."""
+
+    timeout = 0.05
+
+    def __init__(self, delays):
+        self.delays = delays
+        # (due time, lines), in the order they were sent
+        self.lines = []
+        self.condition = threading.Condition()
+        self.closed = False
+
+    def write(self, data):
+        cmd = data.decode("ascii").strip()
+        self.send(self.delays.get(cmd[:2], 0.0), f"{cmd[:2].lower()}>{cmd[2:]}\n\r".encode("ascii"))
+
+    def send(self, delay, *lines):
+        with self.condition:
+            self.lines.append((time.monotonic() + delay, list(lines)))
+            self.condition.notify_all()
+
+    def read_until(self, terminator):
+        # Returns the first line that's due, keeping the replies to each axis in order
+        deadline = time.monotonic() + self.timeout
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                due = [entry for entry in self.lines if entry[0] <= now]
+                if due:
+                    lines = min(due, key=lambda entry: entry[0])[1]
+                    line = lines.pop(0)
+                    self.lines = [entry for entry in self.lines if entry[1]]
+                    return line
+                if now >= deadline:
+                    return b""
+                self.condition.wait(min([deadline, *(entry[0] for entry in self.lines)]) - now)
+
+    def close(self):
+        self.closed = True
+
+
+def test_parse():
+    assert BoardResponse.parse(b"\nx0>abc\r") == BoardResponse("x", "0", ">", "ab")
+    assert BoardResponse.parse(b"NONE") is None
+    assert BoardResponse.parse(b"") is None
+
+
+def test_replies_are_matched_to_requests():
+    connection = DelayedConnection({"X0": 0.1})
+    transport = BoardTransport(connection)
+
+    replies = {}
+    x = threading.Thread(target=lambda: replies.setdefault("x", transport.request("X0RN+100")))
+    x.start()
+    time.sleep(0.01)
+    # The reply to Y arrives first, and doesn't wait for X's
+    started = time.monotonic()
+    replies["y"] = transport.request("Y0RN+200")
+    assert time.monotonic() - started < 0.1
+    x.join()
+
+    assert replies["x"].response == "RN+100"
+    assert replies["y"].response == "RN+200"
+    transport.close()
+    assert connection.closed
+
+
+def test_request_times_out():
+    transport = BoardTransport(DelayedConnection({"X0": 1.0}), timeout=0.05)
+    assert transport.request("X0") is None
+    transport.close()
+
+
+def test_request_many_is_pipelined():
+    connection = DelayedConnection({"X0": 0.1, "Y0": 0.1})
+    transport = BoardTransport(connection)
+    started = time.monotonic()
+    replies = transport.request_many(["X0P1", "Y0P1", "X0qE", "Y0qE"])
+    # All four are in flight at once, rather than one after the other
+    assert time.monotonic() - started < 0.3
+    assert [reply.response for reply in replies] == ["P1", "P1", "qE", "qE"]
+    transport.close()
+
+
+def test_lines_split_across_reads():
+    connection = DelayedConnection({})
+    transport = BoardTransport(connection)
+    connection.write = lambda data: connection.send(0.0, b"\nx0>", b"P1\n\r")
+    assert transport.request("X0P1").response == "P1"
+    transport.close()
+
+
+def test_late_reply_is_discarded():
+    transport = BoardTransport(DelayedConnection({"X0": 0.2}), timeout=0.05)
+    assert transport.request("X0P1") is None
+
+    # The late reply to P1 arrives first, and isn't mistaken for the reply to qE
+    transport.timeout = 1.0
+    assert transport.request("X0qE").response == "qE"
+    transport.close()
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from pychamber import positioner as positioner_api
+from pychamber.api import PluginManager
+from pychamber.plugins.positioners.simulated.simulated import SimulatedPositioner, _travelled
+from pychamber.positioner import AxisMotion, MotionCancelledError, PositionerLimitException
+
+
+@pytest.fixture
+def positioner(qtbot):
+    positioner = SimulatedPositioner(
+        "",
+        phi_motion=AxisMotion(speed=100.0, acceleration=1000.0, settle=0.01),
+        theta_motion=AxisMotion(speed=50.0, acceleration=500.0, settle=0.01),
+        latency=0.001,
+        backlash={"phi": 5.0},
+        limits={"phi": (-20.0, 20.0)},
+    )
+    positioner.zero_all()
+    yield positioner
+    positioner.zero_all()
+    positioner.close()
+
+
+def test_registered():
+    PluginManager().load_plugins()
+    assert "Simulated Positioner" in positioner_api.available_models()["Simulated"]
+
+
+@pytest.mark.parametrize("distance", [0.5, 20.0])
+def test_trapezoidal_profile(distance):
+    motion = AxisMotion(speed=10.0, acceleration=20.0)
+    total = motion.move_time(distance)
+    assert _travelled(motion, distance, 0.0) == 0.0
+    assert _travelled(motion, distance, total / 2) == pytest.approx(distance / 2)
+    assert _travelled(motion, distance, total) == pytest.approx(distance)
+    # Slower at the start than at the end of the first half
+    assert _travelled(motion, distance, total / 8) < _travelled(motion, distance, total / 2) / 4
+
+
+def test_move_both_axes_at_once(positioner):
+    started = time.monotonic()
+    positioner.move_absolute(10.0, -10.0)
+    elapsed = time.monotonic() - started
+    assert (positioner.phi, positioner.theta) == (10.0, -10.0)
+    # As long as the slower axis, not both one after the other
+    theta_time = positioner.theta_motion.move_time(10.0)
+    assert theta_time <= elapsed < theta_time + positioner.phi_motion.move_time(10.0)
+
+
+def test_reversing_takes_up_backlash(positioner):
+    positioner.move_phi_absolute(10.0)
+    started = time.monotonic()
+    positioner.move_phi_absolute(0.0)
+    assert time.monotonic() - started >= positioner.phi_motion.move_time(15.0)
+    assert positioner.phi == 0.0
+
+
+def test_limits(positioner):
+    with pytest.raises(PositionerLimitException, match="Max limit"):
+        positioner.move_phi_absolute(30.0)
+    assert positioner.phi == 20.0
+
+
+def test_abort_stops_part_way(positioner):
+    future = positioner.start_move_phi_absolute(20.0)
+    time.sleep(0.05)
+    assert 0.0 < positioner.read_phi() < 20.0
+    positioner.abort_movement()
+    with pytest.raises(MotionCancelledError):
+        future.wait()
+    assert 0.0 < positioner.phi < 20.0
+
+    # The positioner moves normally afterwards
+    positioner.move_phi_absolute(0.0)
+    assert positioner.phi == 0.0
+
+
+def test_phi_sweep(positioner):
+    started = time.monotonic()
+    positioner.start_phi_sweep(10.0, 50.0)
+    time.sleep(0.1)
+    # At a constant speed, whenever the sweep actually started
+    phi = positioner.read_phi()
+    assert 50.0 * 0.09 <= phi <= 50.0 * (time.monotonic() - started) + 0.01
+    positioner.finish_phi_sweep()
+    assert positioner.phi == positioner.read_phi() == 10.0
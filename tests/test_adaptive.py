@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+import skrf
+
+from pychamber.adaptive import AdaptiveSampling
+from pychamber.experiment import Experiment
+from pychamber.experiment_result import ExperimentResult
+from pychamber.journal import ScanJournal
+
+FREQ = skrf.Frequency(1, 10, 11, "ghz")
+
+
+def pattern(phi):
+    # Flat everywhere but a deep, narrow null at 95 degrees
+    return 1 - 0.999 * np.exp(-(((phi - 95) / 8) ** 2))
+
+
+def measured_result(thetas, phis):
+    result = ExperimentResult(np.asarray(thetas), np.asarray(phis), ["vertical"], FREQ)
+    for theta in result.thetas:
+        for phi in result.phis:
+            s = np.full((len(FREQ), 1, 1), pattern(phi) + 0j)
+            params = {"phi": phi, "theta": theta, "polarization": "vertical", "calibrated": False}
+            result.append(skrf.Network(frequency=FREQ, s=s, params=params))
+    return result
+
+
+def test_refine_adds_angles_where_the_pattern_changes():
+    result = measured_result([0.0], np.arange(0, 181, 20.0))
+    thetas, phis = AdaptiveSampling([1e9], gradient_threshold=0.2, min_step=1.0).refine(result)
+
+    assert len(thetas) == 0
+    assert len(phis) > 0
+    assert all(60 <= phi <= 120 for phi in phis)
+
+
+def test_refine_respects_min_step_and_budget():
+    result = measured_result([0.0, 10.0], np.arange(0, 181, 20.0))
+    adaptive = AdaptiveSampling([1e9], gradient_threshold=0.01, curvature_threshold=0.01)
+    thetas, phis = adaptive.refine(result, budget=5)
+    # Every new phi costs a point at each of the 2 thetas
+    assert len(thetas) * 10 + len(phis) * 2 <= 5
+
+    adaptive.min_step = 15.0
+    assert all(len(angles) == 0 for angles in adaptive.refine(result))
+
+
+@pytest.fixture
+def chamber(mocker):
+    positioner = mocker.Mock()
+    positioner.phi = 0.0
+    positioner.move_phi_absolute.side_effect = lambda phi: setattr(positioner, "phi", phi)
+    positioner.move_absolute.side_effect = lambda phi, theta: setattr(positioner, "phi", phi)
+    analyzer = mocker.Mock()
+    analyzer.ch1.get_sdata.side_effect = lambda a, b: skrf.Network(
+        frequency=FREQ, s=np.full((len(FREQ), 1, 1), pattern(positioner.phi) + 0j)
+    )
+    return analyzer, positioner
+
+
+def test_adaptive_experiment_refines_until_budget(chamber, tmp_path):
+    analyzer, positioner = chamber
+    adaptive = AdaptiveSampling([1e9], gradient_threshold=0.2, min_step=0.5, max_points=30)
+    path = tmp_path / "scan.pcj"
+    phis = np.arange(0, 181, 20.0)
+    experiment = Experiment(
+        analyzer, positioner, np.array([0.0]), phis, [("vertical", 2, 1)], FREQ, journal=path, adaptive=adaptive
+    )
+    result = experiment.run()
+
+    phis = result.phis
+    assert 10 < len(phis) <= 30
+    assert all(result.is_measured(0.0, phi) for phi in phis)
+    steps = np.diff(phis)
+    assert steps.min() < 20.0
+    # The extra points are all around the null
+    assert np.all(steps[(phis[1:] < 60) | (phis[:-1] > 120)] == 20.0)
+    np.testing.assert_allclose(result.get_phi_cut("vertical", 1e9, 0.0).real, pattern(phis))
+
+    # The refined angles aren't in the journal's header, but are still read back
+    np.testing.assert_array_equal(ScanJournal.read(path).phis, phis)
+
+
+def test_adaptive_experiment_stops_when_nothing_to_refine(chamber):
+    analyzer, positioner = chamber
+    adaptive = AdaptiveSampling([1e9], gradient_threshold=1e6)
+    phis = np.arange(0, 181, 20.0)
+    experiment = Experiment(analyzer, positioner, np.array([0.0]), phis, [("vertical", 2, 1)], FREQ, adaptive=adaptive)
+    result = experiment.run()
+
+    np.testing.assert_array_equal(result.phis, phis)
+    assert analyzer.ch1.get_sdata.call_count == len(phis)
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+import skrf
+
+from pychamber.capture import BulkCapture, SDataReader, reader_for
+
+FREQ = skrf.Frequency(1, 10, 11, "ghz")
+
+
+class FakeChannel:
+    """Just enough of a PNA channel to answer the SCPI BulkCapture uses."""
+
+    cnum = 1
+
+    def __init__(self):
+        self.frequency = FREQ
+        self.measurements = {}
+        self.snp_format = "MA"
+        self.n_sweeps = 0
+        self.n_transfers = 0
+        self.complete = True
+
+    def create_measurement(self, name, parameter):
+        self.measurements[name] = parameter
+
+    def delete_measurement(self, name):
+        del self.measurements[name]
+
+    def query(self, cmd):
+        assert cmd == "MMEM:STOR:TRAC:FORM:SNP?"
+        return self.snp_format + "\n"
+
+    def write(self, cmd):
+        assert cmd.startswith("MMEM:STOR:TRACE:FORM:SNP ")
+        self.snp_format = cmd.split()[-1]
+
+    def sweep(self):
+        self.n_sweeps += 1
+        self.complete = False
+
+    def query_values(self, cmd, container):
+        assert self.snp_format == "RI"
+        assert self.complete
+        ports = [int(port) for port in cmd.split("'")[1].split(",")]
+        self.n_transfers += 1
+        rows = [FREQ.f]
+        for a in ports:
+            for b in ports:
+                # S{a}{b} = a + jb, scaled by the sweep number
+                rows += [np.full(len(FREQ), a * self.n_sweeps), np.full(len(FREQ), b * self.n_sweeps)]
+        return container(rows).ravel()
+
+
+class FakePNA:
+    def __init__(self):
+        self.ch1 = FakeChannel()
+        self.query_format = "ascii"
+        self.active_channel = None
+
+    def wait_for_complete(self):
+        self.ch1.complete = True
+
+
+def test_bulk_capture_reads_every_polarization_from_one_sweep():
+    analyzer = FakePNA()
+    polarizations = [("vertical", 2, 1), ("horizontal", 3, 1)]
+    capture = BulkCapture(analyzer, polarizations)
+
+    with capture:
+        # Measurements are set up once, for every parameter between the ports used
+        assert sorted(analyzer.ch1.measurements.values()) == sorted(f"S{a}{b}" for a in (1, 2, 3) for b in (1, 2, 3))
+        for point in range(1, 4):
+            capture.sweep()
+            vertical, horizontal = capture.fetch()
+            np.testing.assert_allclose(vertical.s.ravel(), point * (2 + 1j))
+            np.testing.assert_allclose(horizontal.s.ravel(), point * (3 + 1j))
+            assert vertical.frequency == FREQ
+
+    assert analyzer.ch1.n_sweeps == analyzer.ch1.n_transfers == 3
+    assert analyzer.ch1.measurements == {}
+    assert analyzer.ch1.snp_format == "MA"
+    assert analyzer.query_format == "ascii"
+
+
+def test_bulk_capture_must_be_set_up():
+    with pytest.raises(RuntimeError):
+        BulkCapture(FakePNA(), [("vertical", 2, 1)]).fetch()
+
+
+def test_reader_for_falls_back_to_get_sdata(mocker):
+    analyzer = mocker.Mock()
+    analyzer.ch1.get_sdata.side_effect = lambda a, b: (a, b)
+    reader = reader_for(analyzer, [("vertical", 2, 1), ("horizontal", 3, 1)])
+
+    assert isinstance(reader, SDataReader)
+    reader.setup()
+    reader.sweep()
+    assert reader.fetch() == [(2, 1), (3, 1)]
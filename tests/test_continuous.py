@@ -0,0 +1,98 @@
+import itertools
+import time
+
+import numpy as np
+import pytest
+import skrf
+
+from pychamber.continuous import ContinuousScan, resample
+from pychamber.experiment import Experiment
+from pychamber.plugins.positioners.example.example import ExamplePositioner
+
+FREQ = skrf.Frequency(1, 10, 11, "ghz")
+PHIS = np.arange(0, 21, 2.5)
+
+
+class AngleReader:
+    """Measures the angle of the positioner halfway through each sweep."""
+
+    def __init__(self, positioner, sweep_time=0.01):
+        self.positioner = positioner
+        self.sweep_time = sweep_time
+        self.n_sweeps = 0
+
+    def setup(self):
+        pass
+
+    def teardown(self):
+        pass
+
+    def sweep(self):
+        time.sleep(self.sweep_time / 2)
+        self._phi = self.positioner.read_phi()
+        time.sleep(self.sweep_time / 2)
+        self.n_sweeps += 1
+
+    def fetch(self):
+        return [skrf.Network(frequency=FREQ, s=np.full((len(FREQ), 1, 1), self._phi + 1j))]
+
+
+@pytest.fixture
+def positioner(qtbot):
+    positioner = ExamplePositioner("")
+    positioner.zero_all()
+    yield positioner
+    positioner.zero_all()
+
+
+def test_resample_interpolate():
+    angles = [3.0, 0.0, 1.0, 2.0]
+    values = np.array([[3.0, 30.0], [0.0, 0.0], [1.0, 10.0], [2.0, 20.0]])
+    np.testing.assert_allclose(resample(angles, values, [-1.0, 0.5, 2.25, 5.0]), [[0, 0], [0.5, 5], [2.25, 22.5], [3, 30]])
+
+
+def test_resample_bin():
+    angles = [-0.2, 0.1, 0.9, 1.2, 2.0, 2.4]
+    values = np.arange(6) + 0j
+    np.testing.assert_allclose(resample(angles, values, [2.0, 0.0, 1.0], "bin"), [4.5, 0.5, 2.5])
+
+    with pytest.raises(ValueError):
+        resample(angles, values, [0.0, 1.0, 2.0, 3.0], "bin")
+    with pytest.raises(ValueError):
+        resample(angles, values, [0.0], "nearest")
+
+
+def test_example_positioner_phi_sweep(positioner):
+    positioner.start_phi_sweep(4.0, 40.0)
+    time.sleep(0.05)
+    assert positioner.read_phi() == pytest.approx(2.0, abs=0.5)
+    positioner.finish_phi_sweep()
+    assert positioner.phi == positioner.read_phi() == 4.0
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_continuous_scan_tags_sweeps_with_angle(positioner, reverse):
+    reader = AngleReader(positioner)
+    sweeps = ContinuousScan(positioner, reader).measure_cut(PHIS, reverse=reverse)
+
+    # Stopped at each end, and several sweeps between adjacent points while moving
+    ends = [sweeps[0].phi, sweeps[-1].phi]
+    assert ends == ([20.0, 0.0] if reverse else [0.0, 20.0])
+    assert len(sweeps) > 2 * len(PHIS)
+    assert all(a.end <= b.start for a, b in itertools.pairwise(sweeps))
+    for sweep in sweeps:
+        assert sweep.ntwks[0].s[0, 0, 0].real == pytest.approx(sweep.phi, abs=0.5)
+
+
+def test_continuous_experiment(positioner, mocker):
+    thetas = np.array([0.0, 10.0])
+    experiment = Experiment(
+        mocker.Mock(), positioner, thetas, PHIS, [("vertical", 2, 1)], FREQ, continuous=True, phi_speed=40.0
+    )
+    mocker.patch("pychamber.experiment.reader_for", return_value=AngleReader(positioner))
+    result = experiment.run()
+
+    for theta in thetas:
+        assert all(result.is_measured(theta, phi) for phi in PHIS)
+        cut = result.get_phi_cut("vertical", frequency=FREQ.f[0], theta=theta)
+        np.testing.assert_allclose(np.real(cut).ravel(), PHIS, atol=0.5)
@@ -0,0 +1,88 @@
+import asyncio
+import sys
+import time
+
+import numpy as np
+import pytest
+import skrf
+
+from pychamber.experiment import Experiment
+
+FREQ = skrf.Frequency(1, 10, 11, "ghz")
+THETAS = np.array([0.0, 10.0])
+PHIS = np.arange(0, 50.0, 10.0)
+
+
+@pytest.fixture
+def experiment(mocker):
+    analyzer = mocker.Mock()
+    analyzer.ch1.get_sdata.side_effect = lambda a, b: skrf.Network(frequency=FREQ, s=np.ones((len(FREQ), 1, 1)))
+    positioner = mocker.Mock()
+    positioner.move_phi_absolute.side_effect = lambda phi: time.sleep(0.01)
+    positioner.move_absolute.side_effect = lambda phi, theta: time.sleep(0.01)
+    return Experiment(analyzer, positioner, THETAS, PHIS, [("vertical", 2, 1), ("horizontal", 3, 1)], FREQ)
+
+
+def test_run_async_reports_progress(experiment):
+    updates = []
+    result = asyncio.run(experiment.run_async(progress=updates.append))
+
+    assert all(result.is_measured(theta, phi) for theta in THETAS for phi in PHIS)
+    completed = [update.completed for update in updates if not update.message]
+    assert completed == sorted(completed)
+    assert updates[-1].message  # The timing summary
+    assert updates[-2].completed == updates[-2].total == len(THETAS) * len(PHIS)
+
+
+def test_stream_yields_every_point(experiment):
+    async def collect():
+        return [point async for point in experiment.stream()]
+
+    points = asyncio.run(collect())
+    assert [(point.theta, point.phi) for point in points] == [(theta, phi) for theta in THETAS for phi in PHIS]
+    assert [ntwk.params["polarization"] for ntwk in points[0].ntwks] == ["vertical", "horizontal"]
+
+
+def test_cancelling_stops_after_current_point(experiment):
+    async def cancel_soon():
+        task = asyncio.create_task(experiment.run_async())
+        # Other work keeps running while the experiment does
+        await asyncio.sleep(0.035)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_soon())
+    n_moves = len(experiment._positioner.method_calls)
+    time.sleep(0.05)
+
+    # Nothing moves after the task is cancelled, and the points measured are kept
+    assert len(experiment._positioner.method_calls) == n_moves
+    assert 0 < len(experiment._result) < 2 * len(THETAS) * len(PHIS)
+
+
+def test_breaking_out_of_stream_stops(experiment):
+    async def first_point():
+        async for point in experiment.stream():
+            return point
+
+    point = asyncio.run(first_point())
+    assert (point.theta, point.phi) == (0.0, 0.0)
+    assert len(experiment._positioner.method_calls) < len(THETAS) * len(PHIS)
+
+
+def test_run_without_rich(experiment, monkeypatch):
+    monkeypatch.setitem(sys.modules, "rich", None)
+    result = experiment.run()
+    assert all(result.is_measured(theta, phi) for theta in THETAS for phi in PHIS)
+
+
+def test_run_inside_running_loop(experiment, monkeypatch):
+    monkeypatch.setitem(sys.modules, "rich", None)
+
+    async def notebook_cell():
+        # As in a Jupyter notebook, where an event loop is already running
+        return experiment.run()
+
+    result = asyncio.run(notebook_cell())
+    assert all(result.is_measured(theta, phi) for theta in THETAS for phi in PHIS)
@@ -0,0 +1,87 @@
+import asyncio
+
+import numpy as np
+import pytest
+import skrf
+
+from pychamber.experiment_queue import ExperimentQueue, QueuedExperiment, order_queue
+from pychamber.experiment_result import ExperimentResult
+from pychamber.positioner import AxisMotion
+
+FREQ = skrf.Frequency(1, 10, 11, "ghz")
+POLS = [("vertical", 2, 1)]
+
+
+def queued(thetas, phis, name, frequency=FREQ, **kwargs):
+    return QueuedExperiment(np.array(thetas), np.array(phis), POLS, frequency, name=name, **kwargs)
+
+
+@pytest.fixture
+def analyzer(mocker):
+    analyzer = mocker.Mock()
+    analyzer.ch1.get_sdata.side_effect = lambda a, b: skrf.Network(
+        frequency=analyzer.ch1.frequency, s=np.ones((len(analyzer.ch1.frequency), 1, 1))
+    )
+    return analyzer
+
+
+@pytest.fixture
+def positioner(mocker):
+    positioner = mocker.Mock()
+    positioner.theta = 0.0
+    positioner.phi = 0.0
+    positioner.theta_motion = AxisMotion()
+    positioner.phi_motion = AxisMotion()
+    return positioner
+
+
+def test_endpoints():
+    item = queued([0.0, 10.0], [0.0, 5.0, 10.0], "a")
+    assert item.endpoints() == ((0.0, 0.0), (10.0, 10.0))
+    assert item.endpoints("serpentine") == ((0.0, 0.0), (10.0, 0.0))
+    assert item.endpoints("planned") == item.endpoints()
+
+
+def test_order_queue_starts_near_last_end():
+    far = queued([60.0], [0.0, 90.0], "far")
+    near = queued([0.0], [0.0, 90.0], "near")
+    after_near = queued([0.0], [90.0, 180.0], "after_near")
+
+    order = order_queue([far, after_near, near], start=(0.0, 0.0))
+    assert [item.name for item in order] == ["near", "after_near", "far"]
+    # Without a position, the first experiment given runs first
+    assert [item.name for item in order_queue([far, near, after_near])] == ["far", "after_near", "near"]
+
+
+def test_queue_runs_and_saves_each_experiment(analyzer, positioner, tmp_path):
+    other_freq = skrf.Frequency(2, 3, 5, "ghz")
+    queue = ExperimentQueue(analyzer, positioner, tmp_path / "results")
+    queue.add(queued([90.0], [0.0, 10.0], "far", if_bandwidth=100))
+    queue.add(queued([0.0], [0.0, 10.0], "near", frequency=other_freq))
+    assert len(queue) == 2
+
+    results = queue.run()
+
+    # The near experiment runs first, with its own analyzer settings
+    assert [len(result.frequency) for result in results] == [len(other_freq), len(FREQ)]
+    assert analyzer.ch1.if_bandwidth == 100
+    for result in results:
+        assert all(result.is_measured(theta, phi) for theta in result.thetas for phi in result.phis)
+
+    saved = sorted(path.name for path in (tmp_path / "results").iterdir())
+    assert saved == ["00_near.npz", "01_far.npz"]
+    loaded = ExperimentResult.load(tmp_path / "results" / "01_far.npz")
+    np.testing.assert_array_equal(loaded.thetas, [90.0])
+
+
+def test_queue_run_async_applies_calibration(analyzer, positioner, tmp_path, mocker):
+    apply_calibration = mocker.patch.object(ExperimentResult, "apply_calibration")
+    calibration = mocker.Mock()
+    queue = ExperimentQueue(analyzer, positioner, tmp_path, suffix=".mdif")
+    queue.add(queued([0.0], [0.0, 10.0], "", calibration=calibration))
+
+    results = asyncio.run(queue.run_async())
+
+    apply_calibration.assert_called_once_with(calibration)
+    assert len(results) == 1
+    assert (tmp_path / "00_experiment.mdif").exists()
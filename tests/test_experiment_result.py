@@ -4,7 +4,8 @@ import numpy as np
 import pytest
 import skrf
 
-from pychamber.experiment_result import ExperimentResult
+from pychamber.calibration import Calibration
+from pychamber.experiment_result import ExperimentResult, InvalidFileError
 
 
 def test_experiment_result_creation():
@@ -101,3 +102,348 @@ def test_read_write(example_result, tmpdir):
 
     test_load = ExperimentResult.load(test_path)
     assert test_load.sort(key=lambda x: x.params["azimuth"]) == example_result.sort(key=lambda x: x.params["azimuth"])
+
+
+@pytest.fixture
+def empty_result():
+    f = skrf.Frequency(1, 10, 11, "ghz")
+    return ExperimentResult(np.arange(0, 30.0, 10.0), np.arange(0, 40.0, 10.0), ["vertical", "horizontal"], f)
+
+
+def test_append_fills_cubes(empty_result, make_point):
+    ntwk = make_point(empty_result.frequency, 10.0, 20.0, "vertical", 2 + 1j)
+    empty_result.append(ntwk)
+
+    assert len(empty_result) == 1
+    np.testing.assert_allclose(empty_result.get_over_freq_vals("vertical", 20.0, 10.0), 2 + 1j)
+    assert np.isnan(empty_result.get_over_freq_vals("horizontal", 20.0, 10.0)).all()
+
+
+def test_append_builds_networks_lazily(empty_result, make_point):
+    for phi in empty_result.phis:
+        empty_result.append(make_point(empty_result.frequency, phi, 0.0, "vertical", phi))
+    assert empty_result._ntwk_set_cache is None
+
+    ntwks = list(empty_result)
+    assert [ntwk.params["phi"] for ntwk in ntwks] == list(empty_result.phis)
+    assert empty_result._ntwk_set_cache is not None
+
+    empty_result.append(make_point(empty_result.frequency, 0.0, 10.0, "vertical"))
+    assert empty_result._ntwk_set_cache is None
+    assert len(empty_result.raw_data) == len(empty_result) == len(empty_result.phis) + 1
+
+
+def test_reappending_point_overwrites(empty_result, make_point):
+    empty_result.append(make_point(empty_result.frequency, 0.0, 0.0, "vertical", 1.0))
+    empty_result.append(make_point(empty_result.frequency, 0.0, 0.0, "vertical", 3.0))
+
+    assert len(empty_result) == 1
+    np.testing.assert_allclose(empty_result[0].s.ravel(), 3.0)
+
+
+def test_append_does_not_rebuild_networks(empty_result, mocker, make_point):
+    # How long an append takes is measured by benchmarks/bench_append.py
+    build = mocker.spy(ExperimentResult, "_build_networks")
+    for theta in empty_result.thetas:
+        for phi in empty_result.phis:
+            empty_result.append(make_point(empty_result.frequency, phi, theta, "vertical"))
+
+    build.assert_not_called()
+    assert len(list(empty_result)) == len(empty_result.thetas) * len(empty_result.phis)
+    build.assert_called_once()
+
+
+def test_binary_round_trip(empty_result, tmp_path, make_point):
+    empty_result.append(make_point(empty_result.frequency, 10.0, 20.0, "vertical", 2 + 1j))
+    empty_result.append(make_point(empty_result.frequency, 30.0, 0.0, "horizontal", -1j))
+    path = tmp_path / "result.npz"
+    empty_result.save(path)
+
+    loaded = ExperimentResult.load(path)
+    assert loaded.uuid == empty_result.uuid
+    assert loaded.created == empty_result.created
+    assert loaded.polarizations == empty_result.polarizations
+    assert loaded.frequency == empty_result.frequency
+    assert len(loaded) == len(empty_result)
+    np.testing.assert_allclose(loaded.thetas, empty_result.thetas)
+    np.testing.assert_allclose(loaded.phis, empty_result.phis)
+    for pol in empty_result.polarizations:
+        np.testing.assert_array_equal(loaded.get_3d_data(pol, 1e9), empty_result.get_3d_data(pol, 1e9))
+    assert [n.params for n in loaded] == [n.params for n in empty_result]
+
+
+def test_binary_load_is_memory_mapped(empty_result, tmp_path, make_point):
+    path = tmp_path / "result.npz"
+    empty_result.save(path)
+
+    loaded = ExperimentResult.load(path)
+    assert isinstance(loaded._s_data["vertical"], np.memmap)
+
+    # Appending to a loaded result must not modify the file
+    loaded.append(make_point(loaded.frequency, 0.0, 0.0, "vertical", 5.0))
+    np.testing.assert_allclose(loaded.get_over_freq_vals("vertical", 0.0, 0.0), 5.0)
+    assert np.isnan(ExperimentResult.load(path).get_over_freq_vals("vertical", 0.0, 0.0)).all()
+
+
+def test_binary_file_is_a_numpy_archive(empty_result, tmp_path):
+    path = tmp_path / "result.npz"
+    empty_result.save(path)
+
+    with np.load(path) as archive:
+        np.testing.assert_allclose(archive["thetas"], empty_result.thetas)
+        assert archive["s_data_0"].shape == (len(empty_result.f), len(empty_result.phis), len(empty_result.thetas))
+
+
+def test_load_invalid_binary_raises(tmp_path):
+    path = tmp_path / "result.npz"
+    path.write_bytes(b"not a zip file")
+    with pytest.raises(InvalidFileError):
+        ExperimentResult.load(path)
+
+
+@pytest.fixture
+def filled_result(empty_result):
+    rng = np.random.default_rng(0)
+    for pol in empty_result.polarizations:
+        for theta in empty_result.thetas:
+            for phi in empty_result.phis[:-1]:
+                s = rng.normal(size=(len(empty_result.f), 1, 1)) + 1j * rng.normal(size=(len(empty_result.f), 1, 1))
+                params = {"phi": phi, "theta": theta, "polarization": pol, "calibrated": False}
+                empty_result.append(skrf.Network(frequency=empty_result.frequency, s=s, params=params))
+    return empty_result
+
+
+def test_mdif_output_matches_skrf(filled_result, tmp_path):
+    path = tmp_path / "result.mdif"
+    skrf_path = tmp_path / "skrf.mdif"
+    filled_result.save(path)
+    filled_result._ntwk_set.write_mdif(
+        skrf_path, comments=[f"created={filled_result.created}@", f"uuid={filled_result.uuid}@"]
+    )
+
+    assert path.read_text() == skrf_path.read_text()
+
+
+def test_mdif_round_trip(filled_result, tmp_path):
+    path = tmp_path / "result.mdif"
+    filled_result.save(path)
+
+    loaded = ExperimentResult.load(path)
+    assert loaded.uuid == filled_result.uuid
+    assert loaded.created == filled_result.created
+    assert loaded.polarizations == filled_result.polarizations
+    assert loaded.frequency == filled_result.frequency
+    assert len(loaded) == len(filled_result)
+    np.testing.assert_array_equal(loaded.thetas, filled_result.thetas)
+    np.testing.assert_array_equal(loaded.phis, filled_result.phis[:-1])
+    for pol in filled_result.polarizations:
+        np.testing.assert_array_equal(loaded.get_3d_data(pol, 1e9), filled_result.get_3d_data(pol, 1e9)[:-1])
+    assert [n.params for n in loaded] == [n.params for n in filled_result]
+
+
+def test_mdif_fast_path_matches_skrf_reader(filled_result, tmp_path):
+    path = tmp_path / "result.mdif"
+    filled_result._ntwk_set.write_mdif(path, comments=[f"created={filled_result.created}@", f"uuid={filled_result.uuid}@"])
+
+    fast = ExperimentResult._load_mdif(path)
+    slow = ExperimentResult._load_mdif_networks(path)
+    assert fast.uuid == slow.uuid
+    assert sorted(fast.polarizations) == sorted(slow.polarizations)
+    for pol in fast.polarizations:
+        np.testing.assert_array_equal(fast.get_3d_data(pol, 5.5e9), slow.get_3d_data(pol, 5.5e9))
+        np.testing.assert_array_equal(fast._fill_order[pol] >= 0, slow._fill_order[pol] >= 0)
+
+
+def test_indices_for_matches_nearest(empty_result):
+    rng = np.random.default_rng(0)
+    thetas = rng.uniform(-10, 40, size=50)
+    phis = rng.uniform(-10, 50, size=(5, 10))
+    freqs = rng.uniform(0, 11e9, size=50)
+
+    theta_idx, phi_idx, f_idx = empty_result.indices_for(thetas, phis, freqs)
+    assert phi_idx.shape == phis.shape
+    np.testing.assert_array_equal(theta_idx, [np.argmin(np.abs(empty_result.thetas - t)) for t in thetas])
+    np.testing.assert_array_equal(phi_idx.ravel(), [np.argmin(np.abs(empty_result.phis - p)) for p in phis.ravel()])
+    np.testing.assert_array_equal(f_idx, [np.argmin(np.abs(empty_result.f - f)) for f in freqs])
+
+    # Ties go to the lower value, and single values give scalars
+    assert empty_result.indices_for(thetas=5.0)[0] == 0
+    assert empty_result.indices_for(phis=None)[1] is None
+
+
+def test_append_ignores_unknown_angles(empty_result, make_point):
+    empty_result.append(make_point(empty_result.frequency, 5.0, 0.0, "vertical"))
+    assert len(empty_result) == 0
+    assert not empty_result.is_measured(0.0, 5.0)
+
+
+def test_derived_quantities_are_cached(filled_result):
+    cut = filled_result.get_theta_cut("vertical", 1e9, 10.0, quantity="db")
+    np.testing.assert_allclose(cut, 20 * np.log10(np.abs(filled_result.get_theta_cut("vertical", 1e9, 10.0))))
+    assert filled_result.get_theta_cut("vertical", 1e9, 10.0, quantity="db") is cut
+    assert not cut.flags.writeable
+
+    with pytest.raises(KeyError):
+        filled_result.get_3d_data("vertical", 1e9, quantity="not a quantity")
+
+
+def test_append_only_invalidates_touched_slices(filled_result, make_point):
+    theta_cut = filled_result.get_theta_cut("vertical", 1e9, 10.0, quantity="magnitude")
+    other_theta_cut = filled_result.get_theta_cut("vertical", 1e9, 20.0, quantity="magnitude")
+    other_pol = filled_result.get_theta_cut("horizontal", 1e9, 10.0, quantity="magnitude")
+    over_freq = filled_result.get_over_freq_vals("vertical", 0.0, 10.0, quantity="phase")
+    three_d = filled_result.get_3d_data("vertical", 1e9, quantity="db")
+
+    filled_result.append(make_point(filled_result.frequency, 10.0, 0.0, "vertical", 5.0))
+
+    assert filled_result.get_theta_cut("vertical", 1e9, 20.0, quantity="magnitude") is other_theta_cut
+    assert filled_result.get_theta_cut("horizontal", 1e9, 10.0, quantity="magnitude") is other_pol
+    new_theta_cut = filled_result.get_theta_cut("vertical", 1e9, 10.0, quantity="magnitude")
+    assert new_theta_cut is not theta_cut
+    assert new_theta_cut[0] == 5.0
+    assert filled_result.get_over_freq_vals("vertical", 0.0, 10.0, quantity="phase") is not over_freq
+    assert filled_result.get_3d_data("vertical", 1e9, quantity="db") is not three_d
+
+
+def test_apply_calibration_divides_every_point(filled_result):
+    cal_f = skrf.Frequency(1, 10, 4, "ghz")
+    cal = Calibration(
+        [
+            skrf.Network(frequency=cal_f, s=np.full((4, 1, 1), 2.0 + 0j), name=pol, params={"polarization": pol})
+            for pol in filled_result.polarizations
+        ]
+    )
+    filled_result.apply_calibration(cal)
+
+    assert filled_result.has_calibrated_data
+    assert len(filled_result.calibrated_data) == len(filled_result.raw_data)
+    for pol in filled_result.polarizations:
+        np.testing.assert_allclose(
+            filled_result.get_3d_data(pol, 5.5e9, calibrated=True), filled_result.get_3d_data(pol, 5.5e9) / 2
+        )
+    # Calibrated points come after the raw ones, in the same order
+    raw = [(n.params["polarization"], n.params["phi"], n.params["theta"]) for n in filled_result.raw_data]
+    caled = [(n.params["polarization"], n.params["phi"], n.params["theta"]) for n in filled_result.calibrated_data]
+    assert caled == raw
+
+
+def test_calibration_interpolation_is_cached(filled_result, make_point):
+    cal = Calibration(
+        [
+            skrf.Network(frequency=filled_result.frequency, s=np.full((11, 1, 1), 2j), params={"polarization": "vertical"})
+        ]
+    )
+    first = cal.get_interpolated("vertical", filled_result.frequency)
+    assert cal.get_interpolated("vertical", filled_result.frequency) is first
+
+    filled_result.append(make_point(filled_result.frequency, 0.0, 0.0, "vertical", 4.0), calibration=cal)
+    np.testing.assert_allclose(filled_result.get_over_freq_vals("vertical", 0.0, 0.0, calibrated=True), -2j)
+
+
+def test_append_with_calibration_iterates_raw_first(empty_result, make_point):
+    s = np.full((11, 1, 1), 2.0 + 0j)
+    cal = Calibration([skrf.Network(frequency=empty_result.frequency, s=s, params={"polarization": "vertical"})])
+    for phi in (0.0, 10.0):
+        empty_result.append(make_point(empty_result.frequency, phi, 0.0, "vertical"), calibration=cal)
+
+    # Each point's raw data comes before its calibrated data
+    order = [(ntwk.params["phi"], ntwk.params["calibrated"]) for ntwk in empty_result]
+    assert order == [(0.0, False), (0.0, True), (10.0, False), (10.0, True)]
+    assert not empty_result[0].params["calibrated"]
+
+
+def test_append_many_emits_dirty_regions_once(empty_result, make_point):
+    emitted = []
+    empty_result.dataAppended.connect(emitted.append)
+
+    empty_result.append_many(
+        [
+            make_point(empty_result.frequency, 10.0, 20.0, "vertical"),
+            make_point(empty_result.frequency, 30.0, 0.0, "horizontal"),
+        ]
+    )
+
+    assert len(empty_result) == 2
+    assert len(emitted) == 1
+    dirty = emitted[0]
+    assert dirty.intersects("vertical", phi_idx=1)
+    assert dirty.intersects("vertical", theta_idx=2)
+    assert dirty.intersects("vertical", phi_idx=1, theta_idx=2)
+    assert not dirty.intersects("vertical", phi_idx=3)
+    assert not dirty.intersects("vertical", calibrated=True)
+    assert dirty.intersects("horizontal", phi_idx=3, theta_idx=0)
+    np.testing.assert_array_equal(dirty.points("horizontal")[0], [3])
+
+
+def test_data_appended_is_coalesced(qtbot, empty_result, make_point):
+    emitted = []
+    empty_result.dataAppended.connect(emitted.append)
+    empty_result.notify_interval = 50
+
+    for phi in empty_result.phis:
+        empty_result.append(make_point(empty_result.frequency, phi, 0.0, "vertical"))
+    assert emitted == []
+
+    qtbot.waitUntil(lambda: len(emitted) == 1)
+    np.testing.assert_array_equal(emitted[0].points("vertical")[0], np.arange(len(empty_result.phis)))
+
+
+@pytest.mark.parametrize(
+    "dtype, max_db_error, max_phase_error", [("complex64", 1e-4, 1e-3), ("magphase16", 5e-3, 3e-3)]
+)
+@pytest.mark.parametrize("scratch", [False, True])
+def test_reduced_precision_error_is_bounded(tmp_path, dtype, max_db_error, max_phase_error, scratch):
+    f = skrf.Frequency(1, 10, 101, "ghz")
+    thetas, phis = np.arange(0, 30.0, 10.0), np.arange(0, 40.0, 10.0)
+    result = ExperimentResult(thetas, phis, ["vertical"], f, dtype=dtype, scratch_dir=tmp_path if scratch else None)
+    assert result.dtype == dtype
+
+    rng = np.random.default_rng(0)
+    # Magnitudes from -120 dB to +20 dB, with any phase
+    s = 10 ** rng.uniform(-6, 1, size=len(f)) * np.exp(1j * rng.uniform(-np.pi, np.pi, size=len(f)))
+    params = {"phi": 10.0, "theta": 20.0, "polarization": "vertical", "calibrated": False}
+    result.append(skrf.Network(frequency=f, s=s.reshape((-1, 1, 1)), params=params))
+
+    stored = result.get_over_freq_vals("vertical", 20.0, 10.0)
+    assert stored.dtype == np.complex64
+    db_error = np.abs(20 * np.log10(np.abs(stored)) - 20 * np.log10(np.abs(s)))
+    phase_error = np.abs(np.angle(stored / s, deg=True))
+    assert db_error.max() <= max_db_error
+    assert phase_error.max() <= max_phase_error
+    assert np.isnan(result.get_over_freq_vals("vertical", 0.0, 0.0)).all()
+
+    path = tmp_path / "result.npz"
+    result.save(path)
+    loaded = ExperimentResult.load(path)
+    assert loaded.dtype == dtype
+    np.testing.assert_array_equal(loaded.get_over_freq_vals("vertical", 20.0, 10.0), stored)
+
+
+def test_unknown_dtype_raises():
+    with pytest.raises(ValueError):
+        ExperimentResult(np.array([0.0]), np.array([0.0]), ["vertical"], skrf.Frequency(1, 10, 11, "ghz"), dtype="int8")
+
+
+@pytest.mark.parametrize("dtype", ["complex128", "magphase16"])
+@pytest.mark.parametrize("scratch", [False, True])
+def test_insert_angles_keeps_data(tmp_path, dtype, scratch, make_point):
+    f = skrf.Frequency(1, 10, 11, "ghz")
+    thetas, phis = np.array([0.0, 20.0]), np.array([0.0, 10.0])
+    result = ExperimentResult(thetas, phis, ["vertical"], f, dtype=dtype, scratch_dir=tmp_path if scratch else None)
+    for theta in result.thetas:
+        for phi in result.phis:
+            result.append(make_point(f, phi, theta, "vertical", phi + 1j * theta + 1))
+    before = result.get_3d_data("vertical", 1e9)
+
+    result.insert_angles(thetas=[10.0, 20.0], phis=[-5.0, 2.5])
+
+    np.testing.assert_array_equal(result.thetas, [0.0, 10.0, 20.0])
+    np.testing.assert_array_equal(result.phis, [-5.0, 0.0, 2.5, 10.0])
+    np.testing.assert_array_equal(result.get_3d_data("vertical", 1e9)[np.ix_([1, 3], [0, 2])], before)
+    assert not result.is_measured(10.0, 0.0)
+    assert not result.is_measured(0.0, 2.5)
+    assert len(result) == 4
+
+    result.append(make_point(f, 2.5, 10.0, "vertical", 5.0))
+    assert result.is_measured(10.0, 2.5)
+    assert [ntwk.params["phi"] for ntwk in result][-1] == 2.5
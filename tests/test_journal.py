@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+import pytest
+import skrf
+
+from pychamber.experiment import Experiment
+from pychamber.experiment_result import ExperimentResult
+from pychamber.journal import JournalError, ScanJournal
+
+POLARIZATIONS = [("vertical", 2, 1), ("horizontal", 3, 1)]
+
+
+@pytest.fixture
+def result():
+    f = skrf.Frequency(1, 10, 11, "ghz")
+    return ExperimentResult(np.arange(0, 30.0, 10.0), np.arange(0, 40.0, 10.0), [p[0] for p in POLARIZATIONS], f)
+
+
+def test_journal_round_trip(result, tmp_path, make_point):
+    path = tmp_path / "scan.pcj"
+    journal = ScanJournal.create(path, result, POLARIZATIONS)
+    for phi in result.phis:
+        journal.append(make_point(result.frequency, phi, 10.0, "vertical"))
+    journal.close()
+
+    loaded = ScanJournal.read(path)
+    assert loaded.uuid == result.uuid
+    assert loaded.created == result.created
+    assert len(loaded) == len(result.phis)
+    np.testing.assert_allclose(loaded.get_phi_cut("vertical", 1e9, 10.0), result.phis + 10j)
+    assert np.isnan(loaded.get_phi_cut("horizontal", 1e9, 10.0)).all()
+
+
+def test_journal_discards_torn_record(result, tmp_path, make_point):
+    path = tmp_path / "scan.pcj"
+    journal = ScanJournal.create(path, result, POLARIZATIONS)
+    journal.append(make_point(result.frequency, 0.0, 0.0, "vertical"))
+    journal.append(make_point(result.frequency, 10.0, 0.0, "vertical"))
+    journal.close()
+
+    # Simulate a crash partway through writing the last record
+    data = path.read_bytes()
+    path.write_bytes(data[:-20])
+
+    journal, loaded = ScanJournal.resume(path)
+    assert len(loaded) == 1
+    journal.append(make_point(result.frequency, 20.0, 0.0, "vertical"))
+    journal.close()
+
+    assert len(ScanJournal.read(path)) == 2
+
+
+def test_journal_keeps_calibrated_data_separate(result, tmp_path, make_point):
+    path = tmp_path / "scan.pcj"
+    journal = ScanJournal.create(path, result, POLARIZATIONS)
+    journal.append(make_point(result.frequency, 10.0, 10.0, "vertical"))
+    caled = make_point(result.frequency, 10.0, 10.0, "vertical")
+    caled.s = caled.s / 2
+    caled.params["calibrated"] = True
+    journal.append(caled)
+    journal.close()
+
+    loaded = ScanJournal.read(path)
+    assert loaded.get_phi_cut("vertical", 1e9, 10.0)[1] == 10 + 10j
+    assert loaded.get_phi_cut("vertical", 1e9, 10.0, calibrated=True)[1] == 5 + 5j
+
+
+@pytest.mark.skipif(not os.path.exists("/dev/full"), reason="Needs /dev/full to simulate a full disk")
+def test_write_errors_are_raised(result, tmp_path, make_point):
+    created = ScanJournal.create(tmp_path / "scan.pcj", result, POLARIZATIONS)
+    created.close()
+    # Every write to /dev/full fails as if the disk were full
+    journal = ScanJournal("/dev/full", created.header)
+    journal.append(make_point(result.frequency, 0.0, 10.0, "vertical"))
+    journal._writer.join(timeout=5)
+    with pytest.raises(OSError):
+        journal.append(make_point(result.frequency, 10.0, 10.0, "vertical"))
+    with pytest.raises(OSError):
+        journal.close()
+
+
+def test_read_invalid_journal_raises(tmp_path):
+    path = tmp_path / "scan.pcj"
+    path.write_bytes(b"not a journal")
+    with pytest.raises(JournalError):
+        ScanJournal.read(path)
+
+
+def test_experiment_resume_skips_measured_points(result, tmp_path, mocker, make_point):
+    path = tmp_path / "scan.pcj"
+    journal = ScanJournal.create(path, result, POLARIZATIONS)
+    for phi in result.phis:
+        for pol, _, _ in POLARIZATIONS:
+            journal.append(make_point(result.frequency, phi, 0.0, pol))
+    journal.append(make_point(result.frequency, 0.0, 10.0, "vertical"))
+    journal.close()
+
+    analyzer = mocker.Mock()
+    analyzer.ch1.get_sdata.side_effect = lambda a, b: skrf.Network(
+        frequency=result.frequency, s=np.ones((len(result.f), 1, 1))
+    )
+    positioner = mocker.Mock()
+
+    experiment = Experiment.resume(analyzer, positioner, path)
+    resumed = experiment.run()
+
+    # theta=0 was complete, and (theta=10, phi=0) was missing only one polarization
+    n_points = len(result.thetas) * len(result.phis)
+    assert analyzer.ch1.get_sdata.call_count == (n_points - len(result.phis)) * len(POLARIZATIONS)
+    # Each row starts with a move of both axes, back to phi=0
+    positioner.move_absolute.assert_has_calls([mocker.call(0.0, 10.0), mocker.call(0.0, 20.0)])
+    assert all(resumed.is_measured(theta, phi) for theta in result.thetas for phi in result.phis)
+    assert len(ScanJournal.read(path)) == n_points * len(POLARIZATIONS)
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+from pychamber.plugins.positioners.example.example import ExamplePositioner
+from pychamber.positioner import MotionCancelledError, MotionFuture, Positioner, PositionerLimitException
+
+
+@pytest.fixture
+def positioner(qtbot):
+    positioner = ExamplePositioner("")
+    positioner.zero_all()
+    yield positioner
+    positioner.zero_all()
+
+
+def test_future_done_and_callbacks():
+    future = MotionFuture()
+    calls = []
+    future.add_done_callback(calls.append)
+    assert not future.done()
+    with pytest.raises(TimeoutError):
+        future.wait(timeout=0.01)
+
+    threading.Timer(0.01, future.set_done).start()
+    future.wait(timeout=1)
+    assert future.done() and not future.cancelled()
+    assert calls == [future]
+
+    # Callbacks added after the move is done are called straight away, and it
+    # can't be finished twice
+    future.add_done_callback(calls.append)
+    assert calls == [future, future]
+    assert not future.set_exception(RuntimeError())
+    assert not future.cancel()
+
+
+def test_future_exception():
+    future = MotionFuture.run_in_thread(lambda: (_ for _ in ()).throw(PositionerLimitException("Home limit")))
+    with pytest.raises(PositionerLimitException):
+        future.wait(timeout=1)
+
+
+def test_future_cancel():
+    assert not MotionFuture().cancel()
+
+    stopped = threading.Event()
+    future = MotionFuture(cancel=stopped.set)
+    assert future.cancel()
+    assert stopped.is_set() and future.cancelled()
+    with pytest.raises(MotionCancelledError):
+        future.wait()
+    # Finishing after a cancel does nothing
+    assert not future.set_done()
+
+
+def test_default_start_move_runs_blocking_move(mocker):
+    positioner = Positioner()
+    move = mocker.patch.object(Positioner, "move_phi_absolute", side_effect=lambda phi: time.sleep(0.02))
+    future = positioner.start_move_phi_absolute(10.0)
+    assert not future.done()
+    future.wait(timeout=1)
+    move.assert_called_once_with(10.0)
+
+
+def test_example_start_move(positioner):
+    started = time.monotonic()
+    future = positioner.start_move_phi_absolute(4.0)
+    assert positioner.phi == 0.0
+    future.wait(timeout=1)
+    assert time.monotonic() - started >= 4.0 * positioner._msecs_per_deg / 1000
+    assert positioner.phi == 4.0
+
+    # Both axes can move at once
+    theta = positioner.start_move_theta_absolute(-4.0)
+    phi = positioner.start_move_phi_absolute(0.0)
+    theta.wait(timeout=1)
+    phi.wait(timeout=1)
+    assert (positioner.theta, positioner.phi) == (-4.0, 0.0)
+
+
+def test_example_move_absolute_moves_both_axes_at_once(positioner):
+    started = time.monotonic()
+    positioner.move_absolute(4.0, -4.0)
+    assert time.monotonic() - started < 2 * 4.0 * positioner._msecs_per_deg / 1000
+    assert (positioner.phi, positioner.theta) == (4.0, -4.0)
+
+
+def test_example_cancel_stops_part_way(positioner):
+    future = positioner.start_move_phi_absolute(10.0)
+    time.sleep(0.1)
+    assert future.cancel()
+    assert 0.0 < positioner.phi < 10.0
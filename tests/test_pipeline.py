@@ -0,0 +1,78 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+import skrf
+
+from pychamber.experiment import Experiment
+from pychamber.pipeline import AcquisitionPipeline
+
+POINTS = [(0.0, float(phi)) for phi in range(6)]
+
+
+class SlowReader:
+    def __init__(self, sweep_time=0.0, fetch_time=0.0):
+        self.sweep_time = sweep_time
+        self.fetch_time = fetch_time
+        self.busy = threading.Lock()
+        self.n_sweeps = 0
+
+    def sweep(self):
+        assert self.busy.acquire(blocking=False), "VNA used by both stages at once"
+        time.sleep(self.sweep_time)
+        self.n_sweeps += 1
+        self.busy.release()
+
+    def fetch(self):
+        assert self.busy.acquire(blocking=False), "VNA used by both stages at once"
+        time.sleep(self.fetch_time)
+        self.busy.release()
+        return [self.n_sweeps]
+
+
+def test_pipeline_overlaps_transfer_with_moves():
+    reader = SlowReader(fetch_time=0.05)
+    recorded = []
+
+    start = time.perf_counter()
+    AcquisitionPipeline(lambda theta, phi: time.sleep(0.05), reader, lambda *point: recorded.append(point)).run(POINTS)
+    elapsed = time.perf_counter() - start
+
+    assert recorded == [(theta, phi, [i + 1]) for i, (theta, phi) in enumerate(POINTS)]
+    # Serially this would take 0.6 s
+    assert elapsed < 0.5
+
+
+def test_pipeline_reraises_transfer_errors():
+    def record(theta, phi, ntwks):
+        if phi == 2.0:
+            raise RuntimeError("append failed")
+
+    moves = []
+    with pytest.raises(RuntimeError, match="append failed"):
+        AcquisitionPipeline(lambda theta, phi: moves.append(phi), SlowReader(), record).run(POINTS)
+    assert len(moves) < len(POINTS)
+
+
+def test_pipeline_stops_when_asked():
+    recorded = []
+    AcquisitionPipeline(lambda *point: None, SlowReader(), lambda *point: recorded.append(point)).run(
+        POINTS, should_stop=lambda: len(recorded) >= 2
+    )
+    assert 2 <= len(recorded) < len(POINTS)
+
+
+def test_pipelined_experiment_measures_every_point(mocker):
+    f = skrf.Frequency(1, 10, 11, "ghz")
+    analyzer = mocker.Mock()
+    analyzer.ch1.get_sdata.side_effect = lambda a, b: skrf.Network(frequency=f, s=np.full((len(f), 1, 1), a + 1j * b))
+    positioner = mocker.Mock()
+    thetas, phis = np.arange(0, 30.0, 10.0), np.arange(0, 40.0, 10.0)
+    polarizations = [("vertical", 2, 1), ("horizontal", 3, 1)]
+
+    result = Experiment(analyzer, positioner, thetas, phis, polarizations, f, pipelined=True).run()
+
+    assert len(result) == len(thetas) * len(phis) * len(polarizations)
+    np.testing.assert_allclose(result.get_3d_data("vertical", 1e9), 2 + 1j)
+    np.testing.assert_allclose(result.get_3d_data("horizontal", 1e9), 3 + 1j)
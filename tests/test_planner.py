@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+import skrf
+
+from pychamber.experiment import Experiment
+from pychamber.planner import ScanPlan, plan_scan, route_time
+from pychamber.positioner import AxisMotion
+from pychamber.scan import scan_rows
+
+THETAS = np.arange(-90, 91, 15.0)
+PHIS = np.arange(-180, 181, 30.0)
+
+
+def test_move_time():
+    axis = AxisMotion(speed=10.0, acceleration=20.0, settle=0.5)
+    # Short moves never reach top speed, long ones cruise at it
+    assert axis.move_time(0.0) == 0.0
+    assert axis.move_time(1.25) == pytest.approx(2 * np.sqrt(1.25 / 20) + 0.5)
+    assert axis.move_time(-30.0) == pytest.approx(3.0 + 0.5 + 0.5)
+    np.testing.assert_allclose(AxisMotion(speed=4.0).move_time([0.0, 8.0]), [0.0, 2.0])
+
+
+def test_route_time_moves_both_axes_at_once():
+    theta_axis = AxisMotion(speed=2.0)
+    phi_axis = AxisMotion(speed=10.0)
+    # A diagonal move takes as long as the slower axis
+    assert route_time([(10.0, 30.0)], theta_axis, phi_axis, start=(0.0, 0.0)) == pytest.approx(5.0)
+    assert route_time([(0.0, 30.0), (2.0, 30.0)], theta_axis, phi_axis, start=(0.0, 0.0)) == pytest.approx(4.0)
+
+
+def test_plan_visits_every_point_once_and_is_faster():
+    points = [point for row in scan_rows(THETAS, PHIS) for point in row]
+    theta_axis = AxisMotion(speed=2.0, acceleration=4.0, settle=1.0)
+    phi_axis = AxisMotion(speed=20.0, acceleration=40.0, settle=0.2)
+    plan = plan_scan(points, theta_axis, phi_axis, start=(0.0, 0.0))
+
+    assert sorted(plan.points) == sorted(points)
+    assert plan.naive_time == pytest.approx(route_time(points, theta_axis, phi_axis, start=(0.0, 0.0)))
+    assert plan.estimated_time == pytest.approx(route_time(plan.points, theta_axis, phi_axis, start=(0.0, 0.0)))
+    serpentine = [point for row in scan_rows(THETAS, PHIS, "serpentine") for point in row]
+    assert plan.estimated_time <= route_time(serpentine, theta_axis, phi_axis, start=(0.0, 0.0))
+    assert plan.time_saved > 0
+
+
+def test_plan_searches_scattered_points():
+    rng = np.random.default_rng(0)
+    points = [tuple(point) for point in rng.uniform(-90, 90, size=(200, 2))]
+    plan = plan_scan(points)
+
+    assert sorted(plan.points) == sorted(points)
+    assert plan.estimated_time < plan.naive_time / 3
+
+
+def test_plan_rows():
+    plan = ScanPlan(points=[(0, 0), (0, 10), (10, 10), (20, 10), (20, 0), (30, 5)], estimated_time=0, naive_time=0)
+    assert plan.rows() == [[(0, 0), (0, 10)], [(10, 10), (20, 10)], [(20, 0)], [(30, 5)]]
+
+
+def test_experiment_runs_plan(mocker):
+    f = skrf.Frequency(1, 10, 11, "ghz")
+    analyzer = mocker.Mock()
+    analyzer.ch1.get_sdata.side_effect = lambda a, b: skrf.Network(frequency=f, s=np.ones((len(f), 1, 1)))
+    positioner = mocker.Mock()
+    positioner.theta = 0.0
+    positioner.phi = 0.0
+    positioner.theta_motion = AxisMotion(speed=2.0)
+    positioner.phi_motion = AxisMotion(speed=20.0)
+
+    experiment = Experiment(analyzer, positioner, THETAS, PHIS, [("vertical", 2, 1)], f, scan_order="planned")
+    result = experiment.run()
+
+    assert all(result.is_measured(theta, phi) for theta in THETAS for phi in PHIS)
+    # Theta moves once per row, on its own or with phi
+    assert positioner.move_theta_absolute.call_count + positioner.move_absolute.call_count == len(THETAS)
+
+
+def test_unknown_experiment_scan_order_raises(mocker):
+    with pytest.raises(ValueError):
+        Experiment(mocker.Mock(), mocker.Mock(), THETAS, PHIS, [], skrf.Frequency(1, 10, 11, "ghz"), scan_order="bad")
@@ -0,0 +1,53 @@
+import configparser
+import time
+
+import pytest
+from qtpy.QtCore import QSettings
+
+from pychamber.positioner import PositionStore
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return QSettings(str(tmp_path / "settings.ini"), QSettings.IniFormat)
+
+
+def saved(settings):
+    # What's actually on disk
+    parser = configparser.ConfigParser()
+    parser.read(settings.fileName())
+    general = parser["General"] if parser.has_section("General") else {}
+    return tuple(float(general[key]) if key in general else None for key in ("test_phi", "test_theta"))
+
+
+def test_starts_from_saved_position(settings):
+    store = PositionStore("test", settings=settings)
+    assert (store.phi, store.theta) == (0.0, 0.0)
+
+    settings.setValue("test_phi", 10.0)
+    settings.setValue("test_theta", -5.0)
+    store = PositionStore("test", settings=settings)
+    assert (store.phi, store.theta) == (10.0, -5.0)
+
+
+def test_updates_are_coalesced(settings):
+    store = PositionStore("test", interval=0.1, settings=settings)
+    for phi in range(100):
+        store.set(phi=phi)
+    store.set(theta=3.0)
+    assert (store.phi, store.theta) == (99.0, 3.0)
+    assert saved(settings) == (None, None)
+
+    time.sleep(0.3)
+    assert saved(settings) == (99.0, 3.0)
+
+
+def test_flush_and_close(settings):
+    store = PositionStore("test", interval=60, settings=settings)
+    store.set(phi=1.0, theta=2.0)
+    store.flush()
+    assert saved(settings) == (1.0, 2.0)
+
+    store.set(phi=4.0)
+    store.close()
+    assert saved(settings) == (4.0, 2.0)
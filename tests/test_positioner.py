@@ -29,3 +29,14 @@ def test_factory_connect(mocker):
 
     print(positioner.available_models())
     mock_positioner_model.assert_called_once_with(address="COM0")
+
+
+def test_move_absolute_falls_back_to_one_axis_at_a_time(mocker):
+    calls = mocker.Mock()
+    mocker.patch.object(positioner.Positioner, "phi", new_callable=mocker.PropertyMock, return_value=10.0)
+    mocker.patch.object(positioner.Positioner, "theta", new_callable=mocker.PropertyMock, return_value=-5.0)
+    mocker.patch.object(positioner.Positioner, "move_phi_absolute", calls.phi)
+    mocker.patch.object(positioner.Positioner, "move_theta_absolute", calls.theta)
+
+    positioner.Positioner().move_relative(20.0, 5.0)
+    assert calls.mock_calls == [mocker.call.theta(0.0), mocker.call.phi(30.0)]
@@ -0,0 +1,57 @@
+import itertools
+
+import numpy as np
+import pytest
+import skrf
+
+from pychamber.experiment import Experiment
+from pychamber.scan import SCAN_ORDERS, scan_rows
+
+THETAS = np.arange(-90, 91, 30.0)
+PHIS = np.arange(-180, 181, 60.0)
+
+
+def inner_travel(rows, axis):
+    positions = [point[axis] for row in rows for point in row]
+    return sum(abs(b - a) for a, b in itertools.pairwise(positions))
+
+
+@pytest.mark.parametrize("order", SCAN_ORDERS)
+def test_scan_rows_visit_every_point_once(order):
+    rows = scan_rows(THETAS, PHIS, order)
+    points = [point for row in rows for point in row]
+    assert sorted(points) == sorted((theta, phi) for theta in THETAS for phi in PHIS)
+
+
+def test_serpentine_alternates_direction():
+    rows = scan_rows(THETAS, PHIS, "serpentine")
+    assert [theta for theta, _ in rows[1]] == [THETAS[1]] * len(PHIS)
+    assert [phi for _, phi in rows[0]] == list(PHIS)
+    assert [phi for _, phi in rows[1]] == list(PHIS[::-1])
+    assert inner_travel(rows, 1) < inner_travel(scan_rows(THETAS, PHIS, "raster"), 1)
+
+    rows = scan_rows(THETAS, PHIS, "serpentine_theta")
+    assert [phi for _, phi in rows[1]] == [PHIS[1]] * len(THETAS)
+    assert [theta for theta, _ in rows[1]] == list(THETAS[::-1])
+
+
+def test_unknown_scan_order_raises():
+    with pytest.raises(ValueError):
+        scan_rows(THETAS, PHIS, "spiral")
+
+
+def test_experiment_runs_in_scan_order(mocker):
+    f = skrf.Frequency(1, 10, 11, "ghz")
+    analyzer = mocker.Mock()
+    analyzer.ch1.get_sdata.side_effect = lambda a, b: skrf.Network(frequency=f, s=np.ones((len(f), 1, 1)))
+    positioner = mocker.Mock()
+
+    experiment = Experiment(analyzer, positioner, THETAS, PHIS, [("vertical", 2, 1)], f, scan_order="serpentine")
+    result = experiment.run()
+
+    # Each axis is only moved when its position changes, and both at once to the first point
+    positioner.move_absolute.assert_called_once_with(PHIS[0], THETAS[0])
+    phi_moves = [call.args[0] for call in positioner.move_phi_absolute.call_args_list]
+    assert phi_moves[: 2 * len(PHIS) - 2] == list(PHIS[1:]) + list(PHIS[-2::-1])
+    assert positioner.move_theta_absolute.call_count == len(THETAS) - 1
+    assert all(result.is_measured(theta, phi) for theta in THETAS for phi in PHIS)
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+import skrf
+
+from pychamber.experiment_result import ExperimentResult
+from pychamber.storage import ChunkedCube, MagPhaseCube
+
+
+@pytest.fixture
+def cube_and_array(tmp_path):
+    shape = (23, 19, 11)
+    cube = ChunkedCube(shape, chunks=(4, 8, 8), dir=tmp_path)
+    array = np.full(shape, np.nan, dtype=complex)
+    yield cube, array
+    cube.close()
+
+
+def test_unwritten_cube_reads_fill_value(cube_and_array):
+    cube, _ = cube_and_array
+    assert cube.shape == (23, 19, 11)
+    assert np.isnan(cube[...]).all()
+    assert np.isnan(cube[3, 4, 5])
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        (slice(None), 3, 7),
+        (5,),
+        (5, 2, slice(None)),
+        (5, slice(None), 9),
+        (slice(2, 20, 3), slice(None), slice(1, 4)),
+        (np.array([0, 22]), slice(None), np.array([1, 10])),
+        (slice(None), np.array([4]), np.array([6])),
+        (slice(7, 8),),
+    ],
+)
+def test_indexing_matches_numpy(cube_and_array, key):
+    cube, array = cube_and_array
+    rng = np.random.default_rng(0)
+    for phi in range(0, 19, 3):
+        for theta in range(0, 11, 2):
+            values = rng.normal(size=23) + 1j * rng.normal(size=23)
+            cube[:, phi, theta] = values
+            array[:, phi, theta] = values
+
+    np.testing.assert_array_equal(cube[key], array[key])
+
+    cube[key] = 1j
+    array[key] = 1j
+    np.testing.assert_array_equal(np.asarray(cube), array)
+
+
+def test_chunks_clipped_to_shape(tmp_path):
+    cube = ChunkedCube((5, 2, 40), dir=tmp_path)
+    assert cube.chunks == (5, 2, 16)
+    cube.close()
+
+
+def test_disk_backed_result(tmp_path):
+    f = skrf.Frequency(1, 10, 11, "ghz")
+    result = ExperimentResult(np.arange(0, 30.0, 10.0), np.arange(0, 40.0, 10.0), ["vertical"], f, scratch_dir=tmp_path)
+    assert result.is_disk_backed
+    assert isinstance(result._s_data["vertical"], ChunkedCube)
+
+    s = np.full((11, 1, 1), 2 + 1j)
+    params = {"phi": 10.0, "theta": 20.0, "polarization": "vertical", "calibrated": False}
+    result.append(skrf.Network(frequency=f, s=s, params=params))
+
+    np.testing.assert_allclose(result.get_over_freq_vals("vertical", 20.0, 10.0), 2 + 1j)
+    assert np.isnan(result.get_theta_cut("vertical", 1e9, 0.0)).all()
+    assert result.get_3d_data("vertical", 1e9).shape == (4, 3)
+    np.testing.assert_allclose(result[0].s.ravel(), 2 + 1j)
+
+    path = tmp_path / "result.npz"
+    result.save(path)
+    loaded = ExperimentResult.load(path)
+    np.testing.assert_array_equal(loaded.get_3d_data("vertical", 5e9), result.get_3d_data("vertical", 5e9))
+
+
+def test_mag_phase_cube_round_trip():
+    values = np.array([1.0, -1.0, 1j, 1e-3 * np.exp(0.5j), 0.0, np.nan])
+    magnitude, phase = MagPhaseCube.encode(values)
+    decoded = MagPhaseCube.decode(magnitude, phase)
+
+    np.testing.assert_allclose(decoded[:4], values[:4], rtol=1e-3)
+    assert np.abs(decoded[4]) < 1e-16
+    assert np.isnan(decoded[5])
+
+    cube = MagPhaseCube.empty((4, 3, 2))
+    assert np.isnan(cube[...]).all()
+    cube[:, 1, 0] = values[:4]
+    np.testing.assert_allclose(cube[:, 1, 0], values[:4], rtol=1e-3)
+    assert np.isnan(cube[:, 0, 0]).all()
@@ -0,0 +1,67 @@
+import csv
+import json
+import time
+
+import numpy as np
+import pytest
+import skrf
+
+from pychamber.experiment import Experiment
+from pychamber.timing import STAGES, ScanTimings
+
+
+def test_timings_record_each_stage():
+    timings = ScanTimings(capacity=2)
+    for phi in range(5):
+        with timings.time((0, phi), "move"):
+            time.sleep(0.002)
+        timings.start((0, phi), "sweep")
+        timings.end((0, phi), "sweep")
+
+    data = timings.array
+    assert len(timings) == len(data) == 5
+    np.testing.assert_array_equal(data["phi"], np.arange(5))
+    assert np.all(timings.durations("move") >= 0.002)
+    assert np.all(data["sweep_start"] >= data["move_end"])
+    assert np.isnan(timings.durations("append")).all()
+    assert "move" in timings.summary() and "append" not in timings.summary()
+
+    with pytest.raises(ValueError):
+        timings.start((0, 0), "settle")
+
+
+def test_timings_export(tmp_path):
+    timings = ScanTimings()
+    with timings.time((10.0, 20.0), "sweep"):
+        pass
+
+    timings.to_csv(tmp_path / "timings.csv")
+    with open(tmp_path / "timings.csv") as fp:
+        rows = list(csv.DictReader(fp))
+    assert len(rows) == 1
+    assert float(rows[0]["phi"]) == 20.0
+    assert float(rows[0]["sweep_end"]) >= float(rows[0]["sweep_start"])
+    assert rows[0]["move_start"] == "nan"
+
+    timings.to_chrome_trace(tmp_path / "trace.json")
+    with open(tmp_path / "trace.json") as fp:
+        events = json.load(fp)["traceEvents"]
+    (sweep,) = (event for event in events if event["ph"] == "X")
+    assert sweep["name"] == "sweep"
+    assert sweep["args"] == {"theta": 10.0, "phi": 20.0}
+    assert len([event for event in events if event["ph"] == "M"]) == len(STAGES)
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_experiment_times_every_point(mocker, pipelined):
+    f = skrf.Frequency(1, 10, 11, "ghz")
+    analyzer = mocker.Mock()
+    analyzer.ch1.get_sdata.side_effect = lambda a, b: skrf.Network(frequency=f, s=np.ones((len(f), 1, 1)))
+    thetas, phis = np.array([0.0, 10.0]), np.array([0.0, 10.0, 20.0])
+    experiment = Experiment(analyzer, mocker.Mock(), thetas, phis, [("vertical", 2, 1)], f, pipelined=pipelined)
+    result = experiment.run()
+
+    assert len(result.timings) == len(thetas) * len(phis)
+    for stage in ("move", "sweep", "transfer", "record", "append"):
+        assert np.all(result.timings.durations(stage) >= 0)
+    assert np.isnan(result.timings.durations("deliver")).all()